@@ -0,0 +1,120 @@
+"""Throughput of the compression codecs, on a generated TSL file.
+
+Usage: python -m benchmarks.codecs [--patches N] [--repeat N]
+
+For each codec available here: the time to write the file compressed, to
+decompress it, and to decode it from the compressed stream, which is
+compared to the decoding of the plain file.
+"""
+
+import argparse
+import io
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.corpus import write_corpus
+from katana_tsl_parser.compression import CODECS, open_input, open_output
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.reader import load_tsl
+
+_CORPUS = Path(tempfile.gettempdir()) / "katana-tsl-benchmarks"
+_CHUNK_SIZE = 1 << 16
+
+
+def _best(func: Callable[[], object], repeat: int) -> JsonDict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return {"best": min(times), "median": statistics.median(times), "runs": repeat}
+
+
+def _drain(source: Path) -> None:
+    with open_input(source) as f:
+        while f.read(_CHUNK_SIZE):
+            pass
+
+
+def codecs(path: Path, repeat: int) -> dict[str, JsonDict]:
+    """Time the codecs on `path`, a plain TSL file.
+
+    The compressed files are written next to it, their size is reported
+    under `size[codec]`.
+    """
+    text = path.read_text()
+    results = {
+        "size[plain]": {"bytes": path.stat().st_size},
+        "decode_trusted[plain]": _best(lambda: load_tsl(path, trusted=True), repeat),
+    }
+
+    for codec in CODECS.values():
+        if not codec.available:
+            continue
+
+        dest = path.with_name(f"{path.name}{codec.suffix}")
+
+        def compress(dest: Path = dest) -> None:
+            with open_output(dest) as f:
+                f.write(text)
+
+        def decompress(dest: Path = dest) -> None:
+            _drain(dest)
+
+        def decode(dest: Path = dest) -> None:
+            load_tsl(dest, trusted=True)
+
+        results[f"compress[{codec.name}]"] = _best(compress, repeat)
+        results[f"size[{codec.name}]"] = {"bytes": dest.stat().st_size}
+        results[f"decompress[{codec.name}]"] = _best(decompress, repeat)
+        results[f"decode_trusted[{codec.name}]"] = _best(decode, repeat)
+
+    return results
+
+
+def _table(results: dict[str, JsonDict]) -> str:
+    plain = results["size[plain]"]["bytes"]
+    decode = results["decode_trusted[plain]"]["best"]
+
+    out = io.StringIO()
+    out.write(
+        f"{'codec':<8}{'ratio':>8}{'compress':>14}{'decompress':>14}"
+        f"{'decode':>12}{'overhead':>10}\n"
+    )
+    out.write(f"{'plain':<8}{1:>7.1f}x{'':>14}{'':>14}{decode:>11.2f}s\n")
+    for name in CODECS:
+        if f"size[{name}]" not in results:
+            out.write(f"{name:<8}  not available\n")
+            continue
+
+        size = results[f"size[{name}]"]["bytes"]
+        compress = results[f"compress[{name}]"]["best"]
+        decompress = results[f"decompress[{name}]"]["best"]
+        decode_codec = results[f"decode_trusted[{name}]"]["best"]
+        out.write(
+            f"{name:<8}{plain / size:>7.1f}x"
+            f"{plain / 1e6 / compress:>9.1f} MB/s"
+            f"{plain / 1e6 / decompress:>9.1f} MB/s"
+            f"{decode_codec:>11.2f}s"
+            f"{(decode_codec / decode - 1) * 100:>9.0f}%\n"
+        )
+
+    return out.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--patches", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = write_corpus(_CORPUS / f"v2-{args.patches}.tsl", args.patches)
+    print(_table(codecs(path, args.repeat)), end="")
+
+
+if __name__ == "__main__":
+    main()
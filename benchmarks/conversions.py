@@ -0,0 +1,48 @@
+"""Per-byte cost of the conversions of the decoders, with and without tables.
+
+Usage: python -m benchmarks.conversions
+"""
+
+import functools
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from katana_tsl_parser.models.enums import AmpType, ChainItem
+from katana_tsl_parser.models.layout import byte_table
+from katana_tsl_parser.models.types import Gain12dBImpl, PitchImpl, Q
+
+# Valid bytes of each conversion, repeated to get stable timings
+ROUNDS = 2000
+
+CONVERSIONS: dict[str, tuple[Callable[[int], Any], bytes]] = {
+    "AmpType": (AmpType, bytes(AmpType)),
+    "ChainItem": (ChainItem, bytes(ChainItem)),
+    "Gain12dB": (Gain12dBImpl.from_byte, bytes(range(49))),
+    "Pitch": (PitchImpl.from_byte, bytes(range(49))),
+    "Q": (Q.from_byte, bytes(range(6))),
+}
+
+
+def per_byte(func: Callable[[], object], n: int) -> float:
+    """Best time per converted byte, in nanoseconds."""
+    return min(timeit.repeat(func, number=ROUNDS, repeat=5)) / (ROUNDS * n) * 1e9
+
+
+def convert_all(convert: Callable[[int], Any], data: bytes) -> list[Any]:
+    return list(map(convert, data))
+
+
+def main() -> None:
+    print(f"{'conversion':<12}{'call':>10}{'table':>10}{'speedup':>10}")
+    for name, (convert, data) in CONVERSIONS.items():
+        table = byte_table(convert).__getitem__
+
+        call = per_byte(functools.partial(convert_all, convert, data), len(data))
+        lookup = per_byte(functools.partial(convert_all, table, data), len(data))
+
+        print(f"{name:<12}{call:>8.1f}ns{lookup:>8.1f}ns{call / lookup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
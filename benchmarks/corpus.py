@@ -0,0 +1,178 @@
+"""Deterministic generator of valid TSL files, for the benchmarks.
+
+The patches are built from the one of `default.tsl`: its sections are
+resized to the layout of a v1 or v2 patch, then every modeled field is set
+to a random value that the models accept. The bytes that aren't modeled
+are kept. The same seed always gives the same file.
+
+Usage: python -m benchmarks.corpus OUTPUT [--patches N] [--version 1|2] [--seed S]
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+from katana_tsl_parser.models.enums import ChainItem
+from katana_tsl_parser.models.layout import strip_optional
+from katana_tsl_parser.models.tsl import MAX_NAME_LENGTH, ParamSetModel, encode_name
+from katana_tsl_parser.models.types import JsonDict, TslSection, hex_views, to_hex
+from katana_tsl_parser.sweep import Parameter, parameters
+from katana_tsl_parser.validation import field_error, valid_bytes
+
+DEFAULT_TSL = Path(__file__).parents[1] / "default.tsl"
+
+_CHAIN = ParamSetModel.model_fields["chain"].alias or "chain"
+_NAME = ParamSetModel.model_fields["name"].alias or "name"
+
+# Attempts at a random value for the fields of several bytes, e.g. the contour
+_ATTEMPTS = 20
+
+
+def _sections(version: int) -> dict[str, type[TslSection]]:
+    """The sections of a patch of each version, by alias.
+
+    The optional sections, like `UserPatch%Patch_Mk2V2`, only exist in v2.
+    """
+    sections = {}
+    for name, info in ParamSetModel.model_fields.items():
+        type_ = strip_optional(info.annotation)
+        if not isinstance(type_, type) or not issubclass(type_, TslSection):
+            continue
+        if version == 1 and not info.is_required():
+            continue
+        sections[info.alias or name] = type_
+
+    return sections
+
+
+def _size(section: type[TslSection], version: int) -> int:
+    """The size of a section: the largest in v2, the smallest valid one in v1."""
+    sizes = sorted(section.__tsl_layout__.sizes)
+    if version > 1:
+        return sizes[-1]
+
+    fields = section.model_fields
+    end = max(
+        (s.end for s in section.__tsl_layout__.specs if fields[s.name].is_required()),
+        default=0,
+    )
+
+    return next(s for s in sizes if s >= end)
+
+
+def template(version: int = 2) -> JsonDict:
+    """Return the patch of `default.tsl`, resized to the layout of `version`."""
+    patch: JsonDict = json.loads(DEFAULT_TSL.read_text())["data"][0][0]
+    values = hex_views(patch["paramSet"])
+    sections = _sections(version)
+
+    by_alias = ParamSetModel.__tsl_layout__.by_alias
+
+    # The sections keep the order of the file, the missing ones are appended
+    param_set: JsonDict = {}
+    for alias, v in values.items():
+        if alias in sections:
+            size = _size(sections[alias], version)
+            param_set[alias] = to_hex(bytes(v)[:size].ljust(size, b"\0"))
+        elif alias not in by_alias or by_alias[alias] == "name":
+            param_set[alias] = to_hex(v)
+    for alias, section in sections.items():
+        if alias not in param_set:
+            param_set[alias] = to_hex(bytes(_size(section, version)))
+    param_set.setdefault(_CHAIN, to_hex(bytes(ChainItem)))
+
+    return {**patch, "paramSet": param_set}
+
+
+class Generator:
+    """Random patches of one version, see `generate()`."""
+
+    def __init__(self, version: int = 2, seed: int = 0) -> None:
+        self.version = version
+        self.random = random.Random(seed)  # noqa: S311
+        self.template = template(version)
+
+        self._base = hex_views(self.template["paramSet"])
+        self._fields: dict[str, list[tuple[Parameter, bytes]]] = {}
+        for alias, section in _sections(version).items():
+            name = ParamSetModel.__tsl_layout__.by_alias[alias]
+            size = len(self._base[alias])
+            self._fields[alias] = [
+                (p, valid_bytes(p))
+                for p in parameters(section, name, alias)
+                if p.offset + p.spec.width <= size
+            ]
+
+    def patch(self, index: int) -> JsonDict:
+        rng = self.random
+        param_set: JsonDict = {}
+        for alias, v in self._base.items():
+            fields = self._fields.get(alias)
+            if fields is None:
+                param_set[alias] = to_hex(v)
+                continue
+
+            data = bytearray(v)
+            for param, choices in fields:
+                if choices:
+                    data[param.offset] = rng.choice(choices)
+                else:
+                    self._randomize(param, data)
+            param_set[alias] = to_hex(data)
+
+        chain = bytearray(ChainItem)
+        rng.shuffle(chain)
+        param_set[_CHAIN] = to_hex(chain)
+        name = f"Bench {self.version}-{index:05d}"[:MAX_NAME_LENGTH]
+        param_set[_NAME] = to_hex(encode_name(name))
+
+        return {**self.template, "paramSet": param_set}
+
+    def _randomize(self, param: Parameter, data: bytearray) -> None:
+        start, end = param.offset, param.offset + param.spec.width
+        for _ in range(_ATTEMPTS):
+            value = bytes(self.random.randrange(128) for _ in range(start, end))
+            if field_error(param, value) is None:
+                data[start:end] = value
+                return
+
+
+def generate(patches: int, *, version: int = 2, seed: int = 0) -> JsonDict:
+    """Return a TSL document of random, valid patches."""
+    generator = Generator(version, seed)
+
+    return {
+        "name": f"Benchmark v{version}",
+        "formatRev": "0002",
+        "device": "KATANA MkII",
+        "data": [[generator.patch(n) for n in range(patches)]],
+    }
+
+
+def write_corpus(path: Path, patches: int, *, version: int = 2, seed: int = 0) -> Path:
+    """Write a generated TSL file, unless it already exists."""
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_text(json.dumps(generate(patches, version=version, seed=seed)))
+        tmp.replace(path)
+
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a TSL file.")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--patches", type=int, default=1000)
+    parser.add_argument("--version", type=int, choices=(1, 2), default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    args.output.write_text(
+        json.dumps(generate(args.patches, version=args.version, seed=args.seed))
+    )
+
+
+if __name__ == "__main__":
+    main()
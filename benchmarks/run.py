@@ -0,0 +1,223 @@
+"""Benchmarks of the decoding of TSL files, with the results stored as JSON.
+
+The files are generated by `benchmarks.corpus` and kept in the corpus
+directory, so that every run measures the same data. Each case is timed
+several times and its best and median times are reported. Results can be
+compared to the ones of another run, e.g. of another commit:
+
+    python -m benchmarks.run --output before.json
+    git switch other-branch
+    python -m benchmarks.run --compare before.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from benchmarks import startup
+from benchmarks.corpus import write_corpus
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.types import JsonDict
+
+ROOT = Path(__file__).parents[1]
+
+# Cases slower than this ratio of the baseline are reported as regressions
+THRESHOLD = 1.2
+
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    """A measured operation; `setup` runs before each call and isn't timed."""
+
+    name: str
+    func: Callable[[Any], object]
+    setup: Callable[[], Any]
+
+
+def _cases(path: Path, version: int) -> list[Case]:
+    raw = path.read_bytes()
+    suffix = f"[v{version}]"
+
+    def values() -> JsonDict:
+        res: JsonDict = json.loads(raw)
+        return res
+
+    def model() -> TslModel:
+        return TslModel.decode_tsl(values(), trusted=True)
+
+    return [
+        Case(f"json_loads{suffix}", lambda _: json.loads(raw), lambda: None),
+        Case(f"decode{suffix}", TslModel.decode_tsl, values),
+        Case(
+            f"decode_trusted{suffix}",
+            lambda v: TslModel.decode_tsl(v, trusted=True),
+            values,
+        ),
+        Case(
+            f"decode_lazy{suffix}",
+            lambda v: TslModel.decode_tsl(v, trusted=True, lazy=True),
+            values,
+        ),
+        Case(f"model_dump{suffix}", lambda m: m.model_dump(), model),
+        Case(f"model_dump_json{suffix}", lambda m: m.model_dump_json(), model),
+        Case(f"encode_tsl{suffix}", lambda m: m.encode_tsl(), model),
+    ]
+
+
+def _time(case: Case, repeat: int) -> JsonDict:
+    times = []
+    for _ in range(repeat):
+        arg = case.setup()
+        gc.collect()
+        start = time.perf_counter()
+        case.func(arg)
+        times.append(time.perf_counter() - start)
+        del arg
+
+    return {"best": min(times), "median": statistics.median(times), "runs": repeat}
+
+
+def _peak_memory(path: Path) -> int:
+    """Peak memory allocated while decoding a file, in bytes."""
+    raw = path.read_bytes()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        TslModel.decode_tsl(json.loads(raw))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def _commit() -> str | None:
+    try:
+        res = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return res.stdout.strip()
+
+
+def run(corpus: Path, patches: int, repeat: int) -> JsonDict:
+    results: JsonDict = {}
+    for version in (1, 2):
+        path = write_corpus(
+            corpus / f"v{version}-{patches}.tsl", patches, version=version
+        )
+        for case in _cases(path, version):
+            results[case.name] = _time(case, repeat)
+            _report(case.name, results[case.name])
+
+        name = f"peak_memory[v{version}]"
+        results[name] = {"bytes": _peak_memory(path)}
+        _report(name, results[name])
+
+    for label, args in startup.cases().items():
+        name = f"startup_{label}"
+        results[name] = startup.startup(args, repeat)
+        _report(name, results[name])
+
+    return {
+        "meta": {
+            "commit": _commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "patches": patches,
+        },
+        "results": results,
+    }
+
+
+def _value(result: JsonDict) -> float:
+    if "bytes" in result:
+        return float(result["bytes"])
+
+    return float(result["best"])
+
+
+def _format(result: JsonDict) -> str:
+    if "bytes" in result:
+        return f"{result['bytes'] / 1e6:.1f} MB"
+
+    return f"{result['best'] * 1e3:.1f} ms"
+
+
+def _report(name: str, result: JsonDict) -> None:
+    print(f"{name:<28}{_format(result):>12}")
+
+
+def compare(baseline: JsonDict, current: JsonDict, threshold: float = THRESHOLD) -> int:
+    """Print the ratio of each result to the baseline, count the regressions."""
+    regressions = 0
+    print(f"\n{'case':<28}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+
+        ratio = _value(result) / _value(old) if _value(old) else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  slower"
+        print(f"{name:<28}{_format(old):>12}{_format(result):>12}{ratio:>7.2f}x{flag}")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--patches", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "katana-tsl-benchmarks",
+        help="Where the generated files are kept.",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results to this file.")
+    parser.add_argument(
+        "--compare", type=Path, help="Compare the results to the ones of this file."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="Ratio above which a case is a regression, which fails the run.",
+    )
+    args = parser.parse_args()
+
+    results = run(args.corpus, args.patches, args.repeat)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
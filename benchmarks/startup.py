@@ -0,0 +1,90 @@
+"""Time of the imports and of short CLI runs, in fresh interpreters.
+
+Usage: python -m benchmarks.startup [--repeat N] [--imports]
+
+`--imports` also lists the slowest imports, from `python -X importtime`.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import write_corpus
+from katana_tsl_parser.models.types import JsonDict
+
+ROOT = Path(__file__).parents[1]
+
+# A file of one patch, decoded by the `decode_*` cases
+_CORPUS = Path(tempfile.gettempdir()) / "katana-tsl-benchmarks"
+
+
+def cases() -> dict[str, list[str]]:
+    """The commands that are timed, as interpreter arguments."""
+    path = write_corpus(_CORPUS / "v2-1.tsl", 1)
+    main = ["-m", "katana_tsl_parser.main"]
+
+    return {
+        "import_package": ["-c", "import katana_tsl_parser"],
+        "import_main": ["-c", "import katana_tsl_parser.main"],
+        "import_models": ["-c", "import katana_tsl_parser.models"],
+        "cli_help": [*main, "--help"],
+        "decode": [*main, "decode", str(path)],
+        "decode_trusted": [*main, "decode", "--trusted", str(path)],
+    }
+
+
+def startup(args: list[str], repeat: int) -> JsonDict:
+    """Time a fresh interpreter running `args`, as a user would."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(  # noqa: S603
+            [sys.executable, *args], check=True, capture_output=True, cwd=ROOT
+        )
+        times.append(time.perf_counter() - start)
+
+    return {"best": min(times), "median": statistics.median(times), "runs": repeat}
+
+
+def slowest_imports(args: list[str], count: int = 15) -> list[tuple[str, int]]:
+    """The modules that take the longest to import, with their time in µs."""
+    res = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    imports = []
+    for line in res.stderr.splitlines():
+        _, sep, timing = line.partition("import time:")
+        if not sep or "self [us]" in timing:
+            continue
+        _, cumulative, name = timing.split("|")
+        imports.append((name.strip(), int(cumulative)))
+
+    return sorted(imports, key=lambda item: -item[1])[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--imports", action="store_true")
+    args = parser.parse_args()
+
+    for name, command in cases().items():
+        result = startup(command, args.repeat)
+        print(f"{name:<20}{result['best'] * 1e3:>10.1f} ms")
+
+    if args.imports:
+        print()
+        for module, cumulative in slowest_imports(cases()["decode"]):
+            print(f"{module:<50}{cumulative / 1e3:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Decode TSL files from asyncio code without blocking the event loop.
+
+The files are read and decoded by an executor, a pool of threads by default
+or any `concurrent.futures.Executor`, such as a `ProcessPoolExecutor` to
+decode several files in parallel. A limit on the number of concurrent tasks
+keeps a burst of requests from queueing unbounded work in the executor.
+
+Files larger than `split_size` are split into batches of patches, decoded by
+concurrent tasks, so that no task holds the GIL, or the result handling
+thread of a process pool, for long.
+
+Cancelling a request, or letting its timeout expire, cancels its task if it
+hasn't started yet. A task that is already running can't be interrupted, it
+keeps its slot until it completes and its result is dropped.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import weakref
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Protocol, TypeVar, runtime_checkable
+
+from katana_tsl_parser.batch import PATCHES_PER_TASK, SPLIT_SIZE, _assemble
+from katana_tsl_parser.compression import _MAGIC_SIZE, detect, is_compressed
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.reader import PatchSplitter, load_tsl, scan_patches
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+@runtime_checkable
+class AsyncReader(Protocol):
+    """A stream with a coroutine `read()`, such as `asyncio.StreamReader`."""
+
+    async def read(self, n: int = -1, /) -> bytes: ...
+
+
+class AsyncDecoder:
+    """Run the decoding of TSL files in `executor`, `limit` tasks at a time.
+
+    Without `executor`, the decoder creates a pool of `limit` threads, which
+    is shut down by `close()`. The limit defaults to the number of CPUs.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        *,
+        limit: int | None = None,
+        split_size: int = SPLIT_SIZE,
+    ) -> None:
+        self.limit = limit or os.cpu_count() or 1
+        self.split_size = split_size
+        self._executor = executor
+        self._owns_executor = executor is None
+        # A semaphore only works with the loop it was first used in
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self) -> "AsyncDecoder":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.limit, "tsl-decoder")
+
+        return self._executor
+
+    def close(self) -> None:
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def load_tsl(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        trusted: bool = False,
+        timeout: float | None = None,
+    ) -> TslModel:
+        """Read and decode a TSL file, see `TslModel.decode_tsl()`.
+
+        Raises `asyncio.TimeoutError` when the file isn't decoded within `timeout`
+        seconds, waiting for a free slot included.
+        """
+        return await asyncio.wait_for(self._load_tsl(Path(path), trusted), timeout)
+
+    async def iter_patches(
+        self,
+        stream: AsyncReader | AsyncIterable[bytes],
+        *,
+        trusted: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> AsyncIterator[PatchModel]:
+        """Decode the patches of a TSL document as it is read from `stream`.
+
+        The patches are decoded concurrently, up to the limit of the decoder,
+        and yielded in order. The stream isn't read further while that many
+        patches are waiting to be consumed. The stream is decompressed as it is
+        read when it is compressed. See `reader.iter_patches()`.
+        """
+        read = _reader(_decompressed(stream, chunk_size), chunk_size)
+        splitter = PatchSplitter()
+        pending: deque[asyncio.Future[PatchModel]] = deque()
+
+        try:
+            while not splitter.done:
+                chunk = await read()
+                if not chunk:
+                    break
+
+                for raw in splitter.feed(chunk):
+                    pending.append(
+                        asyncio.ensure_future(self.run(_decode_patch, raw, trusted))
+                    )
+                    if len(pending) >= self.limit:
+                        yield await pending.popleft()
+
+            splitter.close()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _load_tsl(self, path: Path, trusted: bool) -> TslModel:  # noqa: FBT001
+        if path.stat().st_size <= self.split_size or is_compressed(path):
+            return await self.run(_load_tsl, path, trusted)
+
+        header, offsets = await self.run(_scan_file, path)
+        step = 2 * PATCHES_PER_TASK
+        tasks = [
+            asyncio.ensure_future(
+                self.run(_decode_patches, path, offsets[i : i + step], trusted)
+            )
+            for i in range(0, len(offsets), step)
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return _assemble(header, [p for r in results for p in r], trusted=trusted)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+        """Run `func(*args)` in the executor once a slot is free."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+
+        await semaphore.acquire()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # Free the slot when the task is done, not when its caller stops
+        # waiting for it, so that cancelled tasks still count until then
+        future.add_done_callback(functools.partial(_release, loop, semaphore))
+
+        return await asyncio.wrap_future(future)
+
+
+def _release(
+    loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore, _: "Future[Any]"
+) -> None:
+    # The loop may be closed by the time a cancelled task completes
+    with suppress(RuntimeError):
+        loop.call_soon_threadsafe(semaphore.release)
+
+
+def _reader(
+    stream: AsyncReader | AsyncIterable[bytes], chunk_size: int
+) -> Callable[[], Awaitable[bytes]]:
+    # Readers come first, `asyncio.StreamReader` also iterates over lines
+    if isinstance(stream, AsyncReader):
+        return lambda: stream.read(chunk_size)
+
+    iterator = aiter(stream)
+    return lambda: anext(iterator, b"")
+
+
+async def _decompressed(
+    stream: AsyncReader | AsyncIterable[bytes], chunk_size: int
+) -> AsyncIterator[bytes]:
+    read = _reader(stream, chunk_size)
+
+    head = b""
+    while len(head) < _MAGIC_SIZE:
+        chunk = await read()
+        if not chunk:
+            break
+        head += chunk
+
+    codec = detect(head)
+    decompress = codec.decompressor().decompress if codec is not None else bytes
+
+    chunk = head
+    while chunk:
+        # An empty chunk would be taken for the end of the stream
+        if data := decompress(chunk):
+            yield data
+        chunk = await read()
+
+
+def _load_tsl(path: Path, trusted: bool) -> TslModel:  # noqa: FBT001
+    if is_compressed(path):
+        return load_tsl(path, trusted=trusted)
+
+    raw = path.read_bytes()
+    if trusted:
+        return TslModel.decode_tsl(json.loads(raw), trusted=True)
+
+    return TslModel.model_validate_json(raw)
+
+
+def _scan_file(path: Path) -> tuple[JsonDict, list[int]]:
+    header, offsets = scan_patches(path.read_bytes())
+    return header, offsets.tolist()
+
+
+def _decode_patches(
+    path: Path,
+    spans: list[int],
+    trusted: bool,  # noqa: FBT001
+) -> list[PatchModel]:
+    patches = []
+    with path.open("rb") as f:
+        for start, end in zip(spans[::2], spans[1::2], strict=True):
+            f.seek(start)
+            values = json.loads(f.read(end - start))
+            patches.append(PatchModel.decode_tsl(values, trusted=trusted))
+
+    return patches
+
+
+def _decode_patch(raw: bytes, trusted: bool) -> PatchModel:  # noqa: FBT001
+    return PatchModel.decode_tsl(json.loads(raw), trusted=trusted)
+
+
+@functools.cache
+def _default_decoder() -> AsyncDecoder:
+    return AsyncDecoder()
+
+
+async def aload_tsl(
+    path: str | os.PathLike[str],
+    *,
+    trusted: bool = False,
+    timeout: float | None = None,
+    decoder: AsyncDecoder | None = None,
+) -> TslModel:
+    """Read and decode a TSL file, see `AsyncDecoder.load_tsl()`.
+
+    Uses a shared pool of threads unless `decoder` is given.
+    """
+    decoder = decoder or _default_decoder()
+
+    return await decoder.load_tsl(path, trusted=trusted, timeout=timeout)
+
+
+def aiter_patches(
+    stream: AsyncReader | AsyncIterable[bytes],
+    *,
+    trusted: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    decoder: AsyncDecoder | None = None,
+) -> AsyncIterator[PatchModel]:
+    """Decode the patches of a stream, see `AsyncDecoder.iter_patches()`.
+
+    Uses a shared pool of threads unless `decoder` is given.
+    """
+    decoder = decoder or _default_decoder()
+
+    return decoder.iter_patches(stream, trusted=trusted, chunk_size=chunk_size)
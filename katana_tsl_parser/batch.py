@@ -0,0 +1,286 @@
+import functools
+import json
+import os
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar
+
+from katana_tsl_parser.cache import SectionCache
+from katana_tsl_parser.compression import is_compressed
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.reader import load_tsl, scan_patches
+
+T = TypeVar("T")
+
+# Files larger than this are split between the workers
+SPLIT_SIZE = 8 << 20
+PATCHES_PER_TASK = 64
+
+
+@dataclass(frozen=True, slots=True)
+class DecodeResult:
+    """The decoded file, or the error that prevented its decoding.
+
+    `value` holds the output of `model_dump_json()` when decoding `as_json`.
+    """
+
+    path: Path
+    value: TslModel | str | None = None
+    error: Exception | None = None
+
+
+@dataclass(slots=True)
+class _Job:
+    path: Path
+    futures: list["Future[Any]"] = field(default_factory=list)
+    header: JsonDict | None = None
+    error: Exception | None = None
+    value: TslModel | str | None = None
+    # Kept to store the assembled file in the cache
+    raw: bytes | None = None
+
+
+class _SerialExecutor(Executor):
+    """Run the tasks as they are submitted, when a pool isn't worth it."""
+
+    def submit(
+        self,
+        fn: Callable[..., T],
+        /,
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> "Future[T]":
+        future: Future[T] = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:  # noqa: BLE001
+            future.set_exception(e)
+
+        return future
+
+
+def decode_many(  # noqa: PLR0913
+    paths: Iterable[str | os.PathLike[str]],
+    *,
+    workers: int | None = None,
+    trusted: bool = False,
+    as_json: bool = False,
+    split_size: int = SPLIT_SIZE,
+    cache: str | os.PathLike[str] | None = None,
+) -> Iterator[DecodeResult]:
+    """Decode TSL files with a pool of processes, yielding results in order.
+
+    The patches of the files larger than `split_size` are decoded in batches
+    by several workers. Errors are reported in the results and don't stop
+    the other files from being decoded. With `as_json`, the workers dump the
+    models to JSON, which is much cheaper to send back than the models.
+
+    `cache` is the path of a `SectionCache` shared by the workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    executor: Executor
+    if workers > 1:
+        executor = ProcessPoolExecutor(workers)
+    else:
+        executor = _SerialExecutor()
+        split_size = sys.maxsize
+    max_tasks = 4 * workers
+
+    jobs: deque[_Job] = deque()
+    tasks = 0
+    try:
+        for path in map(Path, paths):
+            job = _submit(
+                executor,
+                path,
+                trusted=trusted,
+                as_json=as_json,
+                split_size=split_size,
+                cache=cache,
+            )
+            jobs.append(job)
+            tasks += len(job.futures)
+
+            while tasks > max_tasks:
+                job = jobs.popleft()
+                tasks -= len(job.futures)
+                yield _result(job, trusted=trusted, as_json=as_json, cache=cache)
+
+        while jobs:
+            yield _result(jobs.popleft(), trusted=trusted, as_json=as_json, cache=cache)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _submit(  # noqa: PLR0913
+    executor: Executor,
+    path: Path,
+    *,
+    trusted: bool,
+    as_json: bool,
+    split_size: int,
+    cache: str | os.PathLike[str] | None,
+) -> _Job:
+    job = _Job(path)
+    try:
+        # Compressed files can't be split at offsets, they are decoded whole
+        if path.stat().st_size <= split_size or is_compressed(path):
+            job.futures.append(
+                executor.submit(_decode_file, path, trusted, as_json, cache)
+            )
+            return job
+
+        raw = path.read_bytes()
+        if cache is not None:
+            job.raw = raw
+            job.value = _open_cache(os.fspath(cache)).load_file(
+                raw, trusted=trusted, as_json=as_json
+            )
+            if job.value is not None:
+                return job
+
+        job.header, offsets = scan_patches(raw)
+    except (OSError, ValueError) as e:
+        job.error = e
+        return job
+
+    step = 2 * PATCHES_PER_TASK
+    for i in range(0, len(offsets), step):
+        spans = offsets[i : i + step].tolist()
+        job.futures.append(
+            executor.submit(_decode_patches, path, spans, trusted, as_json, cache)
+        )
+
+    return job
+
+
+def _result(
+    job: _Job,
+    *,
+    trusted: bool,
+    as_json: bool,
+    cache: str | os.PathLike[str] | None,
+) -> DecodeResult:
+    if job.error is not None:
+        return DecodeResult(job.path, error=job.error)
+    if job.value is not None:
+        return DecodeResult(job.path, job.value)
+
+    try:
+        results = [f.result() for f in job.futures]
+    except Exception as e:  # noqa: BLE001
+        return DecodeResult(job.path, error=e)
+
+    if job.header is None:
+        return DecodeResult(job.path, results[0])
+
+    patches = [p for r in results for p in r]
+    value: TslModel | str
+    try:
+        if as_json:
+            value = _dump_json(job.header, patches, trusted=trusted)
+        else:
+            value = _assemble(job.header, patches, trusted=trusted)
+    except ValueError as e:
+        return DecodeResult(job.path, error=e)
+
+    if cache is not None and job.raw is not None:
+        _open_cache(os.fspath(cache)).store_file(
+            job.raw, value, trusted=trusted, as_json=as_json
+        )
+
+    return DecodeResult(job.path, value)
+
+
+def _decode_file(
+    path: Path,
+    trusted: bool,  # noqa: FBT001
+    as_json: bool,  # noqa: FBT001
+    cache: str | os.PathLike[str] | None,
+) -> TslModel | str:
+    if is_compressed(path):
+        section_cache = _open_cache(os.fspath(cache)) if cache is not None else None
+        tsl = load_tsl(path, trusted=trusted, cache=section_cache)
+        return tsl.model_dump_json() if as_json else tsl
+
+    raw = path.read_bytes()
+    if cache is not None:
+        section_cache = _open_cache(os.fspath(cache))
+        if as_json:
+            value = section_cache.load_file(raw, trusted=trusted, as_json=True)
+            if value is None:
+                tsl = TslModel.decode_tsl(
+                    json.loads(raw), trusted=trusted, cache=section_cache
+                )
+                value = tsl.model_dump_json()
+                section_cache.store_file(raw, value, trusted=trusted, as_json=True)
+            return value
+
+        tsl = section_cache.decode_file(raw, trusted=trusted)
+    elif trusted:
+        tsl = TslModel.decode_tsl(json.loads(raw), trusted=True)
+    else:
+        tsl = TslModel.model_validate_json(raw)
+
+    return tsl.model_dump_json() if as_json else tsl
+
+
+def _decode_patches(
+    path: Path,
+    spans: list[int],
+    trusted: bool,  # noqa: FBT001
+    as_json: bool,  # noqa: FBT001
+    cache: str | os.PathLike[str] | None,
+) -> list[PatchModel] | list[str]:
+    section_cache = _open_cache(os.fspath(cache)) if cache is not None else None
+
+    patches = []
+    with path.open("rb") as f:
+        for start, end in zip(spans[::2], spans[1::2], strict=True):
+            f.seek(start)
+            values = json.loads(f.read(end - start))
+            patches.append(
+                PatchModel.decode_tsl(values, trusted=trusted, cache=section_cache)
+            )
+
+    if section_cache is not None:
+        section_cache.flush()
+
+    if as_json:
+        return [p.model_dump_json() for p in patches]
+
+    return patches
+
+
+@functools.cache
+def _open_cache(path: str) -> SectionCache:
+    # One connection per worker process
+    return SectionCache(path)
+
+
+def _assemble(header: JsonDict, patches: list[Any], *, trusted: bool) -> TslModel:
+    """Build a file from its header and its decoded patches.
+
+    The header is validated unless `trusted`, as when the file isn't split.
+    """
+    values = {**header, "data": [patches]}
+    if trusted:
+        return TslModel._construct(values, by_alias=True)  # noqa: SLF001
+
+    return TslModel(**values)
+
+
+def _dump_json(header: JsonDict, patches: list[str], *, trusted: bool) -> str:
+    tsl = _assemble(header, [], trusted=trusted)
+
+    # `data` is the last field, splice the patches in
+    empty = tsl.model_dump_json()
+    prefix = empty.removesuffix("[[]]}")
+
+    return f"{prefix}[[{','.join(patches)}]]}}"
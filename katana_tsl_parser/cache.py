@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Any, TypeVar
+
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.types import TslValues, decode_section, hex_view
+
+T = TypeVar("T")
+
+# Bump when the decoded output of a section changes, to invalidate the caches
+DECODER_VERSION = 1
+
+DEFAULT_MAX_SIZE = 256 << 20
+# Evict down to this fraction of the size limit, not to evict on every write
+_EVICT_RATIO = 0.9
+_FLUSH_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+"""
+
+
+class SectionCache:
+    """On-disk cache of decoded files and sections, keyed by their contents.
+
+    Entries are keyed by a hash of the raw bytes and of the decoder version,
+    so unchanged files are loaded without being decoded and only the changed
+    sections of a modified file are decoded again. The least recently used
+    entries are evicted when the cache grows beyond `max_size` bytes.
+
+    Writes are batched, `flush()` or close the cache to persist them. The
+    cache can be shared by threads, only its accesses to the database are
+    serialized, not the decoding.
+
+    The entries are pickles, and loading a pickle can run arbitrary code: only
+    open a cache file that you created, in a directory that only you can
+    write to.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], *, max_size: int = DEFAULT_MAX_SIZE
+    ) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self.hits = self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Used from the threads of the daemon, under `_lock`
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # Reentrant, `put()` flushes every `_FLUSH_EVERY` writes
+        self._lock = threading.RLock()
+        self._db.executescript(_SCHEMA)
+        self._size: int = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+        self._used: dict[bytes, float] = {}
+        self._writes = 0
+
+    def __enter__(self) -> "SectionCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def get(self, key: bytes) -> Any | None:  # noqa: ANN401
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._used[key] = time.time()
+
+        return pickle.loads(row[0])  # noqa: S301
+
+    def put(self, key: bytes, value: Any) -> None:  # noqa: ANN401
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            old = self._db.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._size += len(data) - (old[0] if old else 0)
+
+            self._writes += 1
+            if self._writes >= _FLUSH_EVERY:
+                self.flush()
+
+    def section(self, section: type[T], values: TslValues, *, trusted: bool) -> T:
+        """Return a decoded section, decoding and caching it if needed.
+
+        Trusted decodes skip the validation, so their sections are cached
+        apart, not to be returned by a validated decode.
+        """
+        data = hex_view(values)
+        key = _key(section.__qualname__, data, trusted)
+
+        obj: T | None = self.get(key)
+        if obj is None:
+            obj = decode_section(section, data, trusted=trusted)
+            self.put(key, obj)
+
+        return obj
+
+    def decode_file(self, raw: bytes, *, trusted: bool = False) -> TslModel:
+        """Decode a TSL file, see `TslModel.decode_tsl()`."""
+        tsl = self.load_file(raw, trusted=trusted)
+        if not isinstance(tsl, TslModel):
+            tsl = TslModel.decode_tsl(json.loads(raw), trusted=trusted, cache=self)
+            self.store_file(raw, tsl, trusted=trusted)
+
+        return tsl
+
+    def load_file(
+        self, raw: bytes, *, trusted: bool = False, as_json: bool = False
+    ) -> TslModel | str | None:
+        """Return the decoded file if cached, or its JSON dump with `as_json`."""
+        value: TslModel | str | None = self.get(_key("TslModel", raw, trusted, as_json))
+
+        return value
+
+    def store_file(
+        self,
+        raw: bytes,
+        value: TslModel | str,
+        *,
+        trusted: bool = False,
+        as_json: bool = False,
+    ) -> None:
+        self.put(_key("TslModel", raw, trusted, as_json), value)
+        self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._used:
+                self._db.executemany(
+                    "UPDATE entries SET used = ? WHERE key = ?",
+                    [(t, k) for k, t in self._used.items()],
+                )
+                self._used.clear()
+
+            if self._size > self.max_size:
+                self._evict(int(self.max_size * _EVICT_RATIO))
+
+            self._db.commit()
+            self._writes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+    def _evict(self, target: int) -> None:
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY used")
+
+        evicted = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+
+        self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+
+def _key(kind: str, data: bytes | memoryview, *salt: object) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{DECODER_VERSION}:{kind}:{salt}".encode())
+    h.update(data)
+
+    return h.digest()
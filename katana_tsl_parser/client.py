@@ -0,0 +1,80 @@
+import json
+import os
+import socket
+from types import TracebackType
+from typing import Any
+
+from katana_tsl_parser.errors import RemoteError
+
+
+class Client:
+    """A connection to a `tsl-parser serve` daemon, see `katana_tsl_parser.server`.
+
+    This module only depends on the stdlib, so that forwarding a command to
+    the daemon doesn't pay for importing the models.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], *, timeout: float | None = None
+    ) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.settimeout(timeout)
+            self._sock.connect(os.fspath(path))
+        except OSError:
+            self._sock.close()
+            raise
+
+        self._file = self._sock.makefile("rwb")
+        self._id = 0
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def request(self, command: str, **params: Any) -> Any:  # noqa: ANN401
+        """Send a request and return its result.
+
+        Raises `RemoteError` with the type and message of the error when the
+        request fails on the daemon side.
+        """
+        self._id += 1
+        message = {"id": self._id, "command": command, **params}
+        self._file.write(json.dumps(message).encode() + b"\n")
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            msg = "connection closed by the daemon"
+            raise ConnectionError(msg)
+
+        response = json.loads(line)
+        if "error" in response:
+            error = response["error"]
+            raise RemoteError(error["type"], error["message"])
+
+        return response["result"]
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+
+def connect(
+    path: str | os.PathLike[str] | None, *, timeout: float | None = None
+) -> Client | None:
+    """Connect to the daemon listening on `path`, if there is one."""
+    if path is None or not os.path.exists(path):  # noqa: PTH110
+        return None
+
+    try:
+        return Client(path, timeout=timeout)
+    except OSError:
+        return None
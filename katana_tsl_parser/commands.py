@@ -0,0 +1,97 @@
+import json
+from collections.abc import Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from typing import TYPE_CHECKING, NoReturn
+
+from katana_tsl_parser.cache import SectionCache
+from katana_tsl_parser.compression import is_compressed
+from katana_tsl_parser.diff import Change, diff_adjacent, diff_patches
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.reader import TslReader, TslStream, load_tsl, read_patch
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+
+def decode_json(
+    tsl_file: Path,
+    index: int | None = None,
+    *,
+    trusted: bool = False,
+    cache: SectionCache | None = None,
+) -> str:
+    """Decode a TSL file, or one of its patches, and dump it as JSON.
+
+    This is the output of `tsl-parser decode`, see `katana_tsl_parser.server`
+    for the daemon that serves it.
+    """
+    model: BaseModel
+    compressed = is_compressed(tsl_file)
+    if index is not None and compressed:
+        try:
+            values = read_patch(tsl_file, index)
+        except IndexError:
+            if index < 0:
+                raise
+            # The whole stream was read, count its patches for the message
+            with TslStream(tsl_file) as stream:
+                _invalid_index(sum(1 for _ in stream))
+        model = PatchModel.decode_tsl(values, trusted=trusted, cache=cache)
+    elif index is not None:
+        # Only decode the requested patch
+        reader = TslReader(tsl_file)
+        if index >= len(reader):
+            _invalid_index(len(reader))
+        model = reader.patch(index, trusted=trusted, cache=cache)
+    elif compressed:
+        model = load_tsl(tsl_file, trusted=trusted, cache=cache)
+    elif cache is not None:
+        model = cache.decode_file(tsl_file.read_bytes(), trusted=trusted)
+    elif trusted:
+        model = TslModel.decode_tsl(json.loads(tsl_file.read_text()), trusted=True)
+    else:
+        model = TslModel.model_validate_json(tsl_file.read_text())
+
+    return model.model_dump_json(indent=2)
+
+
+def _invalid_index(n: int) -> NoReturn:
+    msg = f"Invalid index: {n}"
+    raise ValueError(msg)
+
+
+def diff_lines(
+    tsl_file: Path,
+    index: int | None = None,
+    other_index: int | None = None,
+    other: Path | None = None,
+) -> Iterator[str]:
+    """The lines of `tsl-parser diff`, see its help."""
+    if index is None:
+        with ExitStack() as stack:
+            patches = stack.enter_context(TslStream(tsl_file))
+            if other is None:
+                for n, changes in diff_adjacent(patches):
+                    yield from _changes(f"{n} -> {n + 1}", changes)
+            else:
+                others = stack.enter_context(TslStream(other))
+                for n, (a, b) in enumerate(zip(patches, others, strict=False)):
+                    yield from _changes(f"{n}", diff_patches(a, b))
+        return
+
+    if other_index is None:
+        other_index = index if other is not None else index + 1
+
+    a = read_patch(tsl_file, index)
+    b = read_patch(other or tsl_file, other_index)
+    for change in diff_patches(a, b):
+        yield str(change)
+
+
+def _changes(title: str, changes: list[Change]) -> Iterator[str]:
+    if changes:
+        yield f"@@ {title} @@"
+        for change in changes:
+            yield str(change)
@@ -0,0 +1,266 @@
+"""Transparent compression of TSL files.
+
+Compressed inputs are detected by their magic bytes and decompressed as they
+are read, compressed outputs are chosen by the suffix of the file or by name.
+Streams read chunk by chunk, such as asyncio streams, are decompressed by the
+`decompressor` of their codec. gzip, xz and bzip2 use the stdlib, zstd needs
+Python 3.14 or the `zstandard` package.
+"""
+
+import bz2
+import gzip
+import importlib
+import io
+import lzma
+import os
+import zlib
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager, suppress
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import IO, Any, Protocol, cast
+
+from katana_tsl_parser.errors import UnsupportedCompressionError
+
+
+def _import_zstd() -> ModuleType | None:
+    for name in ("compression.zstd", "zstandard"):
+        with suppress(ImportError):
+            return importlib.import_module(name)
+
+    return None
+
+
+_zstd = _import_zstd()
+
+
+class Decompressor(Protocol):
+    """Incremental decompression of a stream, fed one chunk at a time."""
+
+    def decompress(self, data: bytes, /) -> bytes: ...
+
+
+@dataclass(frozen=True, slots=True)
+class Codec:
+    name: str
+    magic: bytes
+    suffix: str
+    reader: Callable[[IO[bytes]], IO[bytes]]
+    writer: Callable[[IO[bytes], int | None], IO[bytes]]
+    decompressor: Callable[[], Decompressor]
+
+    @property
+    def available(self) -> bool:
+        return self.name != "zstd" or _zstd is not None
+
+
+def _gzip_reader(f: IO[bytes]) -> IO[bytes]:
+    return cast("IO[bytes]", gzip.GzipFile(fileobj=f, mode="rb"))
+
+
+def _gzip_writer(f: IO[bytes], level: int | None) -> IO[bytes]:
+    # 9, the default, is several times slower for a few percents
+    level = 6 if level is None else level
+    return cast("IO[bytes]", gzip.GzipFile(fileobj=f, mode="wb", compresslevel=level))
+
+
+def _gzip_decompressor() -> Decompressor:
+    return zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+
+def _xz_reader(f: IO[bytes]) -> IO[bytes]:
+    return cast("IO[bytes]", lzma.LZMAFile(f))
+
+
+def _xz_writer(f: IO[bytes], level: int | None) -> IO[bytes]:
+    return cast("IO[bytes]", lzma.LZMAFile(f, "wb", preset=level))
+
+
+def _xz_decompressor() -> Decompressor:
+    return lzma.LZMADecompressor()
+
+
+def _bzip2_reader(f: IO[bytes]) -> IO[bytes]:
+    return cast("IO[bytes]", bz2.BZ2File(f))
+
+
+def _bzip2_writer(f: IO[bytes], level: int | None) -> IO[bytes]:
+    level = 9 if level is None else level
+    return cast("IO[bytes]", bz2.BZ2File(f, "wb", compresslevel=level))
+
+
+def _bzip2_decompressor() -> Decompressor:
+    return bz2.BZ2Decompressor()
+
+
+def _zstd_module() -> Any:  # noqa: ANN401
+    if _zstd is None:
+        msg = "zstd needs Python 3.14 or the zstandard package"
+        raise UnsupportedCompressionError(msg)
+
+    return _zstd
+
+
+def _zstd_reader(f: IO[bytes]) -> IO[bytes]:
+    zstd = _zstd_module()
+    if hasattr(zstd, "ZstdFile"):
+        return cast("IO[bytes]", zstd.ZstdFile(f))
+
+    return cast("IO[bytes]", zstd.ZstdDecompressor().stream_reader(f, closefd=False))
+
+
+def _zstd_writer(f: IO[bytes], level: int | None) -> IO[bytes]:
+    zstd = _zstd_module()
+    if hasattr(zstd, "ZstdFile"):
+        return cast("IO[bytes]", zstd.ZstdFile(f, "w", level=level))
+
+    compressor = zstd.ZstdCompressor(level=3 if level is None else level)
+    return cast("IO[bytes]", compressor.stream_writer(f, closefd=False))
+
+
+def _zstd_decompressor() -> Decompressor:
+    zstd = _zstd_module()
+    if hasattr(zstd, "ZstdFile"):
+        return cast("Decompressor", zstd.ZstdDecompressor())
+
+    return cast("Decompressor", zstd.ZstdDecompressor().decompressobj())
+
+
+CODECS = {
+    codec.name: codec
+    for codec in [
+        Codec(
+            "gzip", b"\x1f\x8b", ".gz", _gzip_reader, _gzip_writer, _gzip_decompressor
+        ),
+        Codec("xz", b"\xfd7zXZ\x00", ".xz", _xz_reader, _xz_writer, _xz_decompressor),
+        Codec(
+            "bzip2", b"BZh", ".bz2", _bzip2_reader, _bzip2_writer, _bzip2_decompressor
+        ),
+        Codec(
+            "zstd",
+            b"\x28\xb5\x2f\xfd",
+            ".zst",
+            _zstd_reader,
+            _zstd_writer,
+            _zstd_decompressor,
+        ),
+    ]
+}
+
+_MAGIC_SIZE = max(len(codec.magic) for codec in CODECS.values())
+
+
+def detect(head: bytes) -> Codec | None:
+    """Return the codec of the data starting with `head`, if it is compressed."""
+    for codec in CODECS.values():
+        if head.startswith(codec.magic):
+            return codec
+
+    return None
+
+
+def is_compressed(path: str | os.PathLike[str]) -> bool:
+    with Path(path).open("rb") as f:
+        return detect(f.read(_MAGIC_SIZE)) is not None
+
+
+def codec_for(path: str | os.PathLike[str]) -> Codec | None:
+    """Return the codec matching the suffix of `path`, if any."""
+    suffix = Path(path).suffix
+    for codec in CODECS.values():
+        if suffix == codec.suffix:
+            return codec
+
+    return None
+
+
+@contextmanager
+def open_input(
+    source: "str | os.PathLike[str] | IO[bytes] | IO[str]",
+) -> "Iterator[IO[bytes] | IO[str]]":
+    """Open a file or wrap a stream, decompressing it if it is compressed.
+
+    Text streams are returned as is.
+    """
+    with ExitStack() as stack:
+        if isinstance(source, str | os.PathLike):
+            f: IO[bytes] = stack.enter_context(Path(source).open("rb"))
+        elif isinstance(source, io.TextIOBase):
+            yield cast("IO[str]", source)
+            return
+        else:
+            f = cast("IO[bytes]", source)
+
+        head, f = _peek(f, _MAGIC_SIZE)
+        codec = detect(head)
+        if codec is not None:
+            f = stack.enter_context(codec.reader(f))
+
+        yield f
+
+
+@contextmanager
+def open_output(
+    dest: "str | os.PathLike[str] | IO[str] | IO[bytes]",
+    *,
+    compression: str | None = None,
+    level: int | None = None,
+) -> Iterator[IO[str]]:
+    """Open a file or wrap a stream for writing text, compressing it if needed.
+
+    `compression` is the name of a codec, see `CODECS`. It defaults to the
+    codec matching the suffix of the file, streams are only compressed when
+    it is given, in which case they must be binary.
+    """
+    codec = None
+    if compression is not None:
+        codec = CODECS.get(compression)
+        if codec is None:
+            msg = f"unknown compression: {compression}"
+            raise UnsupportedCompressionError(msg)
+    elif isinstance(dest, str | os.PathLike):
+        codec = codec_for(dest)
+
+    with ExitStack() as stack:
+        if codec is None:
+            if isinstance(dest, str | os.PathLike):
+                dest = stack.enter_context(Path(dest).open("w", encoding="utf-8"))
+            yield cast("IO[str]", dest)
+            return
+
+        f: IO[bytes]
+        if isinstance(dest, str | os.PathLike):
+            f = stack.enter_context(Path(dest).open("wb"))
+        else:
+            f = cast("IO[bytes]", dest)
+
+        f = stack.enter_context(codec.writer(f, level))
+        yield stack.enter_context(io.TextIOWrapper(f, encoding="utf-8"))
+
+
+def _peek(f: IO[bytes], n: int) -> tuple[bytes, IO[bytes]]:
+    """Return the first `n` bytes of a stream, and a stream that still has them."""
+    if isinstance(f, io.BufferedReader):
+        return f.peek(n)[:n], f
+    if f.seekable():
+        pos = f.tell()
+        head = f.read(n)
+        f.seek(pos)
+        return head, f
+
+    buffered = io.BufferedReader(_RawReader(f))
+    return buffered.peek(n)[:n], cast("IO[bytes]", buffered)
+
+
+class _RawReader(io.RawIOBase):
+    def __init__(self, f: IO[bytes]) -> None:
+        self._f = f
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:  # noqa: ANN401
+        data = self._f.read(len(b))
+        b[: len(data)] = data
+        return len(data)
@@ -0,0 +1,184 @@
+import functools
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from katana_tsl_parser.models.tsl import ParamSetModel, PatchModel
+from katana_tsl_parser.models.types import (
+    JsonDict,
+    TslLazyModel,
+    TslList,
+    TslObject,
+    TslSection,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Change:
+    """A field whose value differs between two patches.
+
+    Bytes that aren't described by the models are reported individually, with
+    their offset in the section, e.g. `patch0[25]`.
+    """
+
+    path: str
+    old: Any
+    new: Any
+
+    def __str__(self) -> str:
+        return f"{self.path}: {_format(self.old)} -> {_format(self.new)}"
+
+
+def diff_patches(a: PatchModel | JsonDict, b: PatchModel | JsonDict) -> list[Change]:
+    """Compare two patches, given as models or as raw values, field by field.
+
+    Raw patches are decoded lazily: sections whose bytes are identical are
+    skipped without being decoded, and only the effects that differ are
+    decoded in the FX blocks. Models that were decoded lazily benefit from the
+    same shortcut for the sections that weren't accessed yet.
+    """
+    a, b = _patch(a), _patch(b)
+
+    changes: list[Change] = []
+    if a.memo != b.memo:
+        changes.append(Change("memo", a.memo, b.memo))
+    _diff_fields("", a.param_set, b.param_set, changes)
+    _diff_unmodeled(a.param_set, b.param_set, changes)
+
+    return changes
+
+
+def diff_adjacent(
+    patches: Iterable[PatchModel | JsonDict],
+) -> Iterator[tuple[int, list[Change]]]:
+    """Compare each patch to the next one, yield the index of the first one.
+
+    Each patch is decoded once, so that a library can be diffed in one pass.
+    """
+    prev = None
+    for n, patch in enumerate(map(_patch, patches)):
+        if prev is not None:
+            yield n - 1, diff_patches(prev, patch)
+        prev = patch
+
+
+def _patch(patch: PatchModel | JsonDict) -> PatchModel:
+    if isinstance(patch, PatchModel):
+        return patch
+
+    return PatchModel.decode_tsl(patch, trusted=True, lazy=True)
+
+
+def _diff_values(path: str, a: Any, b: Any, out: list[Change]) -> None:  # noqa: ANN401
+    if a is b:
+        return
+
+    if isinstance(a, TslList) and isinstance(b, TslList):
+        if a.root != b.root:
+            out.append(Change(path, a.root, b.root))
+        return
+
+    if isinstance(a, TslObject) and type(a) is type(b):
+        # Lazy models would be fully decoded by the comparison
+        if isinstance(a, TslLazyModel) or a != b:
+            _diff_fields(path, a, b, out)
+        return
+
+    if a != b:
+        out.append(Change(path, a, b))
+
+
+def _diff_fields(path: str, a: TslObject, b: TslObject, out: list[Change]) -> None:
+    pending_a, pending_b = _pending(a), _pending(b)
+
+    for name in a.__tsl_layout__.fields:
+        # Identical sections that weren't decoded yet are skipped as they are
+        raw_a, raw_b = pending_a.get(name), pending_b.get(name)
+        if raw_a is not None and raw_b is not None and raw_a == raw_b:
+            continue
+
+        field_path = f"{path}.{name}" if path else name
+        _diff_values(field_path, getattr(a, name), getattr(b, name), out)
+
+    if isinstance(a, TslSection) and isinstance(b, TslSection):
+        _diff_unknown_bytes(path, a, b, out)
+
+
+def _pending(obj: TslObject) -> JsonDict:
+    if not isinstance(obj, TslLazyModel):
+        return {}
+
+    pending = obj._pending or {}  # noqa: SLF001
+
+    return {n: v for n, v in pending.items() if n not in obj.__dict__}
+
+
+def _diff_unknown_bytes(
+    path: str, a: TslSection, b: TslSection, out: list[Change]
+) -> None:
+    raw_a, raw_b = a._raw, b._raw  # noqa: SLF001
+    if raw_a is None or raw_b is None or raw_a == raw_b:
+        return
+
+    size = min(len(raw_a), len(raw_b))
+    covered = _covered(type(a))
+    out.extend(
+        Change(f"{path}[{i}]", _Byte(raw_a[i]), _Byte(raw_b[i]))
+        for i in range(size)
+        if raw_a[i] != raw_b[i] and (i >= len(covered) or not covered[i])
+    )
+
+
+def _diff_unmodeled(a: ParamSetModel, b: ParamSetModel, out: list[Change]) -> None:
+    raw_a, raw_b = a._raw or {}, b._raw or {}  # noqa: SLF001
+    by_alias = ParamSetModel.__tsl_layout__.by_alias
+
+    for alias in dict.fromkeys([*raw_a, *raw_b]):
+        if alias in by_alias:
+            continue
+
+        va, vb = raw_a.get(alias), raw_b.get(alias)
+        if va is None or vb is None or len(va) != len(vb):
+            out.append(Change(alias, _bytes(va), _bytes(vb)))
+        elif va != vb:
+            out.extend(
+                Change(f"{alias}[{i}]", _Byte(x), _Byte(y))
+                for i, (x, y) in enumerate(zip(bytes(va), bytes(vb), strict=True))
+                if x != y
+            )
+
+
+@functools.cache
+def _covered(section: type[TslSection]) -> tuple[bool, ...]:
+    """Whether each byte of a section is described by one of its fields."""
+    layout = section.__tsl_layout__
+    covered = [False] * max(layout.sizes)
+    for spec in layout.specs:
+        covered[spec.offset : spec.end] = [True] * spec.width
+
+    return tuple(covered)
+
+
+class _Byte(int):
+    def __repr__(self) -> str:
+        return f"{self:02X}"
+
+
+def _bytes(values: Any) -> list[_Byte] | None:  # noqa: ANN401
+    if values is None:
+        return None
+
+    if isinstance(values, list):
+        values = bytes.fromhex("".join(values))
+
+    return [_Byte(v) for v in bytes(values)]
+
+
+def _format(value: Any) -> str:  # noqa: ANN401
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, list):
+        return f"[{', '.join(map(_format, value))}]"
+
+    return repr(value) if isinstance(value, _Byte) else str(value)
@@ -1,17 +1,43 @@
 from collections.abc import Sequence
+from typing import Any, TypeVar
 
+ErrorT = TypeVar("ErrorT", bound="TslError")
 
-class InvalidContourValuesError(ValueError):
+
+class TslError(ValueError):
+    """Base class of the decoding errors.
+
+    The errors only keep their message, so that they can be pickled and
+    raised again in another process.
+    """
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _rebuild, (type(self), str(self))
+
+
+def _rebuild(cls: type[ErrorT], msg: str) -> ErrorT:
+    err = cls.__new__(cls)
+    ValueError.__init__(err, msg)
+
+    return err
+
+
+class InvalidContourValuesError(TslError):
     def __init__(self, x: int, y: int) -> None:
         super().__init__(f"Invalid values for contour: ({x}, {y})")
 
 
-class InvalidQValueError(ValueError):
+class InvalidQValueError(TslError):
     def __init__(self, val: float) -> None:
         super().__init__(f"invalid Q value: {val}")
 
 
-class InvalidValueListLengthError(ValueError):
+class InvalidTslFileError(TslError):
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"invalid TSL file: {reason}")
+
+
+class InvalidValueListLengthError(TslError):
     def __init__(self, size: int, expected: Sequence[int] | int) -> None:
         if isinstance(expected, Sequence):
             expected_str = ", ".join(map(str, expected[:-1])) + f" or {expected[-1]}"
@@ -22,11 +48,39 @@ class InvalidValueListLengthError(ValueError):
         super().__init__(msg)
 
 
-class NameTooLongError(ValueError):
+class MissingFieldsError(TslError):
+    def __init__(self, fields: Sequence[str]) -> None:
+        super().__init__(f"missing fields: {', '.join(fields)}")
+
+
+class NameTooLongError(TslError):
     def __init__(self, n: int) -> None:
         super().__init__(f"must be 16 chars or fewer, not {n}")
 
 
-class UnsupportedDeviceError(ValueError):
+class RemoteError(TslError):
+    """An error raised by the daemon while serving a request."""
+
+    def __init__(self, kind: str, message: str) -> None:
+        super().__init__(f"{kind}: {message}")
+
+
+class ValueOutOfRangeError(TslError):
+    def __init__(
+        self, field: str, value: float, ge: float | None, le: float | None
+    ) -> None:
+        super().__init__(f"{field}: {value} is not in range [{ge}, {le}]")
+
+
+class UnknownFieldError(TslError):
+    def __init__(self, path: str) -> None:
+        super().__init__(f"unknown field: {path}")
+
+
+class UnsupportedCompressionError(TslError):
+    pass
+
+
+class UnsupportedDeviceError(TslError):
     def __init__(self, device: str) -> None:
         super().__init__(f"Unsupported device: {device}")
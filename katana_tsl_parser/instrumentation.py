@@ -0,0 +1,313 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import MethodType
+from typing import Any
+
+from katana_tsl_parser.models.layout import Decoder
+from katana_tsl_parser.models.types import JsonDict, TslSection, _TslBaseModel
+
+# Set to a path to write the stats of the process there as JSON when it exits,
+# or to 1 to write them to stderr. `{pid}` in the path is replaced by the
+# process id, so that the workers of `decode_many()` don't share a file.
+# Booleans are spelled as in the sweeps, e.g. `on` or `0`.
+ENV_VAR = "KATANA_TSL_INSTRUMENT"
+
+# Not imported from `sweep`, which imports the models that install this
+_FLAGS = {"true": True, "on": True, "1": True, "false": False, "off": False, "0": False}
+
+# The methods that are timed, on the classes that define them
+_METHODS = ("decode_tsl", "construct_tsl", "decode_lazy", "__init__")
+
+# The class or namespace, the name and the original value of a wrapped method
+_Patch = tuple[type | dict[str, Any], str, Any]
+
+
+@dataclass(slots=True)
+class Stat:
+    """The calls of one method of one model.
+
+    `total` includes the time spent in the nested calls that are recorded too,
+    `self_time` excludes it. `bytes` counts the raw bytes of the sections.
+    """
+
+    calls: int = 0
+    total: float = 0.0
+    self_time: float = 0.0
+    max: float = 0.0
+    bytes: int = 0
+
+    def as_dict(self) -> JsonDict:
+        return {
+            "calls": self.calls,
+            "total": self.total,
+            "self": self.self_time,
+            "max": self.max,
+            "bytes": self.bytes,
+        }
+
+
+class Recorder:
+    """The stats of the decoding, by `Model.method`, see `instrument()`."""
+
+    def __init__(self) -> None:
+        # name -> [calls, total, self time, max, bytes]
+        self._stats: dict[str, list[Any]] = {}
+
+    def add(self, name: str, elapsed: float, self_time: float, size: int) -> None:
+        # Nothing is called between reading and writing the values, so the
+        # GIL isn't released and updates from several threads aren't lost
+        stat = self._stats.get(name)
+        if stat is None:
+            self._stats[name] = [1, elapsed, self_time, elapsed, size]
+            return
+
+        stat[0] += 1
+        stat[1] += elapsed
+        stat[2] += self_time
+        stat[4] += size
+        if elapsed > stat[3]:  # noqa: PLR1730
+            stat[3] = elapsed
+
+    @property
+    def stats(self) -> dict[str, Stat]:
+        return {name: Stat(*values) for name, values in self._stats.copy().items()}
+
+    def report(self) -> JsonDict:
+        """Return the stats as JSON values, the slowest methods first."""
+        stats = sorted(self.stats.items(), key=lambda item: -item[1].self_time)
+
+        return {name: stat.as_dict() for name, stat in stats}
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), indent=2)
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+_recorders: list[Recorder] = []
+_patches: list[_Patch] = []
+_install_lock = threading.Lock()
+_local = threading.local()
+
+
+@contextmanager
+def instrument(
+    callback: Callable[[JsonDict], None] | None = None,
+) -> Iterator[Recorder]:
+    """Record the calls of the decoders of all the models in the block.
+
+    The `decode_tsl()`, `construct_tsl()` and `decode_lazy()` of every model
+    are timed, including the nested sections, like the effects of an FX
+    block. `Model.__init__` is the pydantic validation of a model, which
+    includes its field validators. The methods are only wrapped while a
+    recorder is active, so instrumentation costs nothing when it's off.
+
+    `callback` is called with the report of the recorder at the end of the
+    block. Recording applies to all the threads of the process.
+    """
+    recorder = Recorder()
+    start(recorder)
+    try:
+        yield recorder
+    finally:
+        stop(recorder)
+
+    if callback is not None:
+        callback(recorder.report())
+
+
+def install_from_env() -> Recorder | None:
+    """Record the whole process when `ENV_VAR` is set, see `instrument()`."""
+    value = os.environ.get(ENV_VAR, "").strip()
+    flag = _FLAGS.get(value.lower())
+    if not value or flag is False:
+        return None
+
+    recorder = Recorder()
+    start(recorder)
+    # Only the values that aren't flags are paths, `1` or `on` is stderr
+    atexit.register(_write, recorder, None if flag else value)
+
+    return recorder
+
+
+def _write(recorder: Recorder, target: str | None) -> None:
+    if target is None:
+        print(recorder.to_json(), file=sys.stderr)  # noqa: T201
+    else:
+        path = target.replace("{pid}", str(os.getpid()))
+        with open(path, "w", encoding="utf-8") as f:  # noqa: PTH123
+            f.write(recorder.to_json())
+
+
+def start(recorder: Recorder) -> None:
+    """Start recording, for when `instrument()` doesn't fit."""
+    with _install_lock:
+        if not _recorders:
+            _install()
+        _recorders.append(recorder)
+
+
+def stop(recorder: Recorder) -> None:
+    """Stop recording, the methods are restored when no recorder is left."""
+    with _install_lock:
+        _recorders.remove(recorder)
+        if not _recorders:
+            _uninstall()
+
+
+def _timed(
+    name: str,
+    size: int,
+    func: Callable[..., Any],
+    /,
+    *args: Any,  # noqa: ANN401
+    **kwargs: Any,  # noqa: ANN401
+) -> Any:  # noqa: ANN401
+    # The time of the nested calls, for the self time of each frame
+    stack: list[float] | None = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    stack.append(0.0)
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - started
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        for recorder in _recorders:
+            recorder.add(name, elapsed, elapsed - nested, size)
+
+
+def _size(values: object) -> int:
+    if isinstance(values, list | bytes | bytearray | memoryview):
+        return len(values)
+
+    return 0
+
+
+def _wrap_classmethod(
+    name: str, func: Callable[..., Any]
+) -> "classmethod[Any, ..., Any]":
+    names: dict[type, str] = {}
+
+    def wrapper(cls: type, values: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        label = names.get(cls)
+        if label is None:
+            label = names[cls] = f"{cls.__qualname__}.{name}"
+
+        return _timed(label, _size(values), func, cls, values, **kwargs)
+
+    wrapper.__wrapped__ = func  # type: ignore[attr-defined]
+
+    return classmethod(wrapper)
+
+
+def _wrap_init(func: Callable[..., None]) -> Callable[..., None]:
+    names: dict[type, str] = {}
+
+    def __init__(self: Any, **data: Any) -> None:  # noqa: ANN401, N807
+        cls = type(self)
+        label = names.get(cls)
+        if label is None:
+            label = names[cls] = f"{cls.__qualname__}.__init__"
+
+        _timed(label, 0, func, self, **data)
+
+    __init__.__wrapped__ = func  # type: ignore[attr-defined]
+
+    return __init__
+
+
+def _wrap_decoder(name: str, decoder: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def wrapper(values: Any) -> Any:  # noqa: ANN401
+        return _timed(name, _size(values), decoder, values)
+
+    return wrapper
+
+
+def _models() -> list[type[_TslBaseModel]]:
+    models = []
+    todo = [_TslBaseModel]
+    while todo:
+        cls = todo.pop()
+        if cls not in models:
+            models.append(cls)
+            todo += cls.__subclasses__()
+
+    return models
+
+
+def _patch(namespace: dict[str, Any], key: str, value: Any) -> None:  # noqa: ANN401
+    _patches.append((namespace, key, namespace[key]))
+    namespace[key] = value
+
+
+def _install() -> None:
+    models = _models()
+    sections = [
+        cls
+        for cls in models
+        if issubclass(cls, TslSection) and cls.__tsl_layout__.specs
+    ]
+    # Compiled before the methods are wrapped, so that the namespaces of the
+    # decoders hold the original methods, which `_uninstall()` puts back
+    decoders = {
+        cls: (cls.__tsl_decoder__, cls.__tsl_trusted_decoder__) for cls in sections
+    }
+    _install_methods(models)
+    _install_decoders(decoders)
+
+
+def _install_methods(models: list[type[_TslBaseModel]]) -> None:
+    for cls in models:
+        for name in _METHODS:
+            attr = cls.__dict__.get(name)
+            if isinstance(attr, classmethod):
+                wrapped: Any = _wrap_classmethod(name, attr.__func__)
+            elif name == "__init__" and attr is not None:
+                wrapped = _wrap_init(attr)
+            else:
+                continue
+            _patches.append((cls, name, attr))
+            setattr(cls, name, wrapped)
+
+
+def _install_decoders(
+    decoders: dict[type[TslSection], tuple[Decoder, Decoder]],
+) -> None:
+    # The compiled decoders hold references to the decoders of the nested
+    # sections, which are swapped in their namespaces
+    trusted = {
+        id(trusted_decoder): f"{cls.__qualname__}.construct_tsl"
+        for cls, (_, trusted_decoder) in decoders.items()
+    }
+    for pair in decoders.values():
+        for decoder in pair:
+            namespace = decoder.__globals__
+            for key, value in list(namespace.items()):
+                if isinstance(value, MethodType) and value.__self__ in decoders:
+                    if value.__func__.__name__ == "decode_tsl":
+                        _patch(namespace, key, value.__self__.decode_tsl)
+                elif id(value) in trusted:
+                    _patch(namespace, key, _wrap_decoder(trusted[id(value)], value))
+
+
+def _uninstall() -> None:
+    while _patches:
+        namespace, key, value = _patches.pop()
+        if isinstance(namespace, dict):
+            namespace[key] = value
+        else:
+            setattr(namespace, key, value)
@@ -1,62 +1,396 @@
 #! /usr/bin/env python
-import json
+import math
 import pathlib
-from copy import deepcopy
+import sys
+import time
+from contextlib import ExitStack, suppress
 from pathlib import Path
+from typing import cast
 
 import click
 
-from katana_tsl_parser.models import TslModel
-from katana_tsl_parser.models.tsl import MAX_NAME_LENGTH
+# The commands import what they need, so that `--help` and the commands
+# that don't decode anything don't pay for pydantic and the models
 
 
-def encode_name(name: str) -> list[str]:
-    if len(name) > MAX_NAME_LENGTH:
-        # EM101: Exception must not use a string literal, assign to variable first
-        # TRY003: Avoid specifying long messages outside the exception class
-        raise ValueError("Name too long")  # noqa: EM101, TRY003
+class DefaultGroup(click.Group):
+    """A group that runs `decode` when no command is given, `tsl-parser FILE`."""
 
-    return [f"{ord(c):02x}" for c in name] + ["20"] * (16 - len(name))
+    default_command = "decode"
 
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if args and args[0] not in (*self.commands, *ctx.help_option_names):
+            args = [self.default_command, *args]
 
-def s(v: int) -> str:
-    return f"{v:02x}"
+        return super().parse_args(ctx, args)
 
 
-def update_some_values(f: str) -> None:
-    tsl = json.loads(Path(f).read_text())
+@click.group(cls=DefaultGroup)
+def main() -> None:
+    pass
 
-    default_patch = tsl["data"][0][0]
-    for v in (0, 1, 5, 10, 20, 42, 55, 100):
-        patch = deepcopy(default_patch)
 
-        val = s(v)
-        patch["paramSet"]["UserPatch%PatchName"] = encode_name(f"Patch0[25]-{v:02}")
-        patch["paramSet"]["UserPatch%Patch_0"][20] = val
-        patch["paramSet"]["UserPatch%Patch_0"][21] = val
-        patch["paramSet"]["UserPatch%Patch_0"][22] = val
+_SOCKET_OPTION = click.option(
+    "--socket",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    envvar="TSL_PARSER_SOCKET",
+    help="Forward the command to the daemon listening on this socket, if any, "
+    "see the serve command.",
+)
 
-        patch["paramSet"]["UserPatch%Patch_0"][25] = val
 
-        tsl["data"][0].append(patch)
+@main.command()
+@click.argument("tsl-file", type=click.Path(exists=True, path_type=pathlib.Path))
+@click.option("-i", "--index", type=click.INT, help="Index of the patch")
+@click.option(
+    "--trusted",
+    is_flag=True,
+    help="Skip model validation, for files coming from Boss Tone Studio.",
+)
+@click.option(
+    "--cache",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    envvar="TSL_PARSER_CACHE",
+    help="Cache the decoded sections in this file. It holds pickles, only use "
+    "a file that you created.",
+)
+@_SOCKET_OPTION
+def decode(
+    tsl_file: Path,
+    index: int | None,
+    cache: Path | None,
+    socket: Path | None,
+    *,
+    trusted: bool,
+) -> None:
+    """Decode a TSL file and print it as JSON."""
+    from katana_tsl_parser.client import connect
+
+    client = connect(socket)
+    if client is not None:
+        with client:
+            output = client.request(
+                "decode", path=str(tsl_file.resolve()), index=index, trusted=trusted
+            )
+        click.echo(output)
+        return
+
+    from katana_tsl_parser.cache import SectionCache
+    from katana_tsl_parser.commands import decode_json
+
+    with ExitStack() as stack:
+        section_cache = None
+        if cache is not None:
+            section_cache = stack.enter_context(SectionCache(cache))
+
+        output = decode_json(tsl_file, index, trusted=trusted, cache=section_cache)
+
+    click.echo(output)
+
+
+@main.command()
+@click.argument(
+    "directory",
+    type=click.Path(exists=True, file_okay=False, path_type=pathlib.Path),
+)
+@click.option("-j", "--jobs", type=click.INT, help="Number of worker processes.")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    help="Write the decoded files as JSON in this directory.",
+)
+@click.option(
+    "--trusted",
+    is_flag=True,
+    help="Skip model validation, for files coming from Boss Tone Studio.",
+)
+@click.option(
+    "--cache",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    envvar="TSL_PARSER_CACHE",
+    help="Cache the decoded sections in this file. It holds pickles, only use "
+    "a file that you created.",
+)
+def batch(
+    directory: Path,
+    jobs: int | None,
+    output: Path | None,
+    cache: Path | None,
+    *,
+    trusted: bool,
+) -> None:
+    """Decode all the TSL files of a directory in parallel.
+
+    Compressed files, such as *.tsl.gz, are decoded too.
+    """
+    from katana_tsl_parser.batch import decode_many
+    from katana_tsl_parser.compression import CODECS
+
+    patterns = ["*.tsl", *(f"*.tsl{codec.suffix}" for codec in CODECS.values())]
+    paths = sorted(p for pattern in patterns for p in directory.rglob(pattern))
+    size = errors = 0
+
+    start = time.perf_counter()
+    results = decode_many(
+        paths, workers=jobs, trusted=trusted, as_json=True, cache=cache
+    )
+    for res in results:
+        size += res.path.stat().st_size
+        if res.error is not None:
+            errors += 1
+            click.echo(f"{res.path}: {res.error}", err=True)
+        elif output is not None:
+            name = res.path.relative_to(directory)
+            if name.suffix != ".tsl":
+                # Compressed, drop the suffix of the codec
+                name = name.with_suffix("")
+            dest = output / name.with_suffix(".json")
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_text(cast("str", res.value))
+    elapsed = time.perf_counter() - start
+
+    click.echo(
+        f"Decoded {len(paths) - errors}/{len(paths)} files ({size / 1e6:.1f} MB) "
+        f"in {elapsed:.2f}s, {len(paths) / elapsed:.1f} files/s, "
+        f"{size / 1e6 / elapsed:.1f} MB/s",
+        err=True,
+    )
+    if errors:
+        sys.exit(1)
+
+
+def parse_param(
+    ctx: click.Context,  # noqa: ARG001
+    param: click.Parameter,  # noqa: ARG001
+    values: tuple[str, ...],
+) -> dict[str, list[int | float | str]]:
+    """Parse `PATH[,PATH...]=VALUES` sweep parameters.
+
+    VALUES is a comma-separated list of numbers, enum names, booleans
+    (`true`/`false`, `on`/`off`) or inclusive ranges, `start:stop[:step]`,
+    of integers or of decimal numbers, e.g. `-12:12:0.5`.
+    """
+    res: dict[str, list[int | float | str]] = {}
+    for value in values:
+        paths, sep, items = value.partition("=")
+        if not sep or not items:
+            msg = f"expected PATH=VALUES, got {value!r}"
+            raise click.BadParameter(msg)
+
+        res[paths] = [v for item in items.split(",") for v in _parse_values(item)]
+
+    return res
+
+
+def _parse_values(item: str) -> list[int | float | str]:
+    if ":" in item:
+        return _parse_range(item)
+
+    try:
+        return [int(item)]
+    except ValueError:
+        pass
+    try:
+        return [float(item)]
+    except ValueError:
+        return [item]
+
+
+def _parse_range(item: str) -> list[int | float | str]:
+    try:
+        start, stop, *rest = map(_number, item.split(":"))
+        (step,) = rest or [1]
+    except ValueError:
+        step = 0
+    if not (step > 0 and math.isfinite(start) and math.isfinite(stop)):
+        msg = f"invalid range: {item!r}"
+        raise click.BadParameter(msg)
+
+    if isinstance(start, int) and isinstance(stop, int) and isinstance(step, int):
+        return list(range(start, stop + 1, step))
+
+    # Computed from the start, not accumulated, not to drift off the steps
+    count = math.floor((stop - start) / step + 1e-9) + 1
+    return [round(start + n * step, 9) for n in range(count)]
 
-    Path("patches.tsl").write_text(json.dumps(tsl))
 
+def _number(text: str) -> int | float:
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
 
-@click.command()
+
+@main.command()
 @click.argument("tsl-file", type=click.Path(exists=True, path_type=pathlib.Path))
-@click.option("-i", "--index", type=click.INT, help="Index of the patch")
-def main(tsl_file: Path, index: int | None) -> None:
-    tsl = TslModel.model_validate_json(tsl_file.read_text())
-
-    if index is not None:
-        n = len(tsl.data[0])
-        if index >= n:
-            msg = f"Invalid index: {n}"
-            raise ValueError(msg)
-        click.echo(tsl.data[0][index].model_dump_json(indent=2))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    required=True,
+    help="Write the variants to this TSL file, compressed if it ends with "
+    ".gz, .xz, .bz2 or .zst.",
+)
+@click.option(
+    "-p",
+    "--param",
+    "params",
+    multiple=True,
+    required=True,
+    callback=parse_param,
+    help="Values of a field, e.g. patch0.amp_gain=0:100:10 or "
+    "patch0.amp_eq_bass,patch0.amp_eq_middle=0,50,100.",
+)
+@click.option("-i", "--index", type=click.INT, default=0, help="Index of the patch")
+@click.option(
+    "--zip",
+    "zip_",
+    is_flag=True,
+    help="Vary the parameters together instead of taking all combinations.",
+)
+@click.option(
+    "--name",
+    help="Name of the variants, formatted with the values of the parameters "
+    "and the index of the variant, e.g. 'Gain {0}' or 'Sweep {n}'.",
+)
+def sweep(  # noqa: PLR0913
+    tsl_file: Path,
+    output: Path,
+    params: dict[str, list[int | float | str]],
+    index: int,
+    name: str | None,
+    *,
+    zip_: bool,
+) -> None:
+    """Generate variants of a patch with some parameters swept over values."""
+    from katana_tsl_parser.reader import TslStream, read_patch
+    from katana_tsl_parser.sweep import Sweep
+    from katana_tsl_parser.writer import write_tsl
+
+    with TslStream(tsl_file) as stream:
+        header = stream.header
+    patch = read_patch(tsl_file, index)
+    try:
+        variants = Sweep(patch, params, product=not zip_, name=name)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'-p' / '--param'") from e
+
+    start = time.perf_counter()
+    count = write_tsl(
+        output,
+        variants.iter_json(),
+        name=header["name"],
+        format_rev=header["formatRev"],
+        device=header["device"],
+    )
+    elapsed = time.perf_counter() - start
+
+    click.echo(f"Wrote {count} patches in {elapsed:.2f}s", err=True)
+
+
+@main.command()
+@click.argument("tsl-file", type=click.Path(exists=True, path_type=pathlib.Path))
+@click.argument("index", type=click.INT, required=False)
+@click.argument("other-index", type=click.INT, required=False)
+@click.option(
+    "--other",
+    type=click.Path(exists=True, path_type=pathlib.Path),
+    help="Take the second patch from this file.",
+)
+@_SOCKET_OPTION
+def diff(
+    tsl_file: Path,
+    index: int | None,
+    other_index: int | None,
+    other: Path | None,
+    socket: Path | None,
+) -> None:
+    """Show the fields that differ between two patches.
+
+    The patch at INDEX is compared to the one at OTHER_INDEX, which defaults to
+    the next patch, or to the same patch of the --other file. Without INDEX,
+    every patch is compared to the next one, or to the same patch of --other.
+    """
+    from katana_tsl_parser.client import connect
+
+    client = connect(socket)
+    if client is not None:
+        with client:
+            lines = client.request(
+                "diff",
+                path=str(tsl_file.resolve()),
+                index=index,
+                other_index=other_index,
+                other=str(other.resolve()) if other is not None else None,
+            )
     else:
-        click.echo(tsl.model_dump_json(indent=2))
+        from katana_tsl_parser.commands import diff_lines
+
+        lines = diff_lines(tsl_file, index, other_index, other)
+
+    for line in lines:
+        click.echo(line)
+
+
+@main.command()
+@click.argument("tsl-file", type=click.Path(exists=True, path_type=pathlib.Path))
+@click.argument("output", type=click.Path(dir_okay=False, path_type=pathlib.Path))
+def pack(tsl_file: Path, output: Path) -> None:
+    """Convert a TSL file to a packed library, see katana_tsl_parser.packed."""
+    from katana_tsl_parser.packed import pack_tsl
+
+    count = pack_tsl(tsl_file, output)
+    click.echo(
+        f"Packed {count} patches, {tsl_file.stat().st_size / 1e6:.1f} MB -> "
+        f"{output.stat().st_size / 1e6:.1f} MB",
+        err=True,
+    )
+
+
+@main.command()
+@click.argument("packed-file", type=click.Path(exists=True, path_type=pathlib.Path))
+@click.argument("output", type=click.Path(dir_okay=False, path_type=pathlib.Path))
+def unpack(packed_file: Path, output: Path) -> None:
+    """Convert a packed library back to a TSL file."""
+    from katana_tsl_parser.packed import unpack_tsl
+
+    count = unpack_tsl(packed_file, output)
+    click.echo(f"Unpacked {count} patches", err=True)
+
+
+@main.command()
+@click.option(
+    "--socket",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    envvar="TSL_PARSER_SOCKET",
+    required=True,
+    help="Listen on this Unix socket.",
+)
+@click.option(
+    "--cache",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    envvar="TSL_PARSER_CACHE",
+    help="Cache the decoded sections in this file. It holds pickles, only use "
+    "a file that you created.",
+)
+def serve(socket: Path, cache: Path | None) -> None:
+    """Keep the models warm and serve the decode and diff commands.
+
+    The other commands forward their requests to the daemon when --socket or
+    TSL_PARSER_SOCKET point to its socket, see katana_tsl_parser.server.
+    """
+    from katana_tsl_parser.cache import SectionCache
+    from katana_tsl_parser.server import serve as serve_forever
+
+    with ExitStack() as stack:
+        section_cache = None
+        if cache is not None:
+            section_cache = stack.enter_context(SectionCache(cache))
+
+        click.echo(f"Listening on {socket}", err=True)
+        with suppress(KeyboardInterrupt):
+            serve_forever(socket, cache=section_cache)
 
 
 if __name__ == "__main__":
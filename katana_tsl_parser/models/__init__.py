@@ -1,3 +1,10 @@
+import os
+
 from .tsl import TslModel
 
 __all__ = ["TslModel"]
+
+if os.environ.get("KATANA_TSL_INSTRUMENT"):
+    from katana_tsl_parser.instrumentation import install_from_env
+
+    install_from_env()
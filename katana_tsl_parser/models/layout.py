@@ -0,0 +1,429 @@
+import functools
+import linecache
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from enum import IntEnum
+from inspect import getattr_static
+from types import NoneType, UnionType
+from typing import Annotated, Any, NoReturn, Union, get_args, get_origin
+
+from annotated_types import Ge, Le, MultipleOf
+from pydantic.fields import FieldInfo
+
+from katana_tsl_parser.errors import ValueOutOfRangeError
+
+JsonDict = dict[str, Any]
+Decoder = Callable[[memoryview], JsonDict]
+Encoder = Callable[[Any, bytearray, int, int], None]
+Reader = Callable[[memoryview, Sequence[Callable[[Any], None]]], None]
+
+
+def decode_delay_time(values: Iterable[int]) -> int:
+    time = 0
+    for v in values:
+        time <<= 7
+        time += v
+
+    return time
+
+
+def encode_delay_time(time: int, width: int) -> bytes:
+    return bytes((time >> (7 * i)) & 0x7F for i in reversed(range(width)))
+
+
+class ByteTable(dict[int, Any]):
+    """The results of a conversion for all the 7-bit values, computed once.
+
+    TSL values are 7-bit, so the values of a one-byte field are looked up
+    rather than converted. The values the conversion rejects aren't in the
+    table: looking them up, like any byte above 127, calls the conversion,
+    which raises its usual error.
+    """
+
+    __slots__ = ("convert",)
+
+    def __init__(self, convert: Callable[[int], Any]) -> None:
+        super().__init__()
+        self.convert = convert
+        self.update(
+            (v, r) for v in range(128) if (r := _try(convert, v)) is not _INVALID
+        )
+
+    def __missing__(self, key: int) -> Any:  # noqa: ANN401
+        return self.convert(key)
+
+
+_INVALID = object()
+
+
+def _try(convert: Callable[[int], Any], v: int) -> Any:  # noqa: ANN401
+    try:
+        return convert(v)
+    except ValueError:
+        return _INVALID
+
+
+@functools.cache
+def byte_table(convert: Callable[[int], Any]) -> ByteTable:
+    """Return the shared table of a conversion, e.g. an enum or `Q.from_byte`."""
+    return ByteTable(convert)
+
+
+@dataclass(frozen=True, slots=True)
+class At:
+    """Position of a field in the raw bytes of a section.
+
+    Used as `Annotated` metadata on model fields. Unless `transform` is given,
+    the conversion is derived from the field type: `bool`, `IntEnum`, types
+    exposing `from_byte` and `to_byte` conversions, nested sections and 7-bit
+    multi-byte integers are handled. `shift` and `divisor` describe linear
+    conversions, `(byte + shift) / divisor`. The other conversions of single
+    bytes are looked up in a `byte_table()`, so `transform` must be pure.
+
+    `inverse` converts the value back to bytes and is required with a
+    `transform`.
+    """
+
+    offset: int
+    width: int | None = None
+    transform: Callable[[Any], Any] | None = None
+    shift: int = 0
+    divisor: float | None = None
+    inverse: Callable[[Any], Any] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class FieldSpec:
+    name: str
+    type_: Any
+    offset: int
+    width: int
+    transform: Callable[[Any], Any] | None
+    shift: int
+    divisor: float | None
+    inverse: Callable[[Any], Any] | None
+    ge: Any
+    le: Any
+    multiple_of: Any
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.width
+
+    @property
+    def is_section(self) -> bool:
+        return _is_section(self.type_)
+
+
+def strip_optional(annotation: Any) -> Any:  # noqa: ANN401
+    if get_origin(annotation) in (Union, UnionType):
+        args = [a for a in get_args(annotation) if a is not NoneType]
+        if len(args) == 1:
+            return args[0]
+
+    return annotation
+
+
+def _is_section(type_: Any) -> bool:  # noqa: ANN401
+    # Without compiling the decoder, see `TslSection`
+    return (
+        isinstance(type_, type)
+        and getattr_static(type_, "__tsl_decoder__", None) is not None
+    )
+
+
+def field_spec(name: str, info: FieldInfo) -> FieldSpec | None:
+    at = next((m for m in info.metadata if isinstance(m, At)), None)
+    if at is None:
+        return None
+
+    type_ = strip_optional(info.annotation)
+    metadata = list(info.metadata)
+    if get_origin(type_) is Annotated:
+        # The constraints of optional fields stay in their annotation
+        type_, *extra = get_args(type_)
+        for m in extra:
+            metadata += m.metadata if isinstance(m, FieldInfo) else [m]
+
+    width = at.width
+    if width is None:
+        width = min(type_.__tsl_layout__.sizes) if _is_section(type_) else 1
+
+    ge = next((m.ge for m in metadata if isinstance(m, Ge)), None)
+    le = next((m.le for m in metadata if isinstance(m, Le)), None)
+    multiple_of = next(
+        (m.multiple_of for m in metadata if isinstance(m, MultipleOf)), None
+    )
+
+    return FieldSpec(
+        name=name,
+        type_=type_,
+        offset=at.offset,
+        width=width,
+        transform=at.transform,
+        shift=at.shift,
+        divisor=at.divisor,
+        inverse=at.inverse,
+        ge=ge,
+        le=le,
+        multiple_of=multiple_of,
+    )
+
+
+def _expression(
+    spec: FieldSpec, namespace: dict[str, Any], *, trusted: bool = False
+) -> str:
+    expr = _conversion(spec, namespace, trusted=trusted)
+    if not trusted:
+        return expr
+
+    if not _is_section(spec.type_) and hasattr(spec.type_, "validate"):
+        expr = f"{_ref(namespace, spec.type_.validate)}({expr})"
+
+    if spec.ge is None and spec.le is None:
+        return expr
+
+    fail = _ref(namespace, _out_of_range)
+    check = f"(v := {expr})"
+    if spec.ge is not None:
+        check = f"{spec.ge!r} <= {check}"
+    if spec.le is not None:
+        check = f"{check} <= {spec.le!r}"
+
+    return f"v if {check} else {fail}({spec.name!r}, v, {spec.ge!r}, {spec.le!r})"
+
+
+def _ref(namespace: dict[str, Any], obj: Any) -> str:  # noqa: ANN401
+    symbol = f"_{len(namespace)}"
+    namespace[symbol] = obj
+    return symbol
+
+
+def _out_of_range(
+    name: str, value: float, ge: float | None, le: float | None
+) -> NoReturn:
+    raise ValueOutOfRangeError(name, value, ge, le)
+
+
+def _conversion(  # noqa: C901, PLR0911
+    spec: FieldSpec, namespace: dict[str, Any], *, trusted: bool
+) -> str:
+    arg = f"d[{spec.offset}]" if spec.width == 1 else f"d[{spec.offset}:{spec.end}]"
+
+    def ref(obj: Any) -> str:  # noqa: ANN401
+        return _ref(namespace, obj)
+
+    def table(convert: Callable[[int], Any]) -> str:
+        return f"{ref(byte_table(convert))}[{arg}]"
+
+    type_ = spec.type_
+    if spec.transform is not None:
+        if spec.width == 1:
+            return table(spec.transform)
+        return f"{ref(spec.transform)}({arg})"
+    if _is_section(type_):
+        if trusted:
+            # The slice has the right size, skip straight to the decoder
+            decoder = ref(type_.__tsl_trusted_decoder__)
+            return f"{ref(type_._construct)}({decoder}({arg}))"  # noqa: SLF001
+        return f"{ref(type_.decode_tsl)}({arg})"
+    if spec.width > 1:
+        return f"{ref(decode_delay_time)}({arg})"
+    if type_ is bool:
+        return f"{arg} > 0"
+    if hasattr(type_, "from_byte"):
+        return table(type_.from_byte)
+    if (
+        isinstance(type_, type)
+        and issubclass(type_, (IntEnum, int, float))
+        and type_ not in (int, float)
+    ):
+        return table(type_)
+
+    expr = f"{arg} + {spec.shift}" if spec.shift else arg
+    if spec.divisor is not None:
+        return f"({expr}) / {spec.divisor!r}"
+
+    return expr
+
+
+def _exec(source: str, filename: str, namespace: dict[str, Any]) -> None:
+    # Register the source, so that it shows in tracebacks
+    lines = source.splitlines(keepends=True)
+    linecache.cache[filename] = (len(source), None, lines, filename)
+    exec(compile(source, filename, "exec"), namespace)  # noqa: S102
+
+
+def compile_decoder(
+    qualname: str, specs: tuple[FieldSpec, ...], size: int, *, trusted: bool = False
+) -> Decoder:
+    """Generate a decoder function specialized for a section layout.
+
+    Fields that lie beyond `size`, the smallest valid length of the section,
+    are only decoded when the values are long enough to contain them.
+
+    The output holds the source bytes under `_raw`, which `_construct()` and
+    pydantic store as a private attribute.
+
+    A `trusted` decoder checks the field constraints itself and builds nested
+    sections with `construct_tsl()`, so that its output can be used without
+    going through pydantic validation.
+    """
+    namespace: dict[str, Any] = {}
+
+    required = [s for s in specs if s.end <= size]
+    optional: dict[int, list[FieldSpec]] = {}
+    for spec in specs:
+        if spec.end > size:
+            optional.setdefault(spec.end, []).append(spec)
+
+    # Decoded sections keep a view on their bytes, to be encoded losslessly
+    lines = ["def decode(d):", "    r = {", "        '_raw': d,"]
+    lines += [
+        f"        {s.name!r}: {_expression(s, namespace, trusted=trusted)},"
+        for s in required
+    ]
+    lines.append("    }")
+    for end, group in sorted(optional.items()):
+        lines.append(f"    if len(d) >= {end}:")
+        lines += [
+            f"        r[{s.name!r}] = {_expression(s, namespace, trusted=trusted)}"
+            for s in group
+        ]
+    lines.append("    return r")
+
+    kind = "trusted decoder" if trusted else "decoder"
+    source = "\n".join(lines) + "\n"
+    filename = f"<tsl {kind} {qualname}>"
+    _exec(source, filename, namespace)
+
+    decoder: Decoder = namespace["decode"]
+    decoder.__qualname__ = f"{qualname}.<{kind}>"
+
+    return decoder
+
+
+def _encoding(spec: FieldSpec, namespace: dict[str, Any]) -> str:
+    """Return the statement writing the value `v` of a field to `b`."""
+    if spec.width == 1:
+        target = f"b[base + {spec.offset}]"
+    else:
+        target = f"b[base + {spec.offset}:base + {spec.end}]"
+
+    def ref(obj: Any) -> str:  # noqa: ANN401
+        return _ref(namespace, obj)
+
+    type_ = spec.type_
+    if spec.transform is not None:
+        if spec.inverse is None:
+            msg = f"{spec.name}: a transform requires an inverse to encode"
+            raise TypeError(msg)
+        return f"{target} = {ref(spec.inverse)}(v)"
+    if _is_section(type_):
+        encoder = ref(type_.__tsl_encoder__)
+        return f"{encoder}(v, b, base + {spec.offset}, base + {spec.end})"
+    if spec.width > 1:
+        return f"{target} = {ref(encode_delay_time)}(v, {spec.width})"
+    if hasattr(type_, "to_byte"):
+        return f"{target} = {ref(type_.to_byte)}(v)"
+
+    expr = "v"
+    if spec.divisor is not None:
+        expr = f"round(v * {spec.divisor!r})"
+    if spec.shift:
+        expr = f"{expr} - {spec.shift}"
+
+    return f"{target} = {expr}"
+
+
+def compile_encoder(qualname: str, specs: tuple[FieldSpec, ...], size: int) -> Encoder:
+    """Generate the inverse of `compile_decoder()`.
+
+    The encoder writes the fields of a section to `b[base:end]`, the bytes
+    that aren't described by the layout are left untouched. Optional fields
+    are skipped when they are `None` or when they lie beyond `end`.
+    """
+    namespace: dict[str, Any] = {}
+
+    lines = ["def encode(o, b, base, end):"]
+    for spec in specs:
+        statement = _encoding(spec, namespace)
+        if spec.end > size:
+            lines += [
+                f"    if end - base >= {spec.end}:",
+                f"        v = o.{spec.name}",
+                "        if v is not None:",
+                f"            {statement}",
+            ]
+        else:
+            lines += [f"    v = o.{spec.name}", f"    {statement}"]
+    if not specs:
+        lines.append("    pass")
+
+    source = "\n".join(lines) + "\n"
+    filename = f"<tsl encoder {qualname}>"
+    _exec(source, filename, namespace)
+
+    encoder: Encoder = namespace["encode"]
+    encoder.__qualname__ = f"{qualname}.<encoder>"
+
+    return encoder
+
+
+def _column_expression(spec: FieldSpec, namespace: dict[str, Any]) -> str:
+    type_ = spec.type_
+    if (
+        spec.transform is None
+        and isinstance(type_, type)
+        and issubclass(type_, IntEnum)
+    ):
+        # Enums are kept as their codes
+        return f"d[{spec.offset}]"
+    if type_ is bool:
+        return f"d[{spec.offset}] > 0"
+
+    return _conversion(spec, namespace, trusted=False)
+
+
+def compile_reader(
+    qualname: str,
+    columns: Sequence[tuple[FieldSpec, int]],
+    size: int,
+    missing: Any,  # noqa: ANN401
+) -> Reader:
+    """Generate a function appending the fields of a section to columns.
+
+    `columns` holds the specs of scalar fields, possibly of nested sections,
+    with their offset in the section. The reader gets the bytes of a section
+    and the `append` methods of the columns, in the same order. Enums are
+    appended as their codes and the values are not checked. Fields that lie
+    beyond the bytes, past `size`, get `missing` instead.
+    """
+    namespace: dict[str, Any] = {"missing": missing}
+
+    lines = ["def read(d, a):"]
+    if columns:
+        lines.append(f"    {', '.join(f'a{n}' for n in range(len(columns)))}, = a")
+    for n, (spec, offset) in enumerate(columns):
+        spec_at = replace(spec, offset=offset)
+        expr = _column_expression(spec_at, namespace)
+        if spec_at.end > size:
+            lines += [
+                f"    if len(d) >= {spec_at.end}:",
+                f"        a{n}({expr})",
+                "    else:",
+                f"        a{n}(missing)",
+            ]
+        else:
+            lines.append(f"    a{n}({expr})")
+    if not columns:
+        lines.append("    pass")
+
+    source = "\n".join(lines) + "\n"
+    filename = f"<tsl reader {qualname}>"
+    _exec(source, filename, namespace)
+
+    reader: Reader = namespace["read"]
+    reader.__qualname__ = f"{qualname}.<reader>"
+
+    return reader
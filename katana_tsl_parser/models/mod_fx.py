@@ -1,3 +1,5 @@
+from typing import Annotated, cast
+
 from pydantic import Field
 
 from .enums import (
@@ -25,819 +27,402 @@ from .enums import (
     WahMode,
     WaveSynthType,
 )
+from .layout import At
 from .types import (
     Gain20dB,
-    JsonDict,
     Percent,
     Pitch,
     Q,
     ToggleablePercent,
-    TslObject,
-    decode_delay_time,
-    i,
+    TslLazySection,
+    TslSection,
 )
 
 
-class TWahModel(TslObject):
-    mode: WahMode
-    polarity: Polarity
-    sens: Percent
-    frequency: Percent
-    peak: Percent
-    direct_mix: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "mode": i(values[0]),
-            "polarity": i(values[1]),
-            "sens": i(values[2]),
-            "frequency": i(values[3]),
-            "peak": i(values[4]),
-            "direct_mix": i(values[5]),
-            "level": i(values[6]),
-        }
-
-
-class AutoWahModel(TslObject):
-    mode: WahMode
-    frequency: Percent
-    peak: Percent
-    rate: Percent
-    depth: Percent
-    direct_mix: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "mode": i(values[0]),
-            "frequency": i(values[1]),
-            "peak": i(values[2]),
-            "rate": i(values[3]),
-            "depth": i(values[4]),
-            "direct_mix": i(values[5]),
-            "level": i(values[6]),
-        }
-
-
-class PedalWahModel(TslObject):
-    type_: PedalWahType
-    pedal_pos: Percent
-    pedal_min: Percent
-    pedal_max: Percent
-    level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "type_": i(values[0]),
-            "pedal_pos": i(values[1]),
-            "pedal_min": i(values[2]),
-            "pedal_max": i(values[3]),
-            "level": i(values[4]),
-            "direct_mix": i(values[5]),
-        }
-
-
-class CompressorModel(TslObject):
-    type_: CompressorType
-    sustain: Percent
-    attack: Percent
-    tone: int
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "type_": CompressorType(i(values[0])),
-            "sustain": i(values[1]),
-            "attack": i(values[2]),
-            "tone": i(values[3]) - 50,
-            "level": i(values[4]),
-        }
-
-
-class LimiterModel(TslObject):
-    type_: LimiterType
-    attack: Percent
-    threshold: Percent
-    ratio: Ratio
-    release: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "type_": LimiterType(i(values[0])),
-            "attack": i(values[1]),
-            "threshold": i(values[2]),
-            "ratio": Ratio(i(values[3])),
-            "release": i(values[4]),
-            "level": i(values[5]),
-        }
-
-
-class GraphicEqModel(TslObject):
-    bar_31: Gain20dB
-    bar_62: Gain20dB
-    bar_125: Gain20dB
-    bar_250: Gain20dB
-    bar_500: Gain20dB
-    bar_1000: Gain20dB
-    bar_2000: Gain20dB
-    bar_4000: Gain20dB
-    bar_8000: Gain20dB
-    bar_16000: Gain20dB
-    bar_level: Gain20dB
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "bar_31": Gain20dB.parse(values[0]),
-            "bar_62": Gain20dB.parse(values[1]),
-            "bar_125": Gain20dB.parse(values[2]),
-            "bar_250": Gain20dB.parse(values[3]),
-            "bar_500": Gain20dB.parse(values[4]),
-            "bar_1000": Gain20dB.parse(values[5]),
-            "bar_2000": Gain20dB.parse(values[6]),
-            "bar_4000": Gain20dB.parse(values[7]),
-            "bar_8000": Gain20dB.parse(values[8]),
-            "bar_16000": Gain20dB.parse(values[9]),
-            "bar_level": Gain20dB.parse(values[10]),
-        }
-
-
-class ParametricEqModel(TslObject):
-    low_cut: LowCutFreq
-    low_gain: Gain20dB
-    low_mid_freq: MidFreq
-    low_mid_q: float
-    low_mid_gain: Gain20dB
-    high_mid_freq: MidFreq
-    high_mid_q: float
-    high_mid_gain: Gain20dB
-    high_gain: Gain20dB
-    high_cut: HighCutFreq
-    level: Gain20dB
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "low_cut": i(values[0]),
-            "low_gain": Gain20dB.parse(values[1]),
-            "low_mid_freq": i(values[2]),
-            "low_mid_q": Q.parse(values[3]),
-            "low_mid_gain": Gain20dB.parse(values[4]),
-            "high_mid_freq": i(values[5]),
-            "high_mid_q": Q.parse(values[6]),
-            "high_mid_gain": Gain20dB.parse(values[7]),
-            "high_gain": Gain20dB.parse(values[8]),
-            "high_cut": i(values[9]),
-            "level": Gain20dB.parse(values[10]),
-        }
-
-
-class GuitarSimModel(TslObject):
-    type_: GuitarSimType
-    low: int = Field(ge=-50, le=50)
-    high: int = Field(ge=-50, le=50)
-    level: Percent
-    body: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "type_": i(values[0]),
-            "low": i(values[1]) - 50,
-            "high": i(values[2]) - 50,
-            "level": i(values[3]),
-            "body": i(values[4]),
-        }
-
-
-class SlowGearModel(TslObject):
-    sens: Percent
-    rise_time: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "sens": i(values[0]),
-            "rise_time": i(values[1]),
-            "level": i(values[2]),
-        }
-
-
-class WaveSynthModel(TslObject):
-    type_: WaveSynthType
-    cutoff: Percent
-    resonance: Percent
-    level: Percent
-    filter_sens: Percent
-    filter_decay: Percent
-    filter_depth: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "type_": i(values[0]),
-            "cutoff": i(values[1]),
-            "resonance": i(values[2]),
-            "filter_sens": i(values[3]),
-            "filter_decay": i(values[4]),
-            "filter_depth": i(values[5]),
-            "level": i(values[6]),
-            "direct_mix": i(values[7]),
-        }
-
-
-class OctaveModel(TslObject):
-    range_: int = Field(ge=1, le=4)
-    level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "range_": i(values[0]) + 1,
-            "level": i(values[1]),
-            "direct_mix": i(values[2]),
-        }
-
-
-class PitchShifterModel(TslObject):
-    voice: VoiceType
-    ps1_mode: PitchShifterMode
-    ps1_pitch: Pitch
-    ps1_fine: int = Field(ge=-50, le=50)
-    ps1_pre_delay: int = Field(ge=0, le=300)
-    ps1_level: Percent
-    ps1_feedback: Percent
-    ps2_mode: PitchShifterMode
-    ps2_pitch: Pitch
-    ps2_fine: int = Field(ge=-50, le=50)
-    ps2_pre_delay: int = Field(ge=0, le=300)
-    ps2_level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 15)
-
-        return {
-            "voice": i(values[0]),
-            "ps1_mode": i(values[1]),
-            "ps1_pitch": Pitch.parse(values[2]),
-            "ps1_fine": i(values[3]) - 50,
-            "ps1_pre_delay": decode_delay_time(values[4:6]),
-            "ps1_level": i(values[6]),
-            "ps2_mode": i(values[7]),
-            "ps2_pitch": Pitch.parse(values[8]),
-            "ps2_fine": i(values[9]) - 50,
-            "ps2_pre_delay": decode_delay_time(values[10:12]),
-            "ps2_level": i(values[12]),
-            "ps1_feedback": i(values[13]),
-            "direct_mix": i(values[14]),
-        }
-
-
-class HarmonistUserSettings(TslObject):
-    e: Pitch
-    f: Pitch
-    f_sharp: Pitch
-    g: Pitch
-    a_flat: Pitch
-    a: Pitch
-    b_flat: Pitch
-    b: Pitch
-    c: Pitch
-    d_flat: Pitch
-    d: Pitch
-    e_flat: Pitch
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "e": Pitch.parse(values[0]),
-            "f": Pitch.parse(values[1]),
-            "f_sharp": Pitch.parse(values[2]),
-            "g": Pitch.parse(values[3]),
-            "a_flat": Pitch.parse(values[4]),
-            "a": Pitch.parse(values[5]),
-            "b_flat": Pitch.parse(values[6]),
-            "b": Pitch.parse(values[7]),
-            "c": Pitch.parse(values[8]),
-            "d_flat": Pitch.parse(values[9]),
-            "d": Pitch.parse(values[10]),
-            "e_flat": Pitch.parse(values[11]),
-        }
-
-
-class HarmonistModel(TslObject):
-    voice: VoiceType
-    hr1_mode: Harmony
-    hr1_level: Percent
-    hr1_pre_delay: int = Field(ge=0, le=300)
-    hr1_feedback: Percent
-    hr2_mode: Harmony
-    hr2_level: Percent
-    hr2_pre_delay: int = Field(ge=0, le=300)
-    direct_mix: Percent
-    hr1_user: HarmonistUserSettings
-    hr2_user: HarmonistUserSettings
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 35)
-
-        return {
-            "voice": i(values[0]),
-            "hr1_mode": Harmony(i(values[1])),
-            "hr1_pre_delay": decode_delay_time(values[2:4]),
-            "hr1_level": i(values[4]),
-            "hr2_mode": Harmony(i(values[5])),
-            "hr2_pre_delay": decode_delay_time(values[6:8]),
-            "hr2_level": i(values[8]),
-            "hr1_feedback": i(values[9]),
-            "direct_mix": i(values[10]),
-            "hr1_user": HarmonistUserSettings.decode_tsl(values[11:23]),
-            "hr2_user": HarmonistUserSettings.decode_tsl(values[23:35]),
-        }
-
-
-class AcProcessorModel(TslObject):
-    type_: AcProcessorType
-    bass: int = Field(ge=-50, le=50)
-    middle: int = Field(ge=-50, le=50)
-    middle_freq: MidFreq
-    treble: int = Field(ge=-50, le=50)
-    presence: int = Field(ge=-50, le=50)
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "type_": i(values[0]),
-            "bass": i(values[1]) - 50,
-            "middle": i(values[2]) - 50,
-            "middle_freq": i(values[3]),
-            "treble": i(values[4]) - 50,
-            "presence": i(values[5]) - 50,
-            "level": i(values[6]),
-        }
-
-
-class PhaserModel(TslObject):
-    type_: PhaserType
-    rate: Percent
-    depth: Percent
-    manual: Percent
-    resonance: Percent
-    step_rate: ToggleablePercent
-    level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "type_": i(values[0]),
-            "rate": i(values[1]),
-            "depth": i(values[2]),
-            "manual": i(values[3]),
-            "resonance": i(values[4]),
-            "step_rate": ToggleablePercent(i(values[5])),
-            "direct_mix": i(values[6]),
-            "level": i(values[7]),
-        }
-
-
-class FlangerModel(TslObject):
-    rate: Percent
-    depth: Percent
-    manual: Percent
-    resonance: Percent
-    low_cut: LowCutFreq
-    level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "rate": i(values[0]),
-            "depth": i(values[1]),
-            "manual": i(values[2]),
-            "resonance": i(values[3]),
-            "low_cut": LowCutFreq(i(values[4])),
-            "direct_mix": i(values[5]),
-            "level": i(values[6]),
-        }
-
-
-class TremoloModel(TslObject):
-    wave_shape: Percent
-    rate: Percent
-    depth: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "wave_shape": i(values[0]),
-            "rate": i(values[1]),
-            "depth": i(values[2]),
-            "level": i(values[3]),
-        }
-
-
-class RotaryModel(TslObject):
-    rate: Percent
-    depth: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 5)
-
-        return {
-            "rate": i(values[0]),
-            # TODO: 1-2
-            "depth": i(values[3]),
-            "level": i(values[4]),
-        }
-
-
-class UniVModel(TslObject):
-    rate: Percent
-    depth: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "rate": i(values[0]),
-            "depth": i(values[1]),
-            "level": i(values[2]),
-        }
-
-
-class SlicerModel(TslObject):
-    pattern: int = Field(ge=1, le=20)
-    rate: Percent
-    trigger_sens: Percent
-    level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "pattern": i(values[0]) + 1,
-            "rate": i(values[1]),
-            "trigger_sens": i(values[2]),
-            "level": i(values[3]),
-            "direct_mix": i(values[4]),
-        }
-
-
-class VibratoModel(TslObject):
-    rate: Percent
-    depth: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 5)
-
-        return {
-            "rate": i(values[0]),
-            # TODO: 1-2
-            "depth": i(values[1]),
-            "level": i(values[4]),
-        }
-
-
-class RingModModel(TslObject):
-    type_: RingModMode
-    frequency: Percent
-    level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "type_": i(values[0]),
-            "frequency": i(values[1]),
-            "level": i(values[2]),
-            "direct_mix": i(values[3]),
-        }
-
-
-class HumanizerModel(TslObject):
-    mode: HumanizerMode
-    vowel1: Vowel
-    vowel2: Vowel
-    rate: Percent
-    depth: Percent
-    sens: Percent
-    manual: Percent
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "mode": i(values[0]),
-            "vowel1": i(values[1]),
-            "vowel2": i(values[2]),
-            "sens": i(values[3]),
-            "rate": i(values[4]),
-            "depth": i(values[5]),
-            "manual": i(values[6]),
-            "level": i(values[7]),
-        }
-
-
-class ChorusModel(TslObject):
-    crossover_frequency: CrossoverFreq
-    low_rate: Percent
-    low_depth: Percent
-    low_pre_delay: float = Field(ge=0, le=40, multiple_of=0.5)
-    low_level: Percent
-    high_rate: Percent
-    high_depth: Percent
-    high_pre_delay: float = Field(ge=0, le=40, multiple_of=0.5)
-    high_level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "crossover_frequency": i(values[0]),
-            "low_rate": i(values[1]),
-            "low_depth": i(values[2]),
-            "low_pre_delay": i(values[3]) * 0.5,
-            "low_level": i(values[4]),
-            "high_rate": i(values[5]),
-            "high_depth": i(values[6]),
-            "high_pre_delay": i(values[7]) * 0.5,
-            "high_level": i(values[8]),
-            "direct_mix": i(values[9]),
-        }
-
-
-class AcGuitarSimModel(TslObject):
-    body: Percent
-    low: int = Field(ge=-50, le=50)
-    high: int = Field(ge=-50, le=50)
-    level: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 5)
-
-        return {
-            "high": i(values[0]) - 50,
-            "body": i(values[1]),
-            "low": i(values[2]) - 50,
-            # TODO: 3
-            "level": i(values[4]),
-        }
-
-
-class Phaser90EModel(TslObject):
-    script_on: bool
-    speed: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "script_on": i(values[0]) > 0,
-            "speed": i(values[1]),
-        }
-
-
-class Flanger117EModel(TslObject):
-    manual: Percent
-    width: Percent
-    speed: Percent
-    regen: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "manual": i(values[0]),
-            "width": i(values[1]),
-            "speed": i(values[2]),
-            "regen": i(values[3]),
-        }
-
-
-class Wah95EModel(TslObject):
-    pedal_pos: Percent
-    pedal_min: Percent
-    pedal_max: Percent
-    level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "pedal_pos": i(values[0]),
-            "pedal_min": i(values[1]),
-            "pedal_max": i(values[2]),
-            "level": i(values[3]),
-            "direct_mix": i(values[4]),
-        }
-
-
-class DelayChorus30Model(TslObject):
-    type_: DelayChorusType
-    chorus_intensity: Percent
-    echo_repeat_rate: int = Field(ge=0, le=600)
-    echo_intensity: Percent
-    echo_volume: Percent
-    input_volume: Percent
-    tone: Percent
-    output: DelayChorusOutput
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, len(cls._get_fields()) + 1)
-
-        return {
-            "type_": i(values[0]),
-            "chorus_intensity": i(values[2]),
-            "echo_repeat_rate": decode_delay_time(values[3:5]),
-            "echo_intensity": i(values[5]),
-            "echo_volume": i(values[6]),
-            "tone": i(values[7]),
-            "input_volume": i(values[1]),
-            "output": i(values[8]),
-        }
-
-
-class HeavyOctaveModel(TslObject):
-    level_1_oct: Percent
-    level_2_oct: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "level_1_oct": i(values[0]),
-            "level_2_oct": i(values[1]),
-            "direct_mix": i(values[2]),
-        }
-
-
-class PedalBendModel(TslObject):
-    pedal_pos: Percent
-    pitch: Pitch
-    level: Percent
-    direct_mix: Percent
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "pitch": Pitch.parse(values[0]),
-            "pedal_pos": i(values[1]),
-            "level": i(values[2]),
-            "direct_mix": i(values[3]),
-        }
-
-
-class FxModel(TslObject):
-    on: bool
-    type_: ModFxType
-    t_wah: TWahModel
-    auto_wah: AutoWahModel
-    pedal_wah: PedalWahModel
-    compressor: CompressorModel
-    limiter: LimiterModel
-    graphic_eq: GraphicEqModel
-    parametric_eq: ParametricEqModel
-    guitar_sim: GuitarSimModel
-    slow_gear: SlowGearModel
-    wave_synth: WaveSynthModel
-    octave: OctaveModel
-    pitch_shifter: PitchShifterModel
-    harmonist: HarmonistModel
-    ac_processor: AcProcessorModel
-    phaser: PhaserModel
-    flanger: FlangerModel
-    tremolo: TremoloModel
-    rotary: RotaryModel
-    uni_v: UniVModel
-    slicer: SlicerModel
-    vibrato: VibratoModel
-    ring_mod: RingModModel
-    humanizer: HumanizerModel
-    chorus: ChorusModel
-    ac_guitar_sim: AcGuitarSimModel
-    phaser_90e: Phaser90EModel
-    flanger_117e: Flanger117EModel
-    wah_95e: Wah95EModel
-    dc30: DelayChorus30Model
-    heavy_octave: HeavyOctaveModel
-    pedal_bend: PedalBendModel | None = None
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, (221, 225))
-
-        res = {
-            "on": i(values[0]) > 0,
-            "type_": ModFxType(i(values[1])),
-            "t_wah": TWahModel.decode_tsl(values[2:9]),
-            "auto_wah": AutoWahModel.decode_tsl(values[9:16]),
-            "pedal_wah": PedalWahModel.decode_tsl(values[16:22]),
-            "compressor": CompressorModel.decode_tsl(values[22:27]),
-            "limiter": LimiterModel.decode_tsl(values[27:33]),
-            "graphic_eq": GraphicEqModel.decode_tsl(values[33:44]),
-            "parametric_eq": ParametricEqModel.decode_tsl(values[44:55]),
-            "guitar_sim": GuitarSimModel.decode_tsl(values[55:60]),
-            "slow_gear": SlowGearModel.decode_tsl(values[60:63]),
-            "wave_synth": WaveSynthModel.decode_tsl(values[63:71]),
-            "octave": OctaveModel.decode_tsl(values[71:74]),
-            "pitch_shifter": PitchShifterModel.decode_tsl(values[74:89]),
-            "harmonist": HarmonistModel.decode_tsl(values[89:124]),
-            "ac_processor": AcProcessorModel.decode_tsl(values[124:131]),
-            "phaser": PhaserModel.decode_tsl(values[131:139]),
-            "flanger": FlangerModel.decode_tsl(values[139:146]),
-            # TODO: 146
-            "tremolo": TremoloModel.decode_tsl(values[147:151]),
-            # TODO: 151-152
-            "rotary": RotaryModel.decode_tsl(values[153:158]),
-            "uni_v": UniVModel.decode_tsl(values[158:161]),
-            "slicer": SlicerModel.decode_tsl(values[161:166]),
-            "vibrato": VibratoModel.decode_tsl(values[166:171]),
-            "ring_mod": RingModModel.decode_tsl(values[171:175]),
-            "humanizer": HumanizerModel.decode_tsl(values[175:183]),
-            "chorus": ChorusModel.decode_tsl(values[183:193]),
-            "ac_guitar_sim": AcGuitarSimModel.decode_tsl(values[193:198]),
-            "phaser_90e": Phaser90EModel.decode_tsl(values[198:200]),
-            "flanger_117e": Flanger117EModel.decode_tsl(values[200:204]),
-            "wah_95e": Wah95EModel.decode_tsl(values[204:209]),
-            "dc30": DelayChorus30Model.decode_tsl(values[209:218]),
-            "heavy_octave": HeavyOctaveModel.decode_tsl(values[218:221]),
-        }
-
-        if len(values) == 225:  # noqa: PLR2004
-            res["pedal_bend"] = PedalBendModel.decode_tsl(values[221:])
-
-        return res
+class TWahModel(TslSection):
+    mode: Annotated[WahMode, At(0)]
+    polarity: Annotated[Polarity, At(1)]
+    sens: Annotated[Percent, At(2)]
+    frequency: Annotated[Percent, At(3)]
+    peak: Annotated[Percent, At(4)]
+    direct_mix: Annotated[Percent, At(5)]
+    level: Annotated[Percent, At(6)]
+
+
+class AutoWahModel(TslSection):
+    mode: Annotated[WahMode, At(0)]
+    frequency: Annotated[Percent, At(1)]
+    peak: Annotated[Percent, At(2)]
+    rate: Annotated[Percent, At(3)]
+    depth: Annotated[Percent, At(4)]
+    direct_mix: Annotated[Percent, At(5)]
+    level: Annotated[Percent, At(6)]
+
+
+class PedalWahModel(TslSection):
+    type_: Annotated[PedalWahType, At(0)]
+    pedal_pos: Annotated[Percent, At(1)]
+    pedal_min: Annotated[Percent, At(2)]
+    pedal_max: Annotated[Percent, At(3)]
+    level: Annotated[Percent, At(4)]
+    direct_mix: Annotated[Percent, At(5)]
+
+
+class CompressorModel(TslSection):
+    type_: Annotated[CompressorType, At(0)]
+    sustain: Annotated[Percent, At(1)]
+    attack: Annotated[Percent, At(2)]
+    tone: Annotated[int, At(3, shift=-50)]
+    level: Annotated[Percent, At(4)]
+
+
+class LimiterModel(TslSection):
+    type_: Annotated[LimiterType, At(0)]
+    attack: Annotated[Percent, At(1)]
+    threshold: Annotated[Percent, At(2)]
+    ratio: Annotated[Ratio, At(3)]
+    release: Annotated[Percent, At(4)]
+    level: Annotated[Percent, At(5)]
+
+
+class GraphicEqModel(TslSection):
+    bar_31: Annotated[Gain20dB, At(0)]
+    bar_62: Annotated[Gain20dB, At(1)]
+    bar_125: Annotated[Gain20dB, At(2)]
+    bar_250: Annotated[Gain20dB, At(3)]
+    bar_500: Annotated[Gain20dB, At(4)]
+    bar_1000: Annotated[Gain20dB, At(5)]
+    bar_2000: Annotated[Gain20dB, At(6)]
+    bar_4000: Annotated[Gain20dB, At(7)]
+    bar_8000: Annotated[Gain20dB, At(8)]
+    bar_16000: Annotated[Gain20dB, At(9)]
+    bar_level: Annotated[Gain20dB, At(10)]
+
+
+class ParametricEqModel(TslSection):
+    low_cut: Annotated[LowCutFreq, At(0)]
+    low_gain: Annotated[Gain20dB, At(1)]
+    low_mid_freq: Annotated[MidFreq, At(2)]
+    low_mid_q: Annotated[float, At(3, transform=Q.from_byte, inverse=Q.to_byte)]
+    low_mid_gain: Annotated[Gain20dB, At(4)]
+    high_mid_freq: Annotated[MidFreq, At(5)]
+    high_mid_q: Annotated[float, At(6, transform=Q.from_byte, inverse=Q.to_byte)]
+    high_mid_gain: Annotated[Gain20dB, At(7)]
+    high_gain: Annotated[Gain20dB, At(8)]
+    high_cut: Annotated[HighCutFreq, At(9)]
+    level: Annotated[Gain20dB, At(10)]
+
+
+class GuitarSimModel(TslSection):
+    type_: Annotated[GuitarSimType, At(0)]
+    low: Annotated[int, At(1, shift=-50)] = Field(ge=-50, le=50)
+    high: Annotated[int, At(2, shift=-50)] = Field(ge=-50, le=50)
+    level: Annotated[Percent, At(3)]
+    body: Annotated[Percent, At(4)]
+
+
+class SlowGearModel(TslSection):
+    sens: Annotated[Percent, At(0)]
+    rise_time: Annotated[Percent, At(1)]
+    level: Annotated[Percent, At(2)]
+
+
+class WaveSynthModel(TslSection):
+    type_: Annotated[WaveSynthType, At(0)]
+    cutoff: Annotated[Percent, At(1)]
+    resonance: Annotated[Percent, At(2)]
+    level: Annotated[Percent, At(6)]
+    filter_sens: Annotated[Percent, At(3)]
+    filter_decay: Annotated[Percent, At(4)]
+    filter_depth: Annotated[Percent, At(5)]
+    direct_mix: Annotated[Percent, At(7)]
+
+
+class OctaveModel(TslSection):
+    range_: Annotated[int, At(0, shift=1)] = Field(ge=1, le=4)
+    level: Annotated[Percent, At(1)]
+    direct_mix: Annotated[Percent, At(2)]
+
+
+class PitchShifterModel(TslSection):
+    voice: Annotated[VoiceType, At(0)]
+    ps1_mode: Annotated[PitchShifterMode, At(1)]
+    ps1_pitch: Annotated[Pitch, At(2)]
+    ps1_fine: Annotated[int, At(3, shift=-50)] = Field(ge=-50, le=50)
+    ps1_pre_delay: Annotated[int, At(4, 2)] = Field(ge=0, le=300)
+    ps1_level: Annotated[Percent, At(6)]
+    ps1_feedback: Annotated[Percent, At(13)]
+    ps2_mode: Annotated[PitchShifterMode, At(7)]
+    ps2_pitch: Annotated[Pitch, At(8)]
+    ps2_fine: Annotated[int, At(9, shift=-50)] = Field(ge=-50, le=50)
+    ps2_pre_delay: Annotated[int, At(10, 2)] = Field(ge=0, le=300)
+    ps2_level: Annotated[Percent, At(12)]
+    direct_mix: Annotated[Percent, At(14)]
+
+
+class HarmonistUserSettings(TslSection):
+    e: Annotated[Pitch, At(0)]
+    f: Annotated[Pitch, At(1)]
+    f_sharp: Annotated[Pitch, At(2)]
+    g: Annotated[Pitch, At(3)]
+    a_flat: Annotated[Pitch, At(4)]
+    a: Annotated[Pitch, At(5)]
+    b_flat: Annotated[Pitch, At(6)]
+    b: Annotated[Pitch, At(7)]
+    c: Annotated[Pitch, At(8)]
+    d_flat: Annotated[Pitch, At(9)]
+    d: Annotated[Pitch, At(10)]
+    e_flat: Annotated[Pitch, At(11)]
+
+
+class HarmonistModel(TslSection):
+    voice: Annotated[VoiceType, At(0)]
+    hr1_mode: Annotated[Harmony, At(1)]
+    hr1_level: Annotated[Percent, At(4)]
+    hr1_pre_delay: Annotated[int, At(2, 2)] = Field(ge=0, le=300)
+    hr1_feedback: Annotated[Percent, At(9)]
+    hr2_mode: Annotated[Harmony, At(5)]
+    hr2_level: Annotated[Percent, At(8)]
+    hr2_pre_delay: Annotated[int, At(6, 2)] = Field(ge=0, le=300)
+    direct_mix: Annotated[Percent, At(10)]
+    hr1_user: Annotated[HarmonistUserSettings, At(11)]
+    hr2_user: Annotated[HarmonistUserSettings, At(23)]
+
+
+class AcProcessorModel(TslSection):
+    type_: Annotated[AcProcessorType, At(0)]
+    bass: Annotated[int, At(1, shift=-50)] = Field(ge=-50, le=50)
+    middle: Annotated[int, At(2, shift=-50)] = Field(ge=-50, le=50)
+    middle_freq: Annotated[MidFreq, At(3)]
+    treble: Annotated[int, At(4, shift=-50)] = Field(ge=-50, le=50)
+    presence: Annotated[int, At(5, shift=-50)] = Field(ge=-50, le=50)
+    level: Annotated[Percent, At(6)]
+
+
+class PhaserModel(TslSection):
+    type_: Annotated[PhaserType, At(0)]
+    rate: Annotated[Percent, At(1)]
+    depth: Annotated[Percent, At(2)]
+    manual: Annotated[Percent, At(3)]
+    resonance: Annotated[Percent, At(4)]
+    step_rate: Annotated[ToggleablePercent, At(5)]
+    level: Annotated[Percent, At(7)]
+    direct_mix: Annotated[Percent, At(6)]
+
+
+class FlangerModel(TslSection):
+    rate: Annotated[Percent, At(0)]
+    depth: Annotated[Percent, At(1)]
+    manual: Annotated[Percent, At(2)]
+    resonance: Annotated[Percent, At(3)]
+    low_cut: Annotated[LowCutFreq, At(4)]
+    level: Annotated[Percent, At(6)]
+    direct_mix: Annotated[Percent, At(5)]
+
+
+class TremoloModel(TslSection):
+    wave_shape: Annotated[Percent, At(0)]
+    rate: Annotated[Percent, At(1)]
+    depth: Annotated[Percent, At(2)]
+    level: Annotated[Percent, At(3)]
+
+
+class RotaryModel(TslSection):
+    rate: Annotated[Percent, At(0)]
+    # TODO: 1-2
+    depth: Annotated[Percent, At(3)]
+    level: Annotated[Percent, At(4)]
+
+
+class UniVModel(TslSection):
+    rate: Annotated[Percent, At(0)]
+    depth: Annotated[Percent, At(1)]
+    level: Annotated[Percent, At(2)]
+
+
+class SlicerModel(TslSection):
+    pattern: Annotated[int, At(0, shift=1)] = Field(ge=1, le=20)
+    rate: Annotated[Percent, At(1)]
+    trigger_sens: Annotated[Percent, At(2)]
+    level: Annotated[Percent, At(3)]
+    direct_mix: Annotated[Percent, At(4)]
+
+
+class VibratoModel(TslSection):
+    rate: Annotated[Percent, At(0)]
+    depth: Annotated[Percent, At(1)]
+    # TODO: 2-3
+    level: Annotated[Percent, At(4)]
+
+
+class RingModModel(TslSection):
+    type_: Annotated[RingModMode, At(0)]
+    frequency: Annotated[Percent, At(1)]
+    level: Annotated[Percent, At(2)]
+    direct_mix: Annotated[Percent, At(3)]
+
+
+class HumanizerModel(TslSection):
+    mode: Annotated[HumanizerMode, At(0)]
+    vowel1: Annotated[Vowel, At(1)]
+    vowel2: Annotated[Vowel, At(2)]
+    rate: Annotated[Percent, At(4)]
+    depth: Annotated[Percent, At(5)]
+    sens: Annotated[Percent, At(3)]
+    manual: Annotated[Percent, At(6)]
+    level: Annotated[Percent, At(7)]
+
+
+class ChorusModel(TslSection):
+    crossover_frequency: Annotated[CrossoverFreq, At(0)]
+    low_rate: Annotated[Percent, At(1)]
+    low_depth: Annotated[Percent, At(2)]
+    low_pre_delay: Annotated[float, At(3, divisor=2.0)] = Field(
+        ge=0, le=40, multiple_of=0.5
+    )
+    low_level: Annotated[Percent, At(4)]
+    high_rate: Annotated[Percent, At(5)]
+    high_depth: Annotated[Percent, At(6)]
+    high_pre_delay: Annotated[float, At(7, divisor=2.0)] = Field(
+        ge=0, le=40, multiple_of=0.5
+    )
+    high_level: Annotated[Percent, At(8)]
+    direct_mix: Annotated[Percent, At(9)]
+
+
+class AcGuitarSimModel(TslSection):
+    body: Annotated[Percent, At(1)]
+    low: Annotated[int, At(2, shift=-50)] = Field(ge=-50, le=50)
+    high: Annotated[int, At(0, shift=-50)] = Field(ge=-50, le=50)
+    # TODO: 3
+    level: Annotated[Percent, At(4)]
+
+
+class Phaser90EModel(TslSection):
+    script_on: Annotated[bool, At(0)]
+    speed: Annotated[Percent, At(1)]
+
+
+class Flanger117EModel(TslSection):
+    manual: Annotated[Percent, At(0)]
+    width: Annotated[Percent, At(1)]
+    speed: Annotated[Percent, At(2)]
+    regen: Annotated[Percent, At(3)]
+
+
+class Wah95EModel(TslSection):
+    pedal_pos: Annotated[Percent, At(0)]
+    pedal_min: Annotated[Percent, At(1)]
+    pedal_max: Annotated[Percent, At(2)]
+    level: Annotated[Percent, At(3)]
+    direct_mix: Annotated[Percent, At(4)]
+
+
+class DelayChorus30Model(TslSection):
+    type_: Annotated[DelayChorusType, At(0)]
+    chorus_intensity: Annotated[Percent, At(2)]
+    echo_repeat_rate: Annotated[int, At(3, 2)] = Field(ge=0, le=600)
+    echo_intensity: Annotated[Percent, At(5)]
+    echo_volume: Annotated[Percent, At(6)]
+    input_volume: Annotated[Percent, At(1)]
+    tone: Annotated[Percent, At(7)]
+    output: Annotated[DelayChorusOutput, At(8)]
+
+
+class HeavyOctaveModel(TslSection):
+    level_1_oct: Annotated[Percent, At(0)]
+    level_2_oct: Annotated[Percent, At(1)]
+    direct_mix: Annotated[Percent, At(2)]
+
+
+class PedalBendModel(TslSection):
+    pedal_pos: Annotated[Percent, At(1)]
+    pitch: Annotated[Pitch, At(0)]
+    level: Annotated[Percent, At(2)]
+    direct_mix: Annotated[Percent, At(3)]
+
+
+class FxModel(TslLazySection):
+    """MOD/FX block.
+
+    Only the effect selected by `type_` is audible. `decode_lazy()` defers
+    decoding the other effects until they are accessed.
+    """
+
+    on: Annotated[bool, At(0)]
+    type_: Annotated[ModFxType, At(1)]
+    t_wah: Annotated[TWahModel, At(2)]
+    auto_wah: Annotated[AutoWahModel, At(9)]
+    pedal_wah: Annotated[PedalWahModel, At(16)]
+    compressor: Annotated[CompressorModel, At(22)]
+    limiter: Annotated[LimiterModel, At(27)]
+    graphic_eq: Annotated[GraphicEqModel, At(33)]
+    parametric_eq: Annotated[ParametricEqModel, At(44)]
+    guitar_sim: Annotated[GuitarSimModel, At(55)]
+    slow_gear: Annotated[SlowGearModel, At(60)]
+    wave_synth: Annotated[WaveSynthModel, At(63)]
+    octave: Annotated[OctaveModel, At(71)]
+    pitch_shifter: Annotated[PitchShifterModel, At(74)]
+    harmonist: Annotated[HarmonistModel, At(89)]
+    ac_processor: Annotated[AcProcessorModel, At(124)]
+    phaser: Annotated[PhaserModel, At(131)]
+    flanger: Annotated[FlangerModel, At(139)]
+    # TODO: 146
+    tremolo: Annotated[TremoloModel, At(147)]
+    # TODO: 151-152
+    rotary: Annotated[RotaryModel, At(153)]
+    uni_v: Annotated[UniVModel, At(158)]
+    slicer: Annotated[SlicerModel, At(161)]
+    vibrato: Annotated[VibratoModel, At(166)]
+    ring_mod: Annotated[RingModModel, At(171)]
+    humanizer: Annotated[HumanizerModel, At(175)]
+    chorus: Annotated[ChorusModel, At(183)]
+    ac_guitar_sim: Annotated[AcGuitarSimModel, At(193)]
+    phaser_90e: Annotated[Phaser90EModel, At(198)]
+    flanger_117e: Annotated[Flanger117EModel, At(200)]
+    wah_95e: Annotated[Wah95EModel, At(204)]
+    dc30: Annotated[DelayChorus30Model, At(209)]
+    heavy_octave: Annotated[HeavyOctaveModel, At(218)]
+    pedal_bend: Annotated[PedalBendModel | None, At(221)] = None
+
+    __tsl_size__ = (221, 225)
+
+    @property
+    def active_effect(self) -> TslSection | None:
+        """Settings of the effect selected by `type_`."""
+        return cast("TslSection | None", getattr(self, _EFFECTS[self.type_]))
+
+
+_EFFECTS = {
+    ModFxType.TWah: "t_wah",
+    ModFxType.AutoWah: "auto_wah",
+    ModFxType.PedalWah: "pedal_wah",
+    ModFxType.Compressor: "compressor",
+    ModFxType.Limiter: "limiter",
+    ModFxType.GraphicEq: "graphic_eq",
+    ModFxType.ParametricEq: "parametric_eq",
+    ModFxType.GuitarSim: "guitar_sim",
+    ModFxType.SlowGear: "slow_gear",
+    ModFxType.WaveSynth: "wave_synth",
+    ModFxType.Octave: "octave",
+    ModFxType.PitchShifter: "pitch_shifter",
+    ModFxType.Harmonist: "harmonist",
+    ModFxType.AcProcessor: "ac_processor",
+    ModFxType.Phaser: "phaser",
+    ModFxType.Flanger: "flanger",
+    ModFxType.Tremolo: "tremolo",
+    ModFxType.Rotary: "rotary",
+    ModFxType.UniV: "uni_v",
+    ModFxType.Slicer: "slicer",
+    ModFxType.Vibrato: "vibrato",
+    ModFxType.RingMod: "ring_mod",
+    ModFxType.Humanizer: "humanizer",
+    ModFxType.Chorus: "chorus",
+    ModFxType.AcGuitarSim: "ac_guitar_sim",
+    ModFxType.Phaser90E: "phaser_90e",
+    ModFxType.Flanger117E: "flanger_117e",
+    ModFxType.Wah95E: "wah_95e",
+    ModFxType.DelayChorus30: "dc30",
+    ModFxType.HeavyOctave: "heavy_octave",
+    ModFxType.PedalBend: "pedal_bend",
+}
@@ -0,0 +1,83 @@
+import sys
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from .types import TslSection, TslValues, decode_section, hex_view
+
+T = TypeVar("T")
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class SectionPool:
+    """Share identical sections between patches.
+
+    Decoded sections are kept in a bounded LRU keyed by their raw bytes, so
+    that a section seen before, such as an untouched FX block, is decoded
+    once and the same frozen instance is returned for every copy of it.
+
+    `hits`, `misses` and `saved`, the approximate number of bytes that were
+    not allocated thanks to the sharing, measure its effectiveness.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.hits = self.misses = self.saved = 0
+
+        self._entries: OrderedDict[tuple[type, bytes, bool], tuple[Any, int]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def section(self, section: type[T], values: TslValues, *, trusted: bool) -> T:
+        """Return a decoded section, shared with the identical ones."""
+        data = hex_view(values)
+        if not issubclass(section, TslSection):
+            # Only sections are frozen, the others can't be shared
+            return decode_section(section, data, trusted=trusted)
+
+        # Trusted decodes skip the validation, their sections aren't shared
+        # with the validated ones
+        key = (section, data.tobytes(), trusted)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved += entry[1]
+
+            obj: T = entry[0]
+            return obj
+
+        self.misses += 1
+        obj = decode_section(section, data, trusted=trusted)
+        self._entries[key] = (obj, _sizeof(obj))
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return obj
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.saved = 0
+
+
+def _sizeof(obj: object) -> int:
+    if isinstance(obj, BaseModel):
+        size = sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+        return size + sum(_sizeof(v) for v in obj.__dict__.values())
+
+    # Enum members and booleans are singletons
+    if isinstance(obj, Enum | bool):
+        return 0
+
+    return sys.getsizeof(obj)
@@ -1,4 +1,12 @@
-from pydantic import ConfigDict, Field, field_validator
+from typing import Annotated, Any
+
+from pydantic import (
+    ConfigDict,
+    Field,
+    ModelWrapValidatorHandler,
+    field_validator,
+    model_validator,
+)
 
 from katana_tsl_parser.errors import (
     InvalidContourValuesError,
@@ -63,6 +71,7 @@ from .enums import (
     ReverbMode,
     ReverbType,
 )
+from .layout import At, byte_table, strip_optional
 from .mod_fx import FxModel
 from .types import (
     Gain12dB,
@@ -71,439 +80,290 @@ from .types import (
     Percent,
     Pitch,
     Q,
+    SectionStore,
+    TslLazyModel,
+    TslLazySection,
     TslList,
     TslObject,
-    decode_delay_time,
-    i,
+    TslSection,
+    TslValues,
+    decode_section,
+    hex_view,
+    hex_views,
+    to_hex,
 )
 
 MAX_NAME_LENGTH = 16
 
 
-class EqModel(TslObject):
-    on: bool
-    type_: EqType
-    low_cut: LowCutFreq
-    low_gain: Gain20dB
-    low_mid_freq: MidFreq
-    low_mid_q: float
-    low_mid_gain: Gain20dB
-    high_mid_freq: MidFreq
-    high_mid_q: float
-    high_mid_gain: Gain20dB
-    high_gain: Gain20dB
-    high_cut: HighCutFreq
-    level: Gain20dB
-    bar_31: Gain12dB
-    bar_62: Gain12dB
-    bar_125: Gain12dB
-    bar_250: Gain12dB
-    bar_500: Gain12dB
-    bar_1000: Gain12dB
-    bar_2000: Gain12dB
-    bar_4000: Gain12dB
-    bar_8000: Gain12dB
-    bar_16000: Gain12dB
-    bar_level: Gain12dB
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values)
-
-        return {
-            "on": i(values[0]) > 0,
-            "type_": EqType(i(values[1])),
-            "low_cut": LowCutFreq(i(values[2])),
-            "low_gain": Gain20dB.parse(values[3]),
-            "low_mid_freq": MidFreq(i(values[4])),
-            "low_mid_q": Q.parse(values[5]),
-            "low_mid_gain": Gain20dB.parse(values[6]),
-            "high_mid_freq": MidFreq(i(values[7])),
-            "high_mid_q": Q.parse(values[8]),
-            "high_mid_gain": Gain20dB.parse(values[9]),
-            "high_gain": Gain20dB.parse(values[10]),
-            "high_cut": HighCutFreq(i(values[11])),
-            "level": Gain20dB.parse(values[12]),
-            "bar_31": Gain12dB.parse(values[13]),
-            "bar_62": Gain12dB.parse(values[14]),
-            "bar_125": Gain12dB.parse(values[15]),
-            "bar_250": Gain12dB.parse(values[16]),
-            "bar_500": Gain12dB.parse(values[17]),
-            "bar_1000": Gain12dB.parse(values[18]),
-            "bar_2000": Gain12dB.parse(values[19]),
-            "bar_4000": Gain12dB.parse(values[20]),
-            "bar_8000": Gain12dB.parse(values[21]),
-            "bar_16000": Gain12dB.parse(values[22]),
-            "bar_level": Gain12dB.parse(values[23]),
-        }
-
-
-class Patch0Model(TslObject):
-    boost_on: bool
-    boost_type: BoostType
-    boost_drive: int = Field(ge=0, le=120)
-    boost_bottom: int = Field(ge=-50, le=50)
-    boost_tone: int = Field(ge=-50, le=50)
-    boost_solo_on: bool
-    boost_solo_level: Percent
-    boost_direct_mix: Percent
-    boost_level: Percent
-
-    amp_type: AmpType
-    amp_gain: Percent
-    amp_volume: Percent
-    amp_eq_bass: Percent
-    amp_eq_middle: Percent
-    amp_eq_treble: Percent
-    amp_eq_presence: Percent
-
-    eq: EqModel
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 72)
-
-        return {
-            "boost_on": i(values[0]) > 0,
-            "boost_type": BoostType(i(values[1])),
-            "boost_drive": i(values[2]),
-            "boost_bottom": i(values[3]) - 50,
-            "boost_tone": i(values[4]) - 50,
-            "boost_solo_on": i(values[5]) > 0,
-            "boost_solo_level": i(values[6]),
-            "boost_level": i(values[7]),
-            "boost_direct_mix": i(values[8]),
-            # TODO: 9 -> 16
-            "amp_type": AmpType(i(values[17])),
-            "amp_gain": i(values[18]),
-            "amp_eq_bass": i(values[20]),
-            "amp_eq_middle": i(values[21]),
-            "amp_eq_treble": i(values[22]),
-            "amp_eq_presence": i(values[23]),
-            "amp_volume": i(values[24]),
-            # TODO: 25 -> 47
-            "eq": EqModel.decode_tsl(values[48:]),
-        }
-
-
-class Patch1Model(TslObject):
-    reverb_on: bool
-    reverb_type: ReverbType
-    reverb_time: float = Field(ge=0.1, le=10.0, multiple_of=0.1)
-    reverb_pre_delay: int = Field(ge=0, le=500)
-    reverb_low_cut: LowCutFreq
-    reverb_high_cut: HighCutFreq
-    reverb_density: int = Field(ge=0, le=10)
-    reverb_effect_level: Percent
-    reverb_direct_mix: Percent
-    reverb_color: Percent
-    pedal_fx_type: PedalFxType
-    pedal_fx_wah_type: PedalWahType
-    pedal_fx_wah_pos: Percent
-    pedal_fx_wah_min: Percent
-    pedal_fx_wah_max: Percent
-    pedal_fx_wah_level: Percent
-    pedal_fx_wah_direct_mix: Percent
-    pedal_fx_bend_pos: Percent
-    pedal_fx_bend_pitch: Pitch
-    pedal_fx_bend_level: Percent
-    pedal_fx_bend_direct_mix: Percent
-    pedal_fx_wah95_pos: Percent
-    pedal_fx_wah95_min: Percent
-    pedal_fx_wah95_max: Percent
-    pedal_fx_wah95_level: Percent
-    pedal_fx_wah95_direct_mix: Percent
-    noise_suppressor_on: bool
-    noise_suppressor_threshold: Percent
-    noise_suppressor_release: Percent
-    master_key: Key
+class EqModel(TslSection):
+    on: Annotated[bool, At(0)]
+    type_: Annotated[EqType, At(1)]
+    low_cut: Annotated[LowCutFreq, At(2)]
+    low_gain: Annotated[Gain20dB, At(3)]
+    low_mid_freq: Annotated[MidFreq, At(4)]
+    low_mid_q: Annotated[float, At(5, transform=Q.from_byte, inverse=Q.to_byte)]
+    low_mid_gain: Annotated[Gain20dB, At(6)]
+    high_mid_freq: Annotated[MidFreq, At(7)]
+    high_mid_q: Annotated[float, At(8, transform=Q.from_byte, inverse=Q.to_byte)]
+    high_mid_gain: Annotated[Gain20dB, At(9)]
+    high_gain: Annotated[Gain20dB, At(10)]
+    high_cut: Annotated[HighCutFreq, At(11)]
+    level: Annotated[Gain20dB, At(12)]
+    bar_31: Annotated[Gain12dB, At(13)]
+    bar_62: Annotated[Gain12dB, At(14)]
+    bar_125: Annotated[Gain12dB, At(15)]
+    bar_250: Annotated[Gain12dB, At(16)]
+    bar_500: Annotated[Gain12dB, At(17)]
+    bar_1000: Annotated[Gain12dB, At(18)]
+    bar_2000: Annotated[Gain12dB, At(19)]
+    bar_4000: Annotated[Gain12dB, At(20)]
+    bar_8000: Annotated[Gain12dB, At(21)]
+    bar_16000: Annotated[Gain12dB, At(22)]
+    bar_level: Annotated[Gain12dB, At(23)]
+
+
+class Patch0Model(TslSection):
+    boost_on: Annotated[bool, At(0)]
+    boost_type: Annotated[BoostType, At(1)]
+    boost_drive: Annotated[int, At(2)] = Field(ge=0, le=120)
+    boost_bottom: Annotated[int, At(3, shift=-50)] = Field(ge=-50, le=50)
+    boost_tone: Annotated[int, At(4, shift=-50)] = Field(ge=-50, le=50)
+    boost_solo_on: Annotated[bool, At(5)]
+    boost_solo_level: Annotated[Percent, At(6)]
+    boost_direct_mix: Annotated[Percent, At(8)]
+    boost_level: Annotated[Percent, At(7)]
+    # TODO: 9 -> 16
+
+    amp_type: Annotated[AmpType, At(17)]
+    amp_gain: Annotated[Percent, At(18)]
+    amp_volume: Annotated[Percent, At(24)]
+    amp_eq_bass: Annotated[Percent, At(20)]
+    amp_eq_middle: Annotated[Percent, At(21)]
+    amp_eq_treble: Annotated[Percent, At(22)]
+    amp_eq_presence: Annotated[Percent, At(23)]
+    # TODO: 25 -> 47
+
+    eq: Annotated[EqModel, At(48)]
+
+
+def decode_contour(values: memoryview) -> ContourChoice:
+    match values[0], values[1]:
+        case 0, 0:
+            contour = 0
+        case 1, 0:
+            contour = 1
+        case 1, 1:
+            contour = 2
+        case 1, 2:
+            contour = 3
+        case x, y:
+            raise InvalidContourValuesError(x, y)
+
+    return ContourChoice(contour)
+
+
+_CONTOUR_VALUES = {
+    ContourChoice.Off: b"\x00\x00",
+    ContourChoice.Contour1: b"\x01\x00",
+    ContourChoice.Contour2: b"\x01\x01",
+    ContourChoice.Contour3: b"\x01\x02",
+}
+
+
+def encode_contour(contour: ContourChoice) -> bytes:
+    return _CONTOUR_VALUES[contour]
+
+
+class Patch1Model(TslSection):
+    reverb_on: Annotated[bool, At(0)]
+    reverb_type: Annotated[ReverbType, At(1)]
+    reverb_time: Annotated[float, At(2, shift=1, divisor=10.0)] = Field(
+        ge=0.1, le=10.0, multiple_of=0.1
+    )
+    reverb_pre_delay: Annotated[int, At(3, 2)] = Field(ge=0, le=500)
+    reverb_low_cut: Annotated[LowCutFreq, At(5)]
+    reverb_high_cut: Annotated[HighCutFreq, At(6)]
+    reverb_density: Annotated[int, At(7)] = Field(ge=0, le=10)
+    reverb_effect_level: Annotated[Percent, At(8)]
+    reverb_direct_mix: Annotated[Percent, At(9)]
+    reverb_color: Annotated[Percent, At(11)]
+    pedal_fx_type: Annotated[PedalFxType, At(17)]
+    pedal_fx_wah_type: Annotated[PedalWahType, At(18)]
+    pedal_fx_wah_pos: Annotated[Percent, At(19)]
+    pedal_fx_wah_min: Annotated[Percent, At(20)]
+    pedal_fx_wah_max: Annotated[Percent, At(21)]
+    pedal_fx_wah_level: Annotated[Percent, At(22)]
+    pedal_fx_wah_direct_mix: Annotated[Percent, At(23)]
+    pedal_fx_bend_pos: Annotated[Percent, At(25)]
+    pedal_fx_bend_pitch: Annotated[Pitch, At(24)]
+    pedal_fx_bend_level: Annotated[Percent, At(26)]
+    pedal_fx_bend_direct_mix: Annotated[Percent, At(27)]
+    pedal_fx_wah95_pos: Annotated[Percent, At(28)]
+    pedal_fx_wah95_min: Annotated[Percent, At(29)]
+    pedal_fx_wah95_max: Annotated[Percent, At(30)]
+    pedal_fx_wah95_level: Annotated[Percent, At(31)]
+    pedal_fx_wah95_direct_mix: Annotated[Percent, At(32)]
+    noise_suppressor_on: Annotated[bool, At(38)]
+    noise_suppressor_threshold: Annotated[Percent, At(39)]
+    noise_suppressor_release: Annotated[Percent, At(40)]
+    master_key: Annotated[Key, At(49)]
     # V2
-    solo_on: bool | None
-    solo_level: Percent | None
-
-    contour: ContourChoice | None
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, (50, 91))
-
-        res = {
-            "reverb_on": i(values[0]) > 0,
-            "reverb_type": ReverbType(i(values[1])),
-            "reverb_time": (i(values[2]) + 1) / 10.0,
-            "reverb_pre_delay": decode_delay_time(values[3:5]),
-            "reverb_low_cut": LowCutFreq(i(values[5])),
-            "reverb_high_cut": HighCutFreq(i(values[6])),
-            "reverb_density": i(values[7]),
-            "reverb_effect_level": i(values[8]),
-            "reverb_direct_mix": i(values[9]),
-            "reverb_color": i(values[11]),
-            "pedal_fx_type": i(values[17]),
-            "pedal_fx_wah_type": i(values[18]),
-            "pedal_fx_wah_pos": i(values[19]),
-            "pedal_fx_wah_min": i(values[20]),
-            "pedal_fx_wah_max": i(values[21]),
-            "pedal_fx_wah_level": i(values[22]),
-            "pedal_fx_wah_direct_mix": i(values[23]),
-            "pedal_fx_bend_pitch": Pitch.parse(values[24]),
-            "pedal_fx_bend_pos": i(values[25]),
-            "pedal_fx_bend_level": i(values[26]),
-            "pedal_fx_bend_direct_mix": i(values[27]),
-            "pedal_fx_wah95_pos": i(values[28]),
-            "pedal_fx_wah95_min": i(values[29]),
-            "pedal_fx_wah95_max": i(values[30]),
-            "pedal_fx_wah95_level": i(values[31]),
-            "pedal_fx_wah95_direct_mix": i(values[32]),
-            "noise_suppressor_on": i(values[38]) > 0,
-            "noise_suppressor_threshold": i(values[39]),
-            "noise_suppressor_release": i(values[40]),
-            "master_key": Key(i(values[49])),
-        }
-
-        if len(values) == 91:  # noqa: PLR2004
-            res.update(
-                {
-                    "solo_on": i(values[84]) > 0,
-                    "solo_level": i(values[85]),
-                },
-            )
-
-            match i(values[86]), i(values[87]):
-                case 0, 0:
-                    contour = 0
-                case 1, 0:
-                    contour = 1
-                case 1, 1:
-                    contour = 2
-                case 1, 2:
-                    contour = 3
-                case x, y:
-                    raise InvalidContourValuesError(x, y)
+    solo_on: Annotated[bool | None, At(84)]
+    solo_level: Annotated[Percent | None, At(85)]
+
+    contour: Annotated[
+        ContourChoice | None,
+        At(86, 2, transform=decode_contour, inverse=encode_contour),
+    ]
+
+    __tsl_size__ = (50, 91)
+
+
+class Patch2Model(TslSection):
+    # TODO: 0 -> 3
+    boost_green: Annotated[BoostType, At(4)]
+    boost_red: Annotated[BoostType, At(5)]
+    boost_yellow: Annotated[BoostType, At(6)]
+    mod_green: Annotated[ModFxType, At(7)]
+    mod_red: Annotated[ModFxType, At(8)]
+    mod_yellow: Annotated[ModFxType, At(9)]
+    fx_green: Annotated[ModFxType, At(10)]
+    fx_red: Annotated[ModFxType, At(11)]
+    fx_yellow: Annotated[ModFxType, At(12)]
+    delay_green: Annotated[DelayType, At(13)]
+    delay_red: Annotated[DelayType, At(14)]
+    delay_yellow: Annotated[DelayType, At(15)]
+    reverb_green: Annotated[ReverbType, At(16)]
+    reverb_red: Annotated[ReverbType, At(17)]
+    reverb_yellow: Annotated[ReverbType, At(18)]
+    delay2_green: Annotated[DelayType, At(19)]
+    delay2_red: Annotated[DelayType, At(20)]
+    delay2_yellow: Annotated[DelayType, At(21)]
+    reverb_green_mode: Annotated[ReverbMode, At(22)]
+    reverb_red_mode: Annotated[ReverbMode, At(23)]
+    reverb_yellow_mode: Annotated[ReverbMode, At(24)]
+
+    boost_light: Annotated[Light, At(25)]
+    mod_light: Annotated[Light, At(26)]
+    fx_light: Annotated[Light, At(27)]
+    delay_light: Annotated[Light, At(28)]
+    reverb_light: Annotated[Light, At(29)]
+    # TODO: 30 -> 34
+
+    cab_resonance: Annotated[CabResonance, At(35)]
+
+
+class KnobAssign(TslSection):
+    booster: Annotated[KnobBooster, At(0)]
+    delay: Annotated[KnobDelay, At(1)]
+    reverb: Annotated[KnobReverb, At(2)]
+    chorus: Annotated[KnobChorus, At(3)]
+    flanger: Annotated[KnobFlanger, At(4)]
+    phaser: Annotated[KnobPhaser, At(5)]
+    uni_v: Annotated[KnobUniV, At(6)]
+    tremolo: Annotated[KnobTremolo, At(7)]
+    vibrato: Annotated[KnobVibrato, At(8)]
+    rotary: Annotated[KnobRotaty, At(9)]
+    ring_mod: Annotated[KnobRingMod, At(10)]
+    slow_gear: Annotated[KnobSlowGear, At(11)]
+    slicer: Annotated[KnobSlicer, At(12)]
+    comp: Annotated[KnobCompressor, At(13)]
+    limiter: Annotated[KnobLimiter, At(14)]
+    touch_wah: Annotated[KnobTouchWah, At(15)]
+    auto_wah: Annotated[KnobAutoWah, At(16)]
+    pedal_wah: Annotated[KnobPedalWah, At(17)]
+    graphic_eq: Annotated[KnobGraphicEq, At(18)]
+    parametric_eq: Annotated[KnobParametricEq, At(19)]
+    guitar_sim: Annotated[KnobGuitarSim, At(20)]
+    ac_guitar_sim: Annotated[KnobAcGuitarSim, At(21)]
+    ac_processor: Annotated[KnobAcProcessor, At(22)]
+    wave_synth: Annotated[KnobWaveSynth, At(23)]
+    octave: Annotated[KnobOctave, At(24)]
+    heavy_octave: Annotated[KnobHeavyOctave, At(25)]
+    pitch_shifter: Annotated[KnobPitchShifter, At(26)]
+    harmonist: Annotated[KnobHarmonist, At(27)]
+    humanizer: Annotated[KnobHumanizer, At(28)]
+    phaser_90e: Annotated[KnobPhaser90E, At(29)]
+    flanger_117e: Annotated[KnobFlanger117E, At(30)]
+    wah_95e: Annotated[KnobWah95E, At(31)]
+    dc_30: Annotated[KnobDC30, At(32)]
+    pedal_bend: Annotated[KnobPedalBend, At(33)]
+
+
+class FootswitchAssign(TslSection):
+    fs1: Annotated[Footswitch, At(0)]
+    fs2: Annotated[Footswitch, At(1)]
+
+
+class PatchMk2v2Model(TslSection):
+    solo_eq_position: Annotated[EqPosition, At(0)]
+    solo_eq_on: Annotated[bool, At(1)]
+    solo_eq_low_cut: Annotated[LowCutFreq, At(2)]
+    solo_eq_low_gain: Annotated[Gain12dB, At(3)]
+    solo_eq_mid_freq: Annotated[MidFreq, At(4)]
+    solo_eq_mid_q: Annotated[Q, At(5)]
+    solo_eq_mid_gain: Annotated[Gain12dB, At(6)]
+    solo_eq_high_gain: Annotated[Gain12dB, At(7)]
+    solo_eq_high_cut: Annotated[HighCutFreq, At(8)]
+    solo_eq_level: Annotated[Gain12dB, At(9)]
+
+    # TODO: Figure out 11 to 22
+    __tsl_size__ = (10, 22)
+
+
+class DelayModel(TslSection):
+    delay_on: Annotated[bool, At(0)]
+    delay_type: Annotated[DelayType, At(1)]
+    delay_time: Annotated[int, At(2, 2)]
+    feedback: Annotated[int, At(4)]
+    high_cut: Annotated[HighCutFreq, At(5)]
+    effect_level: Annotated[int, At(6)]
+    direct_mix: Annotated[int, At(7)]
+    tap_time: Annotated[int, At(8)]
+    mod_rate: Annotated[int, At(19)]
+    mod_depth: Annotated[int, At(20)]
+    filter_on: Annotated[bool, At(22)]
+    range_: Annotated[Range, At(21)]
+    feedback_phase: Annotated[Phase, At(23)]
+    delay_phase: Annotated[Phase, At(24)]
+    mod_sw_on: Annotated[bool, At(25)]
+
+
+class ContourModel(TslSection):
+    contour_type: Annotated[int, At(0, shift=1)]
+    freq_shift: Annotated[int, At(1, shift=-50)]
+
+    # TODO: Items 2 to 7
+    __tsl_size__ = (2, 8)
+
+
+_CHAIN_ITEMS = byte_table(ChainItem)
 
-            res["contour"] = contour
-
-        return res
-
-
-class Patch2Model(TslObject):
-    boost_green: BoostType
-    boost_red: BoostType
-    boost_yellow: BoostType
-    mod_green: ModFxType
-    mod_red: ModFxType
-    mod_yellow: ModFxType
-    fx_green: ModFxType
-    fx_red: ModFxType
-    fx_yellow: ModFxType
-    delay_green: DelayType
-    delay_red: DelayType
-    delay_yellow: DelayType
-    reverb_green: ReverbType
-    reverb_red: ReverbType
-    reverb_yellow: ReverbType
-    delay2_green: DelayType
-    delay2_red: DelayType
-    delay2_yellow: DelayType
-    reverb_green_mode: ReverbMode
-    reverb_red_mode: ReverbMode
-    reverb_yellow_mode: ReverbMode
-
-    boost_light: Light
-    mod_light: Light
-    fx_light: Light
-    delay_light: Light
-    reverb_light: Light
-
-    cab_resonance: CabResonance
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 36)
-
-        return {
-            "boost_green": BoostType(i(values[4])),
-            "boost_red": BoostType(i(values[5])),
-            "boost_yellow": BoostType(i(values[6])),
-            "mod_green": ModFxType(i(values[7])),
-            "mod_red": ModFxType(i(values[8])),
-            "mod_yellow": ModFxType(i(values[9])),
-            "fx_green": ModFxType(i(values[10])),
-            "fx_red": ModFxType(i(values[11])),
-            "fx_yellow": ModFxType(i(values[12])),
-            "delay_green": DelayType(i(values[13])),
-            "delay_red": DelayType(i(values[14])),
-            "delay_yellow": DelayType(i(values[15])),
-            "reverb_green": ReverbType(i(values[16])),
-            "reverb_red": ReverbType(i(values[17])),
-            "reverb_yellow": ReverbType(i(values[18])),
-            "delay2_green": DelayType(i(values[19])),
-            "delay2_red": DelayType(i(values[20])),
-            "delay2_yellow": DelayType(i(values[21])),
-            "reverb_green_mode": ReverbMode(i(values[22])),
-            "reverb_red_mode": ReverbMode(i(values[23])),
-            "reverb_yellow_mode": ReverbMode(i(values[24])),
-            "boost_light": Light(i(values[25])),
-            "mod_light": Light(i(values[26])),
-            "fx_light": Light(i(values[27])),
-            "delay_light": Light(i(values[28])),
-            "reverb_light": Light(i(values[29])),
-            "cab_resonance": CabResonance(i(values[35])),
-        }
-
-
-class KnobAssign(TslObject):
-    booster: KnobBooster
-    delay: KnobDelay
-    reverb: KnobReverb
-    chorus: KnobChorus
-    flanger: KnobFlanger
-    phaser: KnobPhaser
-    uni_v: KnobUniV
-    tremolo: KnobTremolo
-    vibrato: KnobVibrato
-    rotary: KnobRotaty
-    ring_mod: KnobRingMod
-    slow_gear: KnobSlowGear
-    slicer: KnobSlicer
-    comp: KnobCompressor
-    limiter: KnobLimiter
-    touch_wah: KnobTouchWah
-    auto_wah: KnobAutoWah
-    pedal_wah: KnobPedalWah
-    graphic_eq: KnobGraphicEq
-    parametric_eq: KnobParametricEq
-    guitar_sim: KnobGuitarSim
-    ac_guitar_sim: KnobAcGuitarSim
-    ac_processor: KnobAcProcessor
-    wave_synth: KnobWaveSynth
-    octave: KnobOctave
-    heavy_octave: KnobHeavyOctave
-    pitch_shifter: KnobPitchShifter
-    harmonist: KnobHarmonist
-    humanizer: KnobHumanizer
-    phaser_90e: KnobPhaser90E
-    flanger_117e: KnobFlanger117E
-    wah_95e: KnobWah95E
-    dc_30: KnobDC30
-    pedal_bend: KnobPedalBend
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 34)
-
-        return {f: i(v) for f, v in zip(cls.model_fields, values, strict=True)}
-
-
-class FootswitchAssign(TslObject):
-    fs1: Footswitch
-    fs2: Footswitch
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 2)
-
-        return {
-            "fs1": Footswitch(i(values[0])),
-            "fs2": Footswitch(i(values[1])),
-        }
-
-
-class PatchMk2v2Model(TslObject):
-    solo_eq_position: EqPosition
-    solo_eq_on: bool
-    solo_eq_low_cut: LowCutFreq
-    solo_eq_low_gain: Gain12dB
-    solo_eq_mid_freq: MidFreq
-    solo_eq_mid_q: Q
-    solo_eq_mid_gain: Gain12dB
-    solo_eq_high_gain: Gain12dB
-    solo_eq_high_cut: HighCutFreq
-    solo_eq_level: Gain12dB
-
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        # TODO: Figure out 11 to 22
-        cls._expect_size(values, (10, 22))
-
-        return {
-            "solo_eq_position": i(values[0]),
-            "solo_eq_on": i(values[1]) > 0,
-            "solo_eq_low_cut": LowCutFreq(i(values[2])),
-            "solo_eq_low_gain": Gain12dB.parse(values[3]),
-            "solo_eq_mid_freq": MidFreq(i(values[4])),
-            "solo_eq_mid_q": Q.parse(values[5]),
-            "solo_eq_mid_gain": Gain12dB.parse(values[6]),
-            "solo_eq_high_gain": Gain12dB.parse(values[7]),
-            "solo_eq_high_cut": HighCutFreq(i(values[8])),
-            "solo_eq_level": Gain12dB.parse(values[9]),
-        }
-
-
-class DelayModel(TslObject):
-    delay_on: bool
-    delay_type: DelayType
-    delay_time: int
-    feedback: int
-    high_cut: HighCutFreq
-    effect_level: int
-    direct_mix: int
-    tap_time: int
-    mod_rate: int
-    mod_depth: int
-    filter_on: bool
-    range_: Range
-    feedback_phase: Phase
-    delay_phase: Phase
-    mod_sw_on: bool
 
+class ChainModel(TslList[ChainItem]):
     @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 26)
-
-        return {
-            "delay_on": i(values[0]) > 0,
-            "delay_type": DelayType(i(values[1])),
-            "delay_time": decode_delay_time(values[2:4]),
-            "feedback": i(values[4]),
-            "high_cut": HighCutFreq(i(values[5])),
-            "effect_level": i(values[6]),
-            "direct_mix": i(values[7]),
-            "tap_time": i(values[8]),
-            "mod_rate": i(values[19]),
-            "mod_depth": i(values[20]),
-            "range_": Range(i(values[21])),
-            "filter_on": i(values[22]) > 0,
-            "feedback_phase": Phase(i(values[23])),
-            "delay_phase": Phase(i(values[24])),
-            "mod_sw_on": i(values[25]) > 0,
-        }
+    def decode_tsl(cls, values: TslValues) -> JsonDict:
+        data = hex_view(values)
+        cls._expect_size(data, 20)
 
-
-class ContourModel(TslObject):
-    contour_type: int
-    freq_shift: int
+        return {"root": list(map(_CHAIN_ITEMS.__getitem__, data))}
 
     @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, (2, 8))
+    def construct_tsl(cls, values: TslValues) -> "ChainModel":
+        return cls._construct(cls.decode_tsl(values))
 
-        # TODO: Items 2 to 7
-        return {
-            "contour_type": i(values[0]) + 1,
-            "freq_shift": i(values[1]) - 50,
-            "_raw": values,
-        }
 
+class ParamSetModel(TslLazyModel, TslObject):
+    """The sections of a patch.
 
-class ChainModel(TslList[ChainItem]):
-    @classmethod
-    def decode_tsl(cls, values: list[str]) -> JsonDict:
-        cls._expect_size(values, 20)
-
-        return {"root": [ChainItem(i(v)) for v in values]}
+    See `decode_lazy()` to only decode the sections that are accessed.
 
+    The sections are decoded from views on a single buffer per patch, see
+    `hex_views()`. `_raw` maps the aliases of all the sections, including the
+    ones that aren't modeled, to these views.
+    """
 
-class ParamSetModel(TslObject):
     model_config = ConfigDict(populate_by_name=True, extra="ignore")
 
     name: str = Field(alias="UserPatch%PatchName")
@@ -535,10 +395,26 @@ class ParamSetModel(TslObject):
 
     # TODO: Move all the validators to parse_tsl and add Version enum
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def keep_raw(
+        cls,
+        values: Any,  # noqa: ANN401
+        handler: ModelWrapValidatorHandler["ParamSetModel"],
+    ) -> "ParamSetModel":
+        if not isinstance(values, dict):
+            return handler(values)
+
+        values = hex_views(values)
+        obj = handler(values)
+        obj._raw = values  # noqa: SLF001
+
+        return obj
+
     @field_validator("name", mode="before")
-    def validate_name(cls, v: str | list[str]) -> str:
-        if isinstance(v, list):
-            v = "".join([chr(int(i, 16)) for i in v])
+    def validate_name(cls, v: str | TslValues) -> str:
+        if not isinstance(v, str):
+            v = hex_view(v).tobytes().decode("latin-1")
 
         if len(v) > MAX_NAME_LENGTH:
             raise NameTooLongError(len(v))
@@ -605,6 +481,127 @@ class ParamSetModel(TslObject):
     def parse_chain(cls, v: list[str]) -> JsonDict:
         return ChainModel.decode_tsl(v)
 
+    @classmethod
+    def construct_tsl(
+        cls,
+        values: JsonDict,
+        *,
+        trusted: bool = True,
+        cache: SectionStore | None = None,
+    ) -> "ParamSetModel":
+        """Decode all the sections without validating the param set itself.
+
+        The sections are validated by pydantic unless `trusted`. With `cache`,
+        the sections that were already decoded are loaded from it.
+        """
+        values = hex_views(values)
+        by_alias = cls.__tsl_layout__.by_alias
+        res: JsonDict = {"_raw": values}
+
+        for alias, v in values.items():
+            name = by_alias.get(alias)
+            if name is None:
+                continue
+
+            section = _SECTIONS.get(name)
+            if section is None:
+                res[name] = cls.validate_name(v)
+            elif cache is not None:
+                res[name] = cache.section(section, v, trusted=trusted)
+            else:
+                res[name] = decode_section(section, v, trusted=trusted)
+
+        return cls._construct(res)
+
+    @classmethod
+    def decode_lazy(cls, values: JsonDict) -> "ParamSetModel":
+        """Decode the name now and keep the raw values of the other sections.
+
+        Each section is decoded and validated the first time it is accessed,
+        the effects of the FX blocks are themselves decoded lazily. See
+        `decode_counts()` for the number of sections that were decoded.
+        """
+        values = hex_views(values)
+        by_alias = cls.__tsl_layout__.by_alias
+        res: JsonDict = {"_raw": values}
+        pending: JsonDict = {}
+
+        for alias, v in values.items():
+            name = by_alias.get(alias)
+            if name is None:
+                continue
+
+            if name == "name":
+                res[name] = cls.validate_name(v)
+            else:
+                pending[name] = v
+
+        return cls._construct(res, pending=pending)
+
+    @classmethod
+    def _load_lazy(cls, name: str, raw: Any) -> Any:  # noqa: ANN401
+        section = _SECTIONS[name]
+        if issubclass(section, TslLazySection):
+            return section.decode_lazy(raw)
+
+        return decode_section(section, raw, trusted=False)
+
+    def encode_tsl(self, source: JsonDict | None = None) -> JsonDict:
+        """Encode the sections back to TSL hex values.
+
+        The sections that aren't modeled and the bytes that aren't decoded are
+        copied from `source`, the raw param set, which defaults to the values
+        the param set was decoded from. Sections that weren't decoded yet are
+        copied as is.
+        """
+        if source is None:
+            source = self._raw or {}
+
+        layout = self.__tsl_layout__
+        res: JsonDict = {}
+        for alias, v in source.items():
+            name = layout.by_alias.get(alias)
+            if name is None:
+                res[alias] = v if isinstance(v, list) else to_hex(v)
+            else:
+                res[alias] = self._encode_field(name, v)
+
+        for name, alias in zip(layout.fields, layout.aliases, strict=True):
+            if alias in res:
+                continue
+            encoded = self._encode_field(name)
+            if encoded is not None:
+                res[alias] = encoded
+
+        return res
+
+    def _encode_field(self, name: str, source: TslValues | None = None) -> Any:  # noqa: ANN401
+        pending = self._pending
+        if pending and name in pending and name not in self.__dict__:
+            return to_hex(hex_view(pending[name]))
+
+        value = getattr(self, name)
+        if value is None:
+            return None
+        if name == "name":
+            return to_hex(encode_name(value))
+
+        return to_hex(value.encode_tsl(source))
+
+
+def encode_name(name: str) -> bytes:
+    if len(name) > MAX_NAME_LENGTH:
+        raise NameTooLongError(len(name))
+
+    return name.ljust(MAX_NAME_LENGTH).encode("latin-1")
+
+
+_SECTIONS: dict[str, Any] = {
+    n: strip_optional(f.annotation)
+    for n, f in ParamSetModel.model_fields.items()
+    if n != "name"
+}
+
 
 class MemoModel(TslObject):
     memo: str
@@ -618,8 +615,49 @@ class PatchModel(TslObject):
     param_set: ParamSetModel = Field(alias="paramSet")
 
     @classmethod
-    def decode_tsl(cls, values: JsonDict) -> "PatchModel":
-        return PatchModel(**values)
+    def decode_tsl(
+        cls,
+        values: JsonDict,
+        *,
+        trusted: bool = False,
+        lazy: bool = False,
+        cache: SectionStore | None = None,
+    ) -> "PatchModel":
+        if lazy:
+            param_set = ParamSetModel.decode_lazy(values["paramSet"])
+            values = {**values, "paramSet": param_set}
+        elif cache is not None:
+            param_set = ParamSetModel.construct_tsl(
+                values["paramSet"], trusted=trusted, cache=cache
+            )
+            values = {**values, "paramSet": param_set}
+        if not trusted:
+            return PatchModel(**values)
+
+        memo = values.get("memo")
+        if isinstance(memo, dict):
+            memo = MemoModel._construct(dict(memo), by_alias=True)  # noqa: SLF001
+
+        param_set = values["paramSet"]
+        if not isinstance(param_set, ParamSetModel):
+            param_set = ParamSetModel.construct_tsl(param_set)
+
+        return cls._construct({"memo": memo, "param_set": param_set})
+
+    def encode_tsl(self, source: JsonDict | None = None) -> JsonDict:
+        """Encode the patch back to its TSL values, see `TslModel.encode_tsl()`."""
+        source = source or {}
+        res = dict(source)
+
+        memo = self.memo
+        if isinstance(memo, MemoModel):
+            res["memo"] = memo.model_dump(by_alias=True, exclude_none=True)
+        elif memo is not None:
+            res["memo"] = memo
+
+        res["paramSet"] = self.param_set.encode_tsl(source.get("paramSet"))
+
+        return res
 
 
 class TslModel(TslObject):
@@ -629,15 +667,79 @@ class TslModel(TslObject):
     data: list[list[PatchModel]]
 
     @classmethod
-    def decode_tsl(cls, values: JsonDict) -> "TslModel":
+    def decode_tsl(
+        cls,
+        values: JsonDict,
+        *,
+        trusted: bool = False,
+        lazy: bool = False,
+        cache: SectionStore | None = None,
+    ) -> "TslModel":
+        """Decode a TSL document.
+
+        With `trusted`, the model tree is built without pydantic validation.
+        Values are still range-checked while decoding, which is enough for
+        files produced by Boss Tone Studio and several times faster.
+
+        With `lazy`, the sections of the patches are only decoded when they
+        are accessed, see `ParamSetModel.decode_lazy()`.
+
+        With `cache`, sections are looked up in a `SectionStore` before being
+        decoded, see `SectionCache` and `SectionPool`. `lazy` takes precedence.
+        """
+        if trusted:
+            return cls._construct(
+                {
+                    **values,
+                    "device": cls.validate_device(values["device"]),
+                    "data": [
+                        [
+                            PatchModel.decode_tsl(
+                                p, trusted=True, lazy=lazy, cache=cache
+                            )
+                            for p in entries
+                        ]
+                        for entries in values["data"]
+                    ],
+                },
+                by_alias=True,
+            )
+
         for idx, entries in enumerate(values["data"]):
-            values["data"][idx] = list(map(PatchModel.decode_tsl, entries))
+            values["data"][idx] = [
+                PatchModel.decode_tsl(p, lazy=lazy, cache=cache) for p in entries
+            ]
 
         return TslModel(**values)
 
+    def encode_tsl(self, source: JsonDict | None = None) -> JsonDict:
+        """Encode the document back to TSL values, ready to be dumped to JSON.
+
+        Values are encoded over the bytes the models were decoded from, so
+        that the bytes they don't describe are kept. `source`, the values the
+        document was decoded from, is used instead when it is given.
+        """
+        source = source or {}
+        data = source.get("data") or []
+
+        return {
+            **source,
+            "name": self.name,
+            "formatRev": self.format_rev,
+            "device": self.device,
+            "data": [
+                [p.encode_tsl(_get(_get(data, i), j)) for j, p in enumerate(entries)]
+                for i, entries in enumerate(self.data)
+            ],
+        }
+
     @field_validator("device")
     def validate_device(cls, v: str) -> str:
         if v != "KATANA MkII":
             raise UnsupportedDeviceError(v)
 
         return v
+
+
+def _get(values: list[Any] | None, idx: int) -> Any:  # noqa: ANN401
+    return values[idx] if values is not None and idx < len(values) else None
@@ -1,6 +1,20 @@
-from collections.abc import Sequence
+import math
+import threading
+from abc import abstractmethod
+from collections import Counter
+from collections.abc import Callable, Iterator, Sequence, Sized
 from enum import IntEnum
-from typing import Annotated, Any, Generic, TypeVar, cast
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    ClassVar,
+    Generic,
+    NamedTuple,
+    Protocol,
+    TypeVar,
+    get_args,
+)
 
 from pydantic import (
     BaseModel,
@@ -8,32 +22,172 @@ from pydantic import (
     Field,
     GetCoreSchemaHandler,
     PrivateAttr,
+    SerializerFunctionWrapHandler,
+    model_serializer,
 )
+from pydantic.main import TupleGenerator
 from pydantic_core import CoreSchema, core_schema
 
-from katana_tsl_parser.errors import InvalidQValueError, InvalidValueListLengthError
+from katana_tsl_parser.errors import (
+    InvalidQValueError,
+    InvalidValueListLengthError,
+    MissingFieldsError,
+)
+
+from .layout import (
+    Decoder,
+    Encoder,
+    FieldSpec,
+    byte_table,
+    compile_decoder,
+    compile_encoder,
+    field_spec,
+)
+
+if TYPE_CHECKING:
+    from pydantic._internal._repr import ReprArgs
 
 JsonDict = dict[str, Any]
+TslValues = list[str] | bytes | memoryview
 
 
 def i(n: str) -> int:
     return int(n, 16)
 
 
-def decode_delay_time(values: list[str]) -> int:
-    time = 0
-    for v in values:
-        time <<= 7
-        time += i(v)
+def hex_view(values: TslValues) -> memoryview:
+    """Return the raw bytes of a section, converting hex strings in one pass.
+
+    Slicing the returned view is zero-copy, so sub-sections can be handed to
+    nested decoders without duplicating the data.
+    """
+    if isinstance(values, memoryview):
+        return values
+
+    if isinstance(values, list):
+        values = bytes.fromhex("".join(values))
+
+    return memoryview(values)
+
 
-    return time
+def hex_views(values: JsonDict) -> JsonDict:
+    """Convert the hex sections of a param set to views on a single buffer.
 
+    All the sections are converted in one pass and share one `bytes` object,
+    which the decoded sections keep a reference to. Other values are kept.
+    """
+    sections = [(k, v) for k, v in values.items() if isinstance(v, list)]
+    if not sections:
+        return values
 
+    buffer = memoryview(bytes.fromhex("".join(["".join(v) for _, v in sections])))
+    res = dict(values)
+    pos = 0
+    for key, v in sections:
+        res[key] = buffer[pos : pos + len(v)]
+        pos += len(v)
+
+    return res
+
+
+_HEX = [f"{b:02X}" for b in range(256)]
+
+
+def to_hex(data: bytes | bytearray | memoryview) -> list[str]:
+    """Format bytes as the hex strings of a TSL file, the inverse of hex_view()."""
+    return list(map(_HEX.__getitem__, data))
+
+
+T = TypeVar("T")
 IntEnumT = TypeVar("IntEnumT", bound=IntEnum)
+ModelT = TypeVar("ModelT", bound="_TslBaseModel")
+SectionT = TypeVar("SectionT", bound="TslSection")
+
+
+class SectionStore(Protocol):
+    """Where sections are looked up before being decoded, see `SectionPool`."""
+
+    def section(self, section: type[T], values: TslValues, *, trusted: bool) -> T: ...
+
+
+class TslLayout(NamedTuple):
+    fields: tuple[str, ...]
+    aliases: tuple[str, ...]
+    by_alias: dict[str, str]
+    required: frozenset[str]
+    defaults: JsonDict
+    private: JsonDict
+    specs: tuple[FieldSpec, ...]
+    specs_by_name: dict[str, FieldSpec]
+    sizes: tuple[int, ...]
+
+    @property
+    def size(self) -> int:
+        return self.sizes[0]
 
 
 class _TslBaseModel(BaseModel):
-    _raw: list[str] | None = PrivateAttr(None)
+    # The validators are built on first use, not to pay for all the models
+    # when the package is imported
+    model_config = ConfigDict(defer_build=True)
+
+    # The bytes the model was decoded from, see `TslSection.encode_tsl()`
+    _raw: Any = PrivateAttr(None)
+
+    __tsl_layout__: ClassVar[TslLayout]
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__pydantic_init_subclass__(**kwargs)
+
+        fields = tuple(cls.model_fields)
+        aliases = tuple(f.alias or n for n, f in cls.model_fields.items())
+        specs = tuple(
+            filter(None, (field_spec(n, f) for n, f in cls.model_fields.items()))
+        )
+
+        sizes = cls.__dict__.get("__tsl_size__")
+        if sizes is None:
+            sizes = max((s.end for s in specs), default=len(fields))
+
+        cls.__tsl_layout__ = TslLayout(
+            fields=fields,
+            aliases=aliases,
+            by_alias=dict(zip(aliases, fields, strict=True)),
+            required=frozenset(n for n in fields if cls.model_fields[n].is_required()),
+            defaults={
+                n: f.get_default(call_default_factory=True)
+                for n, f in cls.model_fields.items()
+                if not f.is_required()
+            },
+            private={n: p.get_default() for n, p in cls.__private_attributes__.items()},
+            specs=specs,
+            specs_by_name={s.name: s for s in specs},
+            sizes=tuple(sizes) if isinstance(sizes, Sequence) else (sizes,),
+        )
+
+    @classmethod
+    def model_rebuild(
+        cls,
+        *,
+        force: bool = False,
+        raise_errors: bool = True,
+        _parent_namespace_depth: int = 2,
+        _types_namespace: Any = None,  # noqa: ANN401
+    ) -> bool | None:
+        # Build the nested models first: their validators are then reused
+        # rather than generated again inside every model that contains them
+        for info in cls.model_fields.values():
+            for model in _models(info.annotation):
+                if not model.__pydantic_complete__:
+                    model.model_rebuild(raise_errors=raise_errors)
+
+        return super().model_rebuild(
+            force=force,
+            raise_errors=raise_errors,
+            _parent_namespace_depth=_parent_namespace_depth + 1,
+            _types_namespace=_types_namespace,
+        )
 
     def __init__(self, **data: JsonDict) -> None:
         _raw = data.pop("_raw", None)
@@ -41,35 +195,401 @@ class _TslBaseModel(BaseModel):
         super().__init__(**data)
 
         if _raw:
-            self._raw = cast("list[str]", _raw)
+            self._raw = _raw
+
+    @classmethod
+    def _construct(  # noqa: PYI019
+        cls: type[ModelT],
+        values: JsonDict,
+        *,
+        by_alias: bool = False,
+        pending: JsonDict | None = None,
+    ) -> ModelT:
+        """Build an instance from already validated values, bypassing pydantic.
+
+        This is a leaner `model_construct()`: `values` must be in field order
+        and may become the instance dict, so it must not be shared. `pending`
+        holds the raw values of fields that are only decoded on access, see
+        `TslLazyModel`.
+        """
+        _raw = values.pop("_raw", None)
+
+        layout = cls.__tsl_layout__
+        fields = layout.fields
+        if by_alias:
+            values = {layout.by_alias.get(k, k): v for k, v in values.items()}
+
+        fields_set = set(values)
+        if pending:
+            fields_set.update(pending)
+
+        if by_alias or len(fields_set) != len(fields):
+            if missing := layout.required - fields_set:
+                raise MissingFieldsError(sorted(missing))
+
+            defaults = layout.defaults
+            values = {
+                n: values[n] if n in values else defaults[n]
+                for n in fields
+                if not pending or n not in pending
+            }
+
+        private = {**layout.private, "_raw": _raw}
+        if pending:
+            private["_pending"] = pending
+
+        obj = cls.__new__(cls)
+        _set = object.__setattr__
+        _set(obj, "__dict__", values)
+        _set(obj, "__pydantic_fields_set__", fields_set)
+        _set(obj, "__pydantic_extra__", None)
+        _set(obj, "__pydantic_private__", private)
+
+        return obj
+
+    def __getstate__(self) -> dict[Any, Any]:
+        state = super().__getstate__()
+
+        # Views on the source bytes can't be pickled, copy them
+        private = state["__pydantic_private__"]
+        raw = private.get("_raw")
+        if isinstance(raw, memoryview):
+            state["__pydantic_private__"] = {**private, "_raw": raw.tobytes()}
+        elif isinstance(raw, dict):
+            raw = {
+                k: v.tobytes() if isinstance(v, memoryview) else v
+                for k, v in raw.items()
+            }
+            state["__pydantic_private__"] = {**private, "_raw": raw}
+
+        return state
 
     @classmethod
     def _get_fields(cls, *, by_alias: bool = False) -> set[str]:
-        return set(cls.model_json_schema(by_alias=by_alias)["properties"].keys())
+        layout = cls.__tsl_layout__
+        return set(layout.aliases if by_alias else layout.fields)
 
     @classmethod
     def _expect_size(
-        cls, values: list[Any], expected: Sequence[int] | int | None = None
+        cls, values: Sized, expected: Sequence[int] | int | None = None
     ) -> None:
         size = len(values)
-        if isinstance(expected, Sequence):
+        if isinstance(expected, tuple | list):
             if size not in expected:
+                if len(expected) == 1:
+                    raise InvalidValueListLengthError(size, expected[0])
                 raise InvalidValueListLengthError(size, expected)
 
             return
 
-        expected = expected or len(cls._get_fields())
+        expected = expected or cls.__tsl_layout__.size
         if size != expected:
             raise InvalidValueListLengthError(size, expected)
 
 
+def _models(annotation: Any) -> Iterator[type[_TslBaseModel]]:  # noqa: ANN401
+    """The models in a field annotation, e.g. `list[PatchModel] | None`."""
+    if isinstance(annotation, type) and issubclass(annotation, _TslBaseModel):
+        yield annotation
+        return
+
+    for arg in get_args(annotation):
+        yield from _models(arg)
+
+
 class TslObject(_TslBaseModel):
     model_config = ConfigDict(populate_by_name=True, extra="forbid")
 
 
+class TslLazyModel(_TslBaseModel):
+    """Mixin for models whose fields can be decoded on first access.
+
+    Pending fields are kept as raw values in `_pending` and are decoded and
+    validated by `_load_lazy()` the first time they are read. Serialization,
+    comparison and iteration decode whatever is still pending, so lazy models
+    behave exactly like eagerly decoded ones.
+    """
+
+    _pending: JsonDict | None = PrivateAttr(None)
+
+    __tsl_decode_counts__: ClassVar[Counter[str]] = Counter()
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__pydantic_init_subclass__(**kwargs)
+
+        cls.__tsl_decode_counts__ = Counter()
+
+    @classmethod
+    @abstractmethod
+    def _load_lazy(cls, name: str, raw: Any) -> Any:  # noqa: ANN401
+        """Decode and validate the raw value of the pending field `name`."""
+
+    @classmethod
+    def decode_counts(cls) -> Counter[str]:
+        """Number of times each field was decoded on access, across instances."""
+        return cls.__tsl_decode_counts__.copy()
+
+    @classmethod
+    def reset_decode_counts(cls) -> None:
+        cls.__tsl_decode_counts__.clear()
+
+    def __getattr__(self, item: str) -> Any:  # noqa: ANN401
+        private = object.__getattribute__(self, "__pydantic_private__")
+        pending = private and private.get("_pending")
+        if pending and item in pending:
+            value = self._load_lazy(item, pending[item])
+            self.__dict__[item] = value
+            self.__tsl_decode_counts__[item] += 1
+
+            return value
+
+        return super().__getattr__(item)  # type: ignore[misc]
+
+    @property
+    def pending_fields(self) -> tuple[str, ...]:
+        """Names of the fields that have not been decoded yet."""
+        pending = self._pending or {}
+
+        return tuple(n for n in pending if n not in self.__dict__)
+
+    def _materialize(self) -> None:
+        if not self.pending_fields:
+            return
+
+        for name in self.pending_fields:
+            getattr(self, name)
+
+        # Serialization follows the order of the instance dict
+        values = self.__dict__
+        object.__setattr__(
+            self, "__dict__", {n: values[n] for n in self.__tsl_layout__.fields}
+        )
+        self._pending = None
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler: SerializerFunctionWrapHandler) -> Any:  # noqa: ANN401
+        self._materialize()
+
+        return handler(self)
+
+    def __eq__(self, other: object) -> bool:
+        self._materialize()
+        if isinstance(other, TslLazyModel):
+            other._materialize()
+
+        return super().__eq__(other)
+
+    def __hash__(self) -> int:
+        if not self.model_config.get("frozen"):
+            msg = f"unhashable type: {type(self).__name__!r}"
+            raise TypeError(msg)
+
+        self._materialize()
+
+        return hash(tuple(self.__dict__.values()))
+
+    def __getstate__(self) -> dict[Any, Any]:
+        self._materialize()
+
+        return super().__getstate__()
+
+    def __iter__(self) -> TupleGenerator:
+        self._materialize()
+
+        return super().__iter__()
+
+    def __repr_args__(self) -> "ReprArgs":
+        self._materialize()
+
+        return super().__repr_args__()
+
+
+class _Compiled(Generic[T]):
+    """A class attribute compiled by `compile()` the first time it is read.
+
+    Every section class gets its own descriptor, which the value then
+    replaces, so that a subclass never inherits the value of its base. The
+    bases without fields, such as `TslLazySection`, are compiled on each read
+    and never cache anything.
+
+    When several threads compile the same value, the first one stored wins,
+    so that the compiled decoders of the outer sections all refer to it.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, compile: Callable[[Any], T]) -> None:  # noqa: A002
+        self.compile = compile
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: object, cls: "type[TslSection]") -> T:
+        value = self.compile(cls)
+        if cls.__tsl_layout__.specs:
+            with self._lock:
+                current: T | _Compiled[T] = cls.__dict__.get(self.name, self)
+                if not isinstance(current, _Compiled):
+                    return current
+                setattr(cls, self.name, value)
+
+        return value
+
+    def copy(self) -> "_Compiled[T]":
+        compiled = _Compiled(self.compile)
+        compiled.name = self.name
+
+        return compiled
+
+
+def _decoder(cls: "type[TslSection]") -> Decoder:
+    layout = cls.__tsl_layout__
+    return compile_decoder(cls.__qualname__, layout.specs, min(layout.sizes))
+
+
+def _trusted_decoder(cls: "type[TslSection]") -> Decoder:
+    layout = cls.__tsl_layout__
+    return compile_decoder(
+        cls.__qualname__, layout.specs, min(layout.sizes), trusted=True
+    )
+
+
+def _encoder(cls: "type[TslSection]") -> Encoder:
+    layout = cls.__tsl_layout__
+    return compile_encoder(cls.__qualname__, layout.specs, min(layout.sizes))
+
+
+class TslSection(TslObject):
+    """A section whose fields are decoded from fixed offsets of the raw bytes.
+
+    Fields are annotated with `At` metadata and a decoder specialized for the
+    layout is compiled the first time a section of the class is decoded.
+    `__tsl_size__` lists the accepted lengths when it differs from the extent
+    of the fields.
+
+    Sections are frozen, so that identical ones can be shared between patches.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    __tsl_size__: ClassVar[int | tuple[int, ...] | None] = None
+    __tsl_decoder__: ClassVar[Decoder] = _Compiled(_decoder)  # type: ignore[assignment]
+    __tsl_trusted_decoder__: ClassVar[Decoder] = _Compiled(_trusted_decoder)  # type: ignore[assignment]
+    __tsl_lazy_decoder__: ClassVar[Decoder]
+    __tsl_encoder__: ClassVar[Encoder] = _Compiled(_encoder)  # type: ignore[assignment]
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__pydantic_init_subclass__(**kwargs)
+
+        # The inherited attribute may already be compiled for the base
+        for name in ("__tsl_decoder__", "__tsl_trusted_decoder__", "__tsl_encoder__"):
+            if name not in cls.__dict__:
+                setattr(cls, name, TslSection.__dict__[name].copy())
+
+    @classmethod
+    def decode_tsl(cls, values: TslValues) -> JsonDict:
+        data = hex_view(values)
+        cls._expect_size(data, cls.__tsl_layout__.sizes)
+
+        return cls.__tsl_decoder__(data)
+
+    @classmethod
+    def construct_tsl(cls: type[SectionT], values: TslValues) -> SectionT:  # noqa: PYI019
+        """Decode a section without pydantic validation.
+
+        Field constraints are checked by the decoder itself, which raises
+        `ValueError`s rather than a `ValidationError`.
+        """
+        data = hex_view(values)
+        cls._expect_size(data, cls.__tsl_layout__.sizes)
+
+        return cls._construct(cls.__tsl_trusted_decoder__(data))
+
+    def encode_tsl(self, source: TslValues | None = None) -> bytearray:
+        """Encode the section back to bytes.
+
+        The bytes that aren't decoded, such as unknown parameters, are copied
+        from `source`, which defaults to the bytes the section was decoded
+        from. They are zero when neither is available.
+        """
+        if source is None:
+            source = self._raw
+
+        if source is not None:
+            data = bytearray(hex_view(source))
+        else:
+            data = bytearray(self._encoded_size())
+
+        type(self).__tsl_encoder__(self, data, 0, len(data))
+
+        return data
+
+    def _encoded_size(self) -> int:
+        sizes = sorted(self.__tsl_layout__.sizes)
+        size = sizes[0]
+        for spec in self.__tsl_layout__.specs:
+            if spec.end > size and getattr(self, spec.name) is not None:
+                size = next(s for s in sizes if s >= spec.end)
+
+        return size
+
+
+def decode_section(section: type[T], values: TslValues, *, trusted: bool) -> T:
+    """Decode a section, validating it with pydantic unless `trusted`."""
+    if trusted:
+        obj: T = section.construct_tsl(values)  # type: ignore[attr-defined]
+    else:
+        obj = section(**section.decode_tsl(values))  # type: ignore[attr-defined]
+
+    return obj
+
+
+class TslLazySection(TslLazyModel, TslSection):
+    """A section whose nested sections can be decoded on first access."""
+
+    @classmethod
+    def decode_lazy(cls: type[SectionT], values: TslValues) -> SectionT:  # noqa: PYI019
+        """Decode the scalar fields now and defer the nested sections.
+
+        Scalar fields are checked like in `construct_tsl()`, nested sections
+        are validated when they are materialized.
+        """
+        data = hex_view(values)
+        cls._expect_size(data, cls.__tsl_layout__.sizes)
+
+        decoder = cls.__dict__.get("__tsl_lazy_decoder__")
+        if decoder is None:
+            layout = cls.__tsl_layout__
+            scalars = tuple(s for s in layout.specs if not s.is_section)
+            decoder = compile_decoder(
+                cls.__qualname__, scalars, min(layout.sizes), trusted=True
+            )
+            cls.__tsl_lazy_decoder__ = decoder
+
+        size = len(data)
+        pending = {
+            s.name: data[s.offset : s.end]
+            for s in cls.__tsl_layout__.specs
+            if s.is_section and s.end <= size
+        }
+
+        return cls._construct(decoder(data), pending=pending)
+
+    @classmethod
+    def _load_lazy(cls, name: str, raw: Any) -> Any:  # noqa: ANN401
+        section = cls.__tsl_layout__.specs_by_name[name].type_
+
+        return section(**section.decode_tsl(raw))
+
+
 class TslList(_TslBaseModel, Generic[IntEnumT]):
     root: list[IntEnumT]
 
+    def encode_tsl(self, source: TslValues | None = None) -> bytearray:  # noqa: ARG002
+        return bytearray(self.root)
+
 
 Percent = Annotated[int, Field(ge=0, le=100)]
 
@@ -104,7 +624,15 @@ class Gain12dBImpl(float):
 
     @classmethod
     def parse(cls, v: str) -> "Gain12dB":
-        return cls((i(v) - 24) * 0.5)
+        return byte_table(cls.from_byte)[i(v)]  # type: ignore[no-any-return]
+
+    @classmethod
+    def from_byte(cls, v: int) -> "Gain12dB":
+        return cls((v - 24) * 0.5)
+
+    @staticmethod
+    def to_byte(v: float) -> int:
+        return round(v * 2) + 24
 
 
 Gain12dB = Annotated[Gain12dBImpl, Field(ge=-12.0, le=12.0, multiple_of=0.5)]
@@ -121,7 +649,15 @@ class Gain20dBImpl(int):
 
     @classmethod
     def parse(cls, v: str) -> "Gain20dB":
-        return cls(i(v) - 20)
+        return byte_table(cls.from_byte)[i(v)]  # type: ignore[no-any-return]
+
+    @classmethod
+    def from_byte(cls, v: int) -> "Gain20dB":
+        return cls(v - 20)
+
+    @staticmethod
+    def to_byte(v: int) -> int:
+        return v + 20
 
 
 Gain20dB = Annotated[Gain20dBImpl, Field(ge=-20, le=20)]
@@ -138,7 +674,15 @@ class PitchImpl(int):
 
     @classmethod
     def parse(cls, v: str) -> "Pitch":
-        return cls(i(v) - 24)
+        return byte_table(cls.from_byte)[i(v)]  # type: ignore[no-any-return]
+
+    @classmethod
+    def from_byte(cls, v: int) -> "Pitch":
+        return cls(v - 24)
+
+    @staticmethod
+    def to_byte(v: int) -> int:
+        return v + 24
 
 
 Pitch = Annotated[PitchImpl, Field(ge=-24, le=24)]
@@ -157,7 +701,15 @@ class Q(float):
 
     @classmethod
     def parse(cls, v: str) -> "Q":
-        return cls(2.0 ** (i(v) - 1))
+        return byte_table(cls.from_byte)[i(v)]  # type: ignore[no-any-return]
+
+    @classmethod
+    def from_byte(cls, v: int) -> "Q":
+        return cls(2.0 ** (v - 1))
+
+    @staticmethod
+    def to_byte(v: float) -> int:
+        return round(math.log2(v)) + 1
 
     @classmethod
     def validate(cls, v: float) -> float:
@@ -0,0 +1,284 @@
+"""A compact binary format for TSL libraries, read through a memory map.
+
+TSL files spell every byte as a quoted hex string, packed libraries store the
+sections as raw bytes, in a fraction of the space, and index the patches so
+that any of them is decoded without reading the others.
+
+Layout, little-endian:
+
+- header: magic, number of patches, offset of the index, size of the meta
+- records, one per patch: the number of sections and the size of the JSON
+  part, the id and size of each section, the JSON part, which holds what
+  isn't a section, such as the memo, and the raw bytes of the sections
+- meta: JSON with the top-level fields of the TSL file and the names of the
+  sections, written last as they are only known at the end
+- index: the offsets of the records, followed by the offset of the meta
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import IO
+
+from katana_tsl_parser.errors import InvalidTslFileError
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict, SectionStore, to_hex
+from katana_tsl_parser.reader import TslStream
+from katana_tsl_parser.writer import DEVICE, FORMAT_REV, write_tsl
+
+MAGIC = b"TSLPACK1"
+
+_HEADER = struct.Struct("<8sQQI")
+_RECORD = struct.Struct("<HI")
+_SECTION = struct.Struct("<HH")
+_OFFSET = struct.Struct("<Q")
+
+
+def write_packed(
+    dest: "str | os.PathLike[str] | IO[bytes]",
+    patches: Iterable[PatchModel | JsonDict],
+    *,
+    name: str,
+    format_rev: str = FORMAT_REV,
+    device: str = DEVICE,
+) -> int:
+    """Write patches to a packed library, return their count.
+
+    Like `write_tsl()`, models are encoded with `PatchModel.encode_tsl()` and
+    the patches are written one at a time. `dest` must be seekable.
+    """
+    sections: dict[str, int] = {}
+    offsets = array("Q")
+
+    with _open(dest) as f:
+        start = f.tell()
+        f.write(_HEADER.pack(MAGIC, 0, 0, 0))
+
+        for patch in patches:
+            values = patch.encode_tsl() if isinstance(patch, PatchModel) else patch
+            offsets.append(f.tell() - start)
+            f.write(_pack_record(values, sections))
+
+        offsets.append(f.tell() - start)
+        meta = json.dumps(
+            {
+                "name": name,
+                "formatRev": format_rev,
+                "device": device,
+                "sections": list(sections),
+            }
+        ).encode()
+        f.write(meta)
+
+        index = f.tell() - start
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        f.write(offsets.tobytes())
+
+        end = f.tell()
+        f.seek(start)
+        f.write(_HEADER.pack(MAGIC, len(offsets) - 1, index, len(meta)))
+        f.seek(end)
+
+    return len(offsets) - 1
+
+
+def _pack_record(values: JsonDict, sections: dict[str, int]) -> bytes:
+    param_set = values["paramSet"]
+    rest = {k: v for k, v in param_set.items() if not _is_section(v)}
+    other = {**values, "paramSet": rest}
+
+    table = []
+    data = []
+    for key, value in param_set.items():
+        if key in rest:
+            continue
+        raw = bytes.fromhex("".join(value)) if isinstance(value, list) else value
+        table.append(_SECTION.pack(sections.setdefault(key, len(sections)), len(raw)))
+        data.append(raw)
+
+    other_bytes = json.dumps(other, separators=(",", ":")).encode()
+
+    return b"".join(
+        [_RECORD.pack(len(table), len(other_bytes)), *table, other_bytes, *data]
+    )
+
+
+def _is_section(value: object) -> bool:
+    return isinstance(value, list | bytes | memoryview)
+
+
+def pack_tsl(
+    source: str | os.PathLike[str], dest: "str | os.PathLike[str] | IO[bytes]"
+) -> int:
+    """Convert a TSL file to a packed library, return the number of patches.
+
+    The file is read as a stream and may be compressed, see `TslStream`.
+    """
+    with TslStream(source) as stream:
+        header = stream.header
+        return write_packed(
+            dest,
+            stream,
+            name=header["name"],
+            format_rev=header["formatRev"],
+            device=header["device"],
+        )
+
+
+def unpack_tsl(
+    source: str | os.PathLike[str], dest: "str | os.PathLike[str] | IO[str]"
+) -> int:
+    """Convert a packed library back to a TSL file, return the number of patches.
+
+    The file is compressed according to its suffix, see `write_tsl()`.
+    """
+    with PackedReader(source) as reader:
+        return write_tsl(
+            dest,
+            (reader.read(n, as_hex=True) for n in range(len(reader))),
+            name=reader.header["name"],
+            format_rev=reader.header["formatRev"],
+            device=reader.header["device"],
+        )
+
+
+class PackedReader:
+    """Random access to the patches of a packed library, see `write_packed()`.
+
+    The file is memory-mapped, opening it only reads the header and the meta,
+    and reading a patch only touches its record and its entry in the index.
+    Mirrors `TslReader`.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+
+        with self.path.open("rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise InvalidTslFileError(str(e)) from e
+
+        try:
+            magic, count, index, meta_size = _HEADER.unpack_from(self._mm)
+            if magic != MAGIC:
+                msg = "not a packed library"
+                raise InvalidTslFileError(msg)
+
+            self._count: int = count
+            self._index: int = index
+            meta_start = self._offset(self._count)
+            meta = json.loads(self._mm[meta_start : meta_start + meta_size])
+        except (struct.error, ValueError) as e:
+            self._mm.close()
+            if isinstance(e, InvalidTslFileError):
+                raise
+            raise InvalidTslFileError(str(e)) from e
+
+        self.sections: list[str] = meta.pop("sections")
+        self.header: JsonDict = meta
+
+    def __enter__(self) -> "PackedReader":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def read(self, index: int, *, as_hex: bool = False) -> JsonDict:
+        """Return the values of a patch, with views on the raw sections.
+
+        The sections are hex strings like in a TSL file with `as_hex`.
+        """
+        n = len(self)
+        if not -n <= index < n:
+            msg = f"patch index out of range: {index}"
+            raise IndexError(msg)
+
+        index %= n
+        start, end = self._offset(index), self._offset(index + 1)
+        # Copied out of the map, so that the models don't pin it
+        record = self._mm[start:end]
+        view = memoryview(record)
+
+        count, other_size = _RECORD.unpack_from(record)
+        pos = _RECORD.size + count * _SECTION.size
+        values: JsonDict = json.loads(record[pos : pos + other_size])
+        pos += other_size
+
+        param_set = {}
+        for i in range(count):
+            key, size = _SECTION.unpack_from(record, _RECORD.size + i * _SECTION.size)
+            data = view[pos : pos + size]
+            param_set[self.sections[key]] = to_hex(data) if as_hex else data
+            pos += size
+
+        values["paramSet"] = {**param_set, **values["paramSet"]}
+
+        return values
+
+    def patch(
+        self,
+        index: int,
+        *,
+        trusted: bool = False,
+        lazy: bool = False,
+        cache: SectionStore | None = None,
+    ) -> PatchModel:
+        """Decode a patch, see `TslModel.decode_tsl()` for the options."""
+        values = self.read(index)
+
+        return PatchModel.decode_tsl(values, trusted=trusted, lazy=lazy, cache=cache)
+
+    def __iter__(self) -> Iterator[PatchModel]:
+        for n in range(len(self)):
+            yield self.patch(n)
+
+    def load(
+        self,
+        *,
+        trusted: bool = False,
+        lazy: bool = False,
+        cache: SectionStore | None = None,
+    ) -> TslModel:
+        """Decode the whole library, see `TslModel.decode_tsl()`."""
+        values = {
+            **self.header,
+            "data": [[self.read(n) for n in range(len(self))]],
+        }
+
+        return TslModel.decode_tsl(values, trusted=trusted, lazy=lazy, cache=cache)
+
+    def _offset(self, index: int) -> int:
+        offset: int = _OFFSET.unpack_from(self._mm, self._index + index * _OFFSET.size)[
+            0
+        ]
+        return offset
+
+
+@contextmanager
+def _open(dest: "str | os.PathLike[str] | IO[bytes]") -> Iterator[IO[bytes]]:
+    if isinstance(dest, str | os.PathLike):
+        with Path(dest).open("wb") as f:
+            yield f
+    else:
+        yield dest
@@ -0,0 +1,424 @@
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import deque
+from collections.abc import Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from types import TracebackType
+from typing import IO
+
+from katana_tsl_parser.compression import is_compressed, open_input
+from katana_tsl_parser.errors import InvalidTslFileError
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict, SectionStore
+
+_BRACKET = re.compile(rb"[\[\]{}]")
+_QUOTE_OR_ESCAPE = re.compile(rb'"|\\.', re.DOTALL)
+_DATA_KEY = re.compile(rb'"data"\s*:\s*$')
+_OPEN = b"[{"
+
+# Nesting depth of the `data` array, of its groups and of their patches
+_DATA_DEPTH = 2
+_GROUP_DEPTH = 3
+_PATCH_DEPTH = 4
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_INDEX_MAGIC = b"TSLIDX01"
+_INDEX_HEADER = struct.Struct("<8sQQII")
+
+
+class _PatchScanner:
+    """Incremental search of the patches of `data[0]` in a TSL document.
+
+    Brackets are the only tokens needed to delimit the patches, the ones that
+    are part of strings are skipped by counting the quotes that precede them.
+    """
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.data_start = self.data_end = -1
+        self.in_data = False
+        self.groups = 0
+        self.patch_start = 0
+
+        self.in_string = False
+        self.last = 0
+        self.pos = 0
+
+    @property
+    def keep(self) -> int:
+        """Offset of the first byte still needed by the scan."""
+        if not self.in_data:
+            return 0
+        if self.depth >= _PATCH_DEPTH:
+            return min(self.patch_start, self.last)
+
+        return self.last
+
+    def shift(self, n: int) -> None:
+        """Account for `n` bytes dropped from the start of the buffer."""
+        self.data_start -= n
+        self.patch_start -= n
+        self.last -= n
+        self.pos -= n
+
+    def scan(self, raw: bytes) -> list[tuple[int, int]]:  # noqa: C901
+        """Return the offsets of the patches completed in `raw` since last call."""
+        patches = []
+
+        for m in _BRACKET.finditer(raw, self.pos):
+            pos = m.start()
+            self.pos = pos + 1
+
+            start, self.last = self.last, pos
+            self.in_string ^= bool(_count_quotes(raw, start, pos) & 1)
+            if self.in_string:
+                continue
+
+            if raw[pos] in _OPEN:
+                self.depth += 1
+                if not self.in_data:
+                    if self.depth == _DATA_DEPTH and _DATA_KEY.search(raw, start, pos):
+                        self.data_start = pos
+                        self.in_data = True
+                elif self.depth == _GROUP_DEPTH:
+                    self.groups += 1
+                elif self.depth == _PATCH_DEPTH and self.groups == 1:
+                    self.patch_start = pos
+            else:
+                if self.in_data:
+                    if self.depth == _PATCH_DEPTH and self.groups == 1:
+                        patches.append((self.patch_start, pos + 1))
+                    elif self.depth == _DATA_DEPTH:
+                        self.data_end = pos + 1
+                        break
+                self.depth -= 1
+
+        return patches
+
+    def check(self) -> None:
+        if self.data_end < 0:
+            msg = "unterminated data" if self.in_data else "no data"
+            raise InvalidTslFileError(msg)
+
+
+def _count_quotes(raw: bytes, start: int, end: int) -> int:
+    quotes = raw.count(b'"', start, end)
+    if quotes and raw.find(b"\\", start, end) >= 0:
+        # Ignore the escaped quotes
+        quotes = sum(q == b'"' for q in _QUOTE_OR_ESCAPE.findall(raw, start, end))
+
+    return quotes
+
+
+def _header(raw: bytes) -> JsonDict:
+    try:
+        header: JsonDict = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise InvalidTslFileError(str(e)) from e
+
+    del header["data"]
+    if "device" not in header:
+        # Streams only see the fields that precede `data`, see `TslStream`
+        msg = "no device"
+        raise InvalidTslFileError(msg)
+    TslModel.validate_device(header["device"])
+
+    return header
+
+
+def scan_patches(raw: bytes) -> tuple[JsonDict, "array[int]"]:
+    """Locate the patches of `data[0]` without decoding the whole document.
+
+    Returns the top-level fields other than `data`, and the start and end
+    offsets of each patch, flattened.
+    """
+    scanner = _PatchScanner()
+    offsets = array("Q")
+    for patch in scanner.scan(raw):
+        offsets.extend(patch)
+
+    scanner.check()
+    header = _header(raw[: scanner.data_start] + b"[]" + raw[scanner.data_end :])
+
+    return header, offsets
+
+
+class PatchSplitter:
+    """Split a TSL document into the raw patches of `data[0]`, as it is read.
+
+    Used by `iter_patches()`, and by the callers that read the document
+    themselves.
+    """
+
+    def __init__(self) -> None:
+        self._scanner = _PatchScanner()
+        self._buf = b""
+        # The top-level fields other than `data`, once the scan reaches it
+        self.header: JsonDict | None = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the end of `data` was reached, the rest can be ignored."""
+        return self._scanner.data_end >= 0
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """Return the raw patches completed by `chunk`."""
+        scanner = self._scanner
+        buf = self._buf + chunk
+        spans = scanner.scan(buf)
+
+        if self.header is None and scanner.in_data:
+            self.header = _header(buf[: scanner.data_start] + b"[]}")
+
+        patches = [buf[start:end] for start, end in spans]
+
+        keep = scanner.keep
+        self._buf = buf[keep:]
+        scanner.shift(keep)
+
+        return patches
+
+    def close(self) -> None:
+        """Check that the document is complete."""
+        self._scanner.check()
+
+
+class TslStream:
+    """The header and the raw patches of a TSL document, read as a stream.
+
+    The document is decompressed as it is read when it is compressed, see
+    `compression.open_input()`. The top-level fields must precede `data`, as
+    they do in the files written by Boss Tone Studio.
+    """
+
+    def __init__(
+        self,
+        source: "str | os.PathLike[str] | IO[bytes] | IO[str]",
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.chunk_size = chunk_size
+
+        self._stack = ExitStack()
+        self._file = self._stack.enter_context(open_input(source))
+        self._splitter = PatchSplitter()
+        self._pending: deque[bytes] = deque()
+
+    def __enter__(self) -> "TslStream":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def header(self) -> JsonDict:
+        """The top-level fields other than `data`, reading up to it if needed."""
+        while self._splitter.header is None:
+            if not self._read():
+                self._splitter.close()
+
+        return self._splitter.header
+
+    def __iter__(self) -> Iterator[JsonDict]:
+        """Yield the values of the patches of `data[0]`."""
+        while True:
+            while self._pending:
+                yield json.loads(self._pending.popleft())
+            if not self._read():
+                break
+
+        self._splitter.close()
+
+    def close(self) -> None:
+        self._stack.close()
+
+    def _read(self) -> bool:
+        if self._splitter.done:
+            return False
+
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            return False
+
+        data = chunk.encode() if isinstance(chunk, str) else chunk
+        self._pending.extend(self._splitter.feed(data))
+
+        return True
+
+
+def iter_patches(
+    source: "str | os.PathLike[str] | IO[bytes] | IO[str]",
+    *,
+    trusted: bool = False,
+    lazy: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[PatchModel]:
+    """Decode the patches of a TSL file one at a time, as it is read.
+
+    Only the current patch is kept in memory, see `TslModel.decode_tsl()` for
+    the options and `TslStream` for the sources.
+    """
+    with TslStream(source, chunk_size=chunk_size) as stream:
+        for values in stream:
+            yield PatchModel.decode_tsl(values, trusted=trusted, lazy=lazy)
+
+
+def load_tsl(
+    source: "str | os.PathLike[str] | IO[bytes] | IO[str]",
+    *,
+    trusted: bool = False,
+    lazy: bool = False,
+    cache: SectionStore | None = None,
+) -> TslModel:
+    """Decode a TSL file as it is read, compressed or not.
+
+    The document is never held in memory as a whole, only the models are,
+    see `TslModel.decode_tsl()` for the options and `TslStream` for the
+    sources.
+    """
+    with TslStream(source) as stream:
+        header = stream.header
+        patches = [
+            PatchModel.decode_tsl(values, trusted=trusted, lazy=lazy, cache=cache)
+            for values in stream
+        ]
+
+    values = {**header, "data": [patches]}
+    if trusted:
+        return TslModel._construct(values, by_alias=True)  # noqa: SLF001
+
+    return TslModel(**values)
+
+
+def read_patch(path: Path | str, index: int) -> JsonDict:
+    """Return the raw values of a patch of a file, compressed or not.
+
+    Plain files are read at random with `TslReader`, compressed ones are
+    decompressed up to the patch, or to the end for negative indexes.
+    """
+    if not is_compressed(path):
+        return TslReader(path).read(index)
+
+    with TslStream(path) as stream:
+        if index < 0:
+            last = deque(stream, maxlen=-index)
+            if len(last) == -index:
+                return last[0]
+        else:
+            for n, values in enumerate(stream):
+                if n == index:
+                    return values
+
+    msg = f"patch index out of range: {index}"
+    raise IndexError(msg)
+
+
+class TslReader:
+    """Random access to the patches of a TSL file.
+
+    The file is scanned once to find the byte offsets of the patches, which
+    are then decoded individually. With `cache`, the offsets are stored in a
+    sidecar file, `<name>.idx`, which is rebuilt when the size or the
+    modification time of the file changes.
+    """
+
+    def __init__(self, path: Path | str, *, cache: bool = True) -> None:
+        self.path = Path(path)
+        self.index_path = self.path.with_name(f"{self.path.name}.idx")
+
+        stat = self.path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        index = self._load_index(key) if cache else None
+        if index is None:
+            index = scan_patches(self.path.read_bytes())
+            if cache:
+                self._save_index(key, *index)
+
+        self.header, self._offsets = index
+
+    def __len__(self) -> int:
+        return len(self._offsets) // 2
+
+    def read(self, index: int) -> JsonDict:
+        """Return the raw values of a patch."""
+        n = len(self)
+        if not -n <= index < n:
+            msg = f"patch index out of range: {index}"
+            raise IndexError(msg)
+
+        index %= n
+        start, end = self._offsets[2 * index : 2 * index + 2]
+        with self.path.open("rb") as f:
+            f.seek(start)
+            values: JsonDict = json.loads(f.read(end - start))
+
+        return values
+
+    def patch(
+        self,
+        index: int,
+        *,
+        trusted: bool = False,
+        lazy: bool = False,
+        cache: SectionStore | None = None,
+    ) -> PatchModel:
+        """Decode a patch, see `TslModel.decode_tsl()` for the options."""
+        values = self.read(index)
+
+        return PatchModel.decode_tsl(values, trusted=trusted, lazy=lazy, cache=cache)
+
+    def _load_index(self, key: tuple[int, int]) -> tuple[JsonDict, "array[int]"] | None:
+        try:
+            with self.index_path.open("rb") as f:
+                magic, mtime, size, count, header_size = _INDEX_HEADER.unpack(
+                    f.read(_INDEX_HEADER.size)
+                )
+                if magic != _INDEX_MAGIC or (mtime, size) != key:
+                    return None
+
+                header = json.loads(f.read(header_size))
+                offsets = array("Q")
+                offsets.fromfile(f, 2 * count)
+        except (OSError, EOFError, ValueError, struct.error):
+            return None
+
+        if sys.byteorder != "little":
+            offsets.byteswap()
+
+        return header, offsets
+
+    def _save_index(
+        self, key: tuple[int, int], header: JsonDict, offsets: "array[int]"
+    ) -> None:
+        header_bytes = json.dumps(header).encode()
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}")
+        try:
+            with tmp.open("wb") as f:
+                f.write(
+                    _INDEX_HEADER.pack(
+                        _INDEX_MAGIC, *key, len(offsets) // 2, len(header_bytes)
+                    )
+                )
+                f.write(header_bytes)
+                offsets.tofile(f)
+            tmp.replace(self.index_path)
+        except OSError:
+            # The index is only a cache, the file may be in a read-only location
+            tmp.unlink(missing_ok=True)
@@ -0,0 +1,210 @@
+"""A daemon that keeps the models warm and serves requests on a Unix socket.
+
+The protocol is line-delimited JSON. Each request is an object with a
+`command` and its parameters, and an optional `id` that is echoed back:
+
+    {"id": 1, "command": "decode", "path": "/abs/file.tsl", "index": 0}
+
+Each response holds either the `result` or the `error` of the request:
+
+    {"id": 1, "result": "..."}
+    {"id": 1, "error": {"type": "InvalidTslFileError", "message": "..."}}
+
+Commands:
+- `decode`: `path`, `index`, `trusted`. The result is the JSON output of
+  `tsl-parser decode`.
+- `diff`: `path`, `index`, `other_index`, `other`. The result is the list of
+  the lines of `tsl-parser diff`.
+- `ping`: returns "pong".
+- `stats`: returns the counters of the daemon.
+- `shutdown`: stops the daemon.
+
+Paths are resolved by the daemon, so clients should send absolute ones.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from katana_tsl_parser.cache import SectionCache
+from katana_tsl_parser.commands import decode_json, diff_lines
+from katana_tsl_parser.models.types import JsonDict
+
+DEFAULT_MAX_ENTRIES = 64
+
+
+class TslServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve the requests of `katana_tsl_parser.client.Client`.
+
+    The results are kept in a bounded LRU, keyed by the request and by the
+    size and modification time of the files, so that requests about an
+    unchanged file are answered without decoding it again. The connections
+    are handled by threads, and their requests are executed concurrently:
+    the lock only guards the LRU and the counters, and a slow decode doesn't
+    hold up the other requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        cache: SectionCache | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.path = Path(path)
+        self.cache = cache
+        self.max_entries = max_entries
+        self.requests = self.hits = 0
+
+        self._results: OrderedDict[tuple[Any, ...], Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._commands: dict[str, Callable[..., Any]] = {
+            "decode": self._decode,
+            "diff": self._diff,
+            "ping": lambda: "pong",
+            "stats": self._stats,
+            "shutdown": self._shutdown,
+        }
+
+        _remove_stale_socket(self.path)
+        super().__init__(os.fspath(self.path), _Handler)
+
+    def server_bind(self) -> None:
+        # Requests can read any file the daemon can, keep them to the user.
+        # The socket is created with these permissions rather than changed
+        # after the bind, when other users could already have connected.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+    def dispatch(self, line: bytes) -> JsonDict:
+        """Execute a request, return its response."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.pop("id", None)
+            command = self._commands[request.pop("command")]
+            with self._lock:
+                self.requests += 1
+            result = command(**request)
+        except Exception as e:  # noqa: BLE001
+            error = {"type": type(e).__name__, "message": str(e)}
+            return {"id": request_id, "error": error}
+
+        return {"id": request_id, "result": result}
+
+    def _cached(self, key: tuple[Any, ...], func: Callable[[], Any]) -> Any:  # noqa: ANN401
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+
+        # Concurrent requests for the same result both compute it, rather
+        # than one of them waiting for the other with the lock held
+        result = func()
+        with self._lock:
+            self._results[key] = result
+            if len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+        return result
+
+    def _decode(
+        self, path: str, index: int | None = None, *, trusted: bool = False
+    ) -> str:
+        tsl_file = Path(path)
+        key = ("decode", _stat(tsl_file), index, trusted)
+
+        return self._cached(  # type: ignore[no-any-return]
+            key,
+            lambda: decode_json(tsl_file, index, trusted=trusted, cache=self.cache),
+        )
+
+    def _diff(
+        self,
+        path: str,
+        index: int | None = None,
+        other_index: int | None = None,
+        other: str | None = None,
+    ) -> list[str]:
+        tsl_file = Path(path)
+        other_file = Path(other) if other is not None else None
+        key = (
+            "diff",
+            _stat(tsl_file),
+            index,
+            other_index,
+            other_file and _stat(other_file),
+        )
+
+        return self._cached(  # type: ignore[no-any-return]
+            key, lambda: list(diff_lines(tsl_file, index, other_index, other_file))
+        )
+
+    def _stats(self) -> JsonDict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "entries": len(self._results),
+            }
+
+    def _shutdown(self) -> None:
+        # `shutdown()` waits for `serve_forever()` to return, don't block the
+        # response on it
+        threading.Thread(target=self.shutdown).start()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: TslServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.dispatch(line)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+def _stat(path: Path) -> tuple[str, int, int]:
+    st = path.stat()
+    return str(path.resolve()), st.st_size, st.st_mtime_ns
+
+
+def _remove_stale_socket(path: Path) -> None:
+    """Remove the socket of a daemon that didn't exit cleanly."""
+    if not path.is_socket():
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(os.fspath(path))
+        except OSError:
+            path.unlink()
+            return
+
+    msg = f"a daemon is already listening on {path}"
+    raise FileExistsError(msg)
+
+
+def serve(path: str | os.PathLike[str], *, cache: SectionCache | None = None) -> None:
+    """Serve requests on the Unix socket `path` until `shutdown` is requested."""
+    with TslServer(path, cache=cache) as server:
+        server.serve_forever()
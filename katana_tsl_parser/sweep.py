@@ -0,0 +1,310 @@
+import contextlib
+import itertools
+import json
+import math
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from enum import IntEnum
+from types import SimpleNamespace
+from typing import Any
+
+from katana_tsl_parser.errors import (
+    InvalidValueListLengthError,
+    UnknownFieldError,
+    ValueOutOfRangeError,
+)
+from katana_tsl_parser.models.layout import (
+    Encoder,
+    FieldSpec,
+    compile_encoder,
+    strip_optional,
+)
+from katana_tsl_parser.models.tsl import ParamSetModel, PatchModel, encode_name
+from katana_tsl_parser.models.types import JsonDict, TslSection, hex_views, to_hex
+
+_NAME = ParamSetModel.model_fields["name"].alias or "name"
+
+
+@dataclass(frozen=True, slots=True)
+class Parameter:
+    """A field of a param set, located by its path, e.g. `patch0.amp_gain`."""
+
+    path: str
+    alias: str
+    offset: int
+    spec: FieldSpec
+    _encoder: Encoder = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        spec = self.spec
+        encoder = compile_encoder(self.path, (spec,), spec.end)
+        object.__setattr__(self, "_encoder", encoder)
+
+    def convert(self, value: Any) -> Any:  # noqa: ANN401
+        """Validate a value of the field.
+
+        Enums can be given by name and booleans as `true`/`false`, `on`/`off`
+        or `1`/`0`. Numbers must be on the grid of the field, e.g. a multiple
+        of 0.5 dB, they aren't rounded.
+        """
+        return _convert(self.path, self.spec, value)
+
+    def encode(self, value: Any) -> bytes:  # noqa: ANN401
+        """Validate a value of the field and return its bytes."""
+        spec = self.spec
+        value = self.convert(value)
+
+        data = bytearray(spec.width)
+        self._encoder(SimpleNamespace(**{spec.name: value}), data, -spec.offset, 0)
+
+        return bytes(data)
+
+
+def resolve(path: str) -> Parameter:
+    """Locate a field from its path in the param set."""
+    section, *names = path.split(".")
+
+    info = ParamSetModel.model_fields.get(section)
+    if info is None or not names:
+        raise UnknownFieldError(path)
+
+    type_ = strip_optional(info.annotation)
+    offset = 0
+    spec = None
+    for name in names:
+        if not _is_section(type_):
+            raise UnknownFieldError(path)
+
+        spec = type_.__tsl_layout__.specs_by_name.get(name)
+        if spec is None:
+            raise UnknownFieldError(path)
+
+        offset += spec.offset
+        type_ = spec.type_
+
+    if spec is None or spec.is_section:
+        raise UnknownFieldError(path)
+
+    return Parameter(path, info.alias or section, offset, spec)
+
+
+def parameters(
+    section: type[TslSection], path: str, alias: str, base: int = 0
+) -> Iterator[Parameter]:
+    """Yield the scalar fields of a section and of its nested sections."""
+    for spec in section.__tsl_layout__.specs:
+        offset = base + spec.offset
+        if spec.is_section:
+            yield from parameters(spec.type_, f"{path}.{spec.name}", alias, offset)
+        else:
+            yield Parameter(f"{path}.{spec.name}", alias, offset, spec)
+
+
+class Sweep:
+    """Variants of a patch, with some of its fields set to ranges of values.
+
+    `params` maps field paths to the values they take. Comma-separated paths
+    get the same values, e.g. `"patch0.amp_eq_bass,patch0.amp_eq_middle"`.
+    The variants are the cartesian product of the values, or with
+    `product=False`, the values are taken in parallel and must all have the
+    same length.
+
+    `name` is a `str.format()` template for the names of the variants, which
+    gets the values of the parameters as positional arguments and the index
+    of the variant as `n`, e.g. `"Gain {0}"`.
+
+    Variants are generated on iteration: only the modified sections are
+    copied from the bytes of the base patch, the other ones are shared.
+    """
+
+    def __init__(
+        self,
+        patch: PatchModel | JsonDict,
+        params: Mapping[str, Iterable[Any]],
+        *,
+        product: bool = True,
+        name: str | None = None,
+    ) -> None:
+        if isinstance(patch, PatchModel):
+            patch = patch.encode_tsl()
+
+        self.product = product
+        self.name = name
+
+        self._params: list[tuple[Parameter, ...]] = []
+        self._values: list[tuple[Any, ...]] = []
+        self._encoded: list[list[tuple[bytes, ...]]] = []
+        for paths, values in params.items():
+            group = tuple(map(resolve, paths.split(",")))
+            converted = tuple(map(group[0].convert, values))
+            self._params.append(group)
+            self._values.append(converted)
+            # The values are validated and encoded once, not for each variant
+            self._encoded.append([tuple(p.encode(v) for p in group) for v in converted])
+
+        if not product and len({len(v) for v in self._values}) > 1:
+            sizes = [len(v) for v in self._values]
+            raise InvalidValueListLengthError(sizes[-1], sizes[0])
+
+        self._base = patch
+        self._param_set: JsonDict = hex_views(patch["paramSet"])
+        self._hex = {
+            alias: to_hex(v) if isinstance(v, memoryview) else v
+            for alias, v in self._param_set.items()
+        }
+        # JSON of the sections, for the ones that don't change between variants
+        self._fragments = {
+            alias: f"{json.dumps(alias)}: {json.dumps(v)}"
+            for alias, v in self._hex.items()
+        }
+        self._modified = sorted({p.alias for g in self._params for p in g})
+        head, _, self._tail = json.dumps({**patch, "paramSet": None}).partition(
+            '"paramSet": null'
+        )
+        self._head = f'{head}"paramSet": '
+
+    def __len__(self) -> int:
+        sizes = [len(v) for v in self._values]
+        if not sizes:
+            return 1
+        if self.product:
+            n = 1
+            for size in sizes:
+                n *= size
+            return n
+
+        return sizes[0]
+
+    def __iter__(self) -> Iterator[JsonDict]:
+        """Yield the raw values of the variants."""
+        for _, sections in self._variants():
+            param_set = dict(self._hex)
+            for alias, data in sections.items():
+                param_set[alias] = to_hex(data)
+
+            yield {**self._base, "paramSet": param_set}
+
+    def iter_json(self) -> Iterator[str]:
+        """Yield the variants dumped to JSON, much faster than dumping them."""
+        fragments = self._fragments
+        for _, sections in self._variants():
+            param_set = ", ".join(
+                f"{json.dumps(alias)}: {json.dumps(to_hex(sections[alias]))}"
+                if alias in sections
+                else fragment
+                for alias, fragment in fragments.items()
+            )
+            yield f"{self._head}{{{param_set}}}{self._tail}"
+
+    def _variants(self) -> Iterator[tuple[tuple[Any, ...], dict[str, bytearray]]]:
+        indices: Iterable[Sequence[int]]
+        ranges = [range(len(v)) for v in self._values]
+        if self.product:
+            indices = itertools.product(*ranges)
+        else:
+            indices = zip(*ranges, strict=True)
+
+        for n, idx in enumerate(indices):
+            # Copy on write: only the modified sections get their own buffer
+            sections = {
+                alias: bytearray(self._param_set[alias]) for alias in self._modified
+            }
+            values = []
+            for i, pick in enumerate(idx):
+                encoded = self._encoded[i][pick]
+                for param, data in zip(self._params[i], encoded, strict=True):
+                    start = param.offset
+                    sections[param.alias][start : start + len(data)] = data
+                values.append(self._values[i][pick])
+
+            if self.name is not None:
+                name = self.name.format(*values, n=n)
+                sections[_NAME] = bytearray(encode_name(name))
+
+            yield tuple(values), sections
+
+
+def _is_section(type_: Any) -> bool:  # noqa: ANN401
+    return isinstance(type_, type) and issubclass(type_, TslSection)
+
+
+def _convert(path: str, spec: FieldSpec, value: Any) -> Any:  # noqa: ANN401
+    type_ = spec.type_
+    if isinstance(type_, type) and issubclass(type_, IntEnum):
+        return _convert_enum(path, type_, value)
+
+    if type_ is bool:
+        return _convert_bool(path, value)
+    if isinstance(type_, type) and issubclass(type_, float):
+        value = _convert_float(path, value)
+    elif isinstance(type_, type) and issubclass(type_, int):
+        value = _convert_int(path, value)
+    # Fields typed `float` and decoded by `Q.from_byte` are checked like a `Q`
+    owner = getattr(spec.transform, "__self__", type_)
+    if hasattr(owner, "validate"):
+        value = owner.validate(value)
+
+    ge, le = spec.ge, spec.le
+    if (ge is not None and value < ge) or (le is not None and value > le):
+        raise ValueOutOfRangeError(path, value, ge, le)
+
+    # The encoders round the values that are between two steps
+    step = spec.multiple_of
+    if step is None and spec.divisor is not None:
+        step = 1 / spec.divisor
+    if step is not None and not _is_integral(value / step):
+        msg = f"{path}: {value} is not a multiple of {step}"
+        raise ValueError(msg)
+
+    return value
+
+
+def _convert_enum(path: str, type_: type[IntEnum], value: Any) -> IntEnum:  # noqa: ANN401
+    if isinstance(value, str):
+        try:
+            return type_[value]
+        except KeyError:
+            msg = f"{path}: invalid {type_.__name__}: {value}"
+            raise ValueError(msg) from None
+
+    return type_(value)
+
+
+def _is_integral(value: float) -> bool:
+    return math.isclose(value, round(value), abs_tol=1e-9)
+
+
+def _convert_float(path: str, value: Any) -> float:  # noqa: ANN401
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        msg = f"{path}: invalid number: {value!r}"
+        raise ValueError(msg) from None
+
+
+def _convert_int(path: str, value: Any) -> int:  # noqa: ANN401
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        with contextlib.suppress(ValueError):
+            return int(value)
+
+    msg = f"{path}: invalid integer: {value!r}"
+    raise ValueError(msg)
+
+
+_BOOLS = {"true": True, "on": True, "1": True, "false": False, "off": False, "0": False}
+
+
+def _convert_bool(path: str, value: Any) -> bool:  # noqa: ANN401
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.lower() in _BOOLS:
+        return _BOOLS[value.lower()]
+
+    msg = f"{path}: invalid bool: {value!r}"
+    raise ValueError(msg)
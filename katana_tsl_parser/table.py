@@ -0,0 +1,307 @@
+import functools
+import itertools
+import math
+import statistics
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterable, Sequence
+from enum import IntEnum
+from typing import Any
+
+from katana_tsl_parser.errors import UnknownFieldError
+from katana_tsl_parser.models.layout import Reader, compile_reader, strip_optional
+from katana_tsl_parser.models.tsl import ParamSetModel, PatchModel
+from katana_tsl_parser.models.types import JsonDict, TslSection, hex_views
+from katana_tsl_parser.sweep import Parameter, parameters
+
+# Value of the fields that a patch doesn't have, e.g. the v2 fields of v1 patches
+MISSING = -0x8000
+
+# `_rows()` scans the whole column, rather than searching for each match, when
+# more than one row in this many matches
+_DENSE_RATIO = 10
+
+_NAME = ParamSetModel.model_fields["name"].alias or "name"
+
+
+def _typecode(param: Parameter) -> str:
+    spec = param.spec
+    type_ = spec.type_
+    if spec.divisor is not None or (
+        isinstance(type_, type) and issubclass(type_, float)
+    ):
+        return "d"
+
+    return "h"
+
+
+@functools.cache
+def _labels(enum: type[IntEnum]) -> dict[int, str]:
+    return {m.value: m.name for m in enum}
+
+
+def _rows(column: "array[Any]", codes: set[Any]) -> list[int]:
+    """Return the indices of the values of `column` that are in `codes`."""
+    if column.typecode != "h" or not column:
+        return [n for n, v in enumerate(column) if v in codes]
+
+    # The low and the high bytes of the values, one byte per row
+    raw = column.tobytes()
+    low, high = raw[0::2], raw[1::2]
+    if sys.byteorder == "big":
+        low, high = high, low
+
+    # High byte -> `bytes.translate()` table of the low bytes of the codes
+    tables: dict[int, bytearray] = {}
+    for code in codes:
+        # Only integers in the range of the array can match
+        if isinstance(code, int | float) and MISSING <= code <= ~MISSING:
+            value = int(code)
+            if value == code:
+                value &= 0xFFFF
+                tables.setdefault(value >> 8, bytearray(256))[value & 0xFF] = 1
+
+    # One flag byte per row, set if both its high and low bytes match
+    if high.count(high[:1]) == len(high):
+        # Most fields only have values from 0 to 255
+        table = tables.get(high[0])
+        matches = low.translate(table) if table is not None else b""
+    else:
+        mask = 0
+        for byte, table in tables.items():
+            high_table = bytearray(256)
+            high_table[byte] = 1
+            high_flags = int.from_bytes(high.translate(high_table), "little")
+            mask |= high_flags & int.from_bytes(low.translate(table), "little")
+        matches = mask.to_bytes(len(column), "little")
+
+    # A search per match is faster when few rows match, and slower otherwise
+    if matches.count(1) * _DENSE_RATIO > len(matches):
+        return list(itertools.compress(range(len(matches)), matches))
+
+    rows = []
+    row = matches.find(1)
+    while row >= 0:
+        rows.append(row)
+        row = matches.find(1, row + 1)
+
+    return rows
+
+
+class _Section:
+    """The columns of a section of the param set, and how to fill them."""
+
+    def __init__(self, name: str, section: type[TslSection], alias: str) -> None:
+        self.section = section
+        self.params = tuple(parameters(section, name, alias))
+        self.reader: Reader = compile_reader(
+            section.__qualname__,
+            [(p.spec, p.offset) for p in self.params],
+            min(section.__tsl_layout__.sizes),
+            MISSING,
+        )
+
+    def read(self, data: memoryview, appenders: list[Callable[[Any], None]]) -> None:
+        self.section._expect_size(data, self.section.__tsl_layout__.sizes)  # noqa: SLF001
+        self.reader(data, appenders)
+
+
+@functools.cache
+def _sections() -> dict[str, _Section]:
+    sections = {}
+    for name, info in ParamSetModel.model_fields.items():
+        type_ = strip_optional(info.annotation)
+        if isinstance(type_, type) and issubclass(type_, TslSection):
+            alias = info.alias or name
+            sections[alias] = _Section(name, type_, alias)
+
+    return sections
+
+
+class PatchTable:
+    """The scalar fields of many patches, stored by column.
+
+    Each field of the sections of the param set, e.g. `patch0.amp_gain` or
+    `fx1.chorus.rate`, is an `array` of the values of all the patches: `'h'`
+    for integers, `'d'` for fractional values. Enums are stored as their
+    codes, see `labels()`, and booleans as 0 or 1. Fields that a patch
+    doesn't have hold `MISSING`.
+
+    Patches are decoded straight from their bytes, without building models,
+    and the values are not validated. The bytes of the param sets are kept,
+    so that models can be built for the patches that need them, see
+    `patch()`.
+
+    The columns are plain arrays, e.g. `pandas.DataFrame(table.columns)`
+    builds a frame without copying the values to Python objects. `where()`
+    and `isin()` scan the bytes of the integer columns rather than their
+    values, the fractional columns are scanned value by value.
+    """
+
+    def __init__(self, patches: Iterable[PatchModel | JsonDict] = ()) -> None:
+        sections = _sections()
+        self.columns: dict[str, array[Any]] = {
+            p.path: array(_typecode(p)) for s in sections.values() for p in s.params
+        }
+        self.names: list[str] = []
+
+        self._memos: list[Any] = []
+        self._buffers: list[bytes] = []
+        self._layouts: list[tuple[tuple[str, int], ...]] = []
+        # Layouts are shared between patches, most libraries have one or two
+        self._interned: dict[tuple[tuple[str, int], ...], tuple[tuple[str, int], ...]]
+        self._interned = {}
+
+        self._appenders = {
+            alias: [self.columns[p.path].append for p in s.params]
+            for alias, s in sections.items()
+        }
+
+        self.extend(patches)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, path: str) -> "array[Any]":
+        column = self.columns.get(path)
+        if column is None:
+            raise UnknownFieldError(path)
+
+        return column
+
+    def append(self, patch: PatchModel | JsonDict) -> None:
+        """Decode a patch, given as a model or as raw values, into the columns."""
+        if isinstance(patch, PatchModel):
+            patch = patch.encode_tsl()
+
+        values = hex_views(patch["paramSet"])
+        layout = tuple((alias, len(v)) for alias, v in values.items())
+        layout = self._interned.setdefault(layout, layout)
+        buffer = b"".join(values.values())
+        view = memoryview(buffer)
+
+        sections = _sections()
+        seen = set()
+        pos = 0
+        for alias, size in layout:
+            data = view[pos : pos + size]
+            pos += size
+
+            section = sections.get(alias)
+            if section is not None:
+                section.read(data, self._appenders[alias])
+                seen.add(alias)
+            elif alias == _NAME:
+                self.names.append(ParamSetModel.validate_name(data))
+
+        for alias, appenders in self._appenders.items():
+            if alias not in seen:
+                for append in appenders:
+                    append(MISSING)
+
+        self._memos.append(patch.get("memo"))
+        self._buffers.append(buffer)
+        self._layouts.append(layout)
+
+    def extend(self, patches: Iterable[PatchModel | JsonDict]) -> None:
+        for patch in patches:
+            self.append(patch)
+
+    def labels(self, path: str) -> dict[int, str]:
+        """Map the codes of an enum field to the names of its members.
+
+        The maps are shared by the fields of the same enum, e.g. `fx1.type_`
+        and `patch2.mod_green`. Other fields get an empty map.
+        """
+        param = self._param(path)
+        type_ = param.spec.type_
+        if isinstance(type_, type) and issubclass(type_, IntEnum):
+            return _labels(type_)
+
+        return {}
+
+    def where(self, path: str, predicate: Callable[[Any], bool]) -> list[int]:
+        """Return the indices of the patches whose field matches `predicate`.
+
+        `predicate` is called once per distinct value of the field.
+        """
+        column = self[path]
+        codes = {v for v in set(column) if v != MISSING and predicate(v)}
+
+        return _rows(column, codes)
+
+    def isin(self, path: str, *values: Any) -> list[int]:  # noqa: ANN401
+        """Return the indices of the patches whose field has one of `values`.
+
+        Enum members can be given by name.
+        """
+        labels = self.labels(path)
+        codes = {v for v, name in labels.items() if name in values}
+        codes.update(v for v in values if not isinstance(v, str))
+
+        return _rows(self[path], codes)
+
+    def take(self, rows: Sequence[int]) -> "PatchTable":
+        """Return a table of the patches at `rows`, e.g. from `where()`."""
+        table = PatchTable()
+        rows = list(rows)
+        for path, column in self.columns.items():
+            table.columns[path].extend(map(column.__getitem__, rows))
+        table.names = [self.names[n] for n in rows]
+        table._memos = [self._memos[n] for n in rows]
+        table._buffers = [self._buffers[n] for n in rows]
+        table._layouts = [self._layouts[n] for n in rows]
+
+        return table
+
+    def counts(self, path: str) -> Counter[Any]:
+        """Count the patches by value of a field, enums are counted by name."""
+        counts = Counter(self[path])
+        counts.pop(MISSING, None)
+
+        labels = self.labels(path)
+        if not labels:
+            return counts
+
+        return Counter({labels.get(code, code): n for code, n in counts.items()})
+
+    def mean(self, path: str) -> float:
+        """Average value of a field, over the patches that have it."""
+        column = self[path]
+        missing = column.count(MISSING)
+        n = len(column) - missing
+        if not n:
+            msg = f"no patch has {path}"
+            raise statistics.StatisticsError(msg)
+
+        # Cancel the missing values out rather than filtering them
+        total = math.fsum(itertools.chain(column, itertools.repeat(-MISSING, missing)))
+        return total / n
+
+    def patch(self, index: int, *, trusted: bool = False) -> PatchModel:
+        """Decode the model of a patch, see `PatchModel.decode_tsl()`."""
+        buffer = memoryview(self._buffers[index])
+        param_set = {}
+        pos = 0
+        for alias, size in self._layouts[index]:
+            param_set[alias] = buffer[pos : pos + size]
+            pos += size
+
+        values = {"memo": self._memos[index], "paramSet": param_set}
+        if values["memo"] is None:
+            del values["memo"]
+
+        return PatchModel.decode_tsl(values, trusted=trusted)
+
+    def _param(self, path: str) -> Parameter:
+        params = _params()
+        if path not in params:
+            raise UnknownFieldError(path)
+
+        return params[path]
+
+
+@functools.cache
+def _params() -> dict[str, Parameter]:
+    return {p.path: p for s in _sections().values() for p in s.params}
@@ -0,0 +1,249 @@
+import functools
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from typing import Any
+
+from katana_tsl_parser.errors import InvalidValueListLengthError, MissingFieldsError
+from katana_tsl_parser.models.layout import (
+    Decoder,
+    FieldSpec,
+    compile_decoder,
+    strip_optional,
+)
+from katana_tsl_parser.models.tsl import ParamSetModel, PatchModel
+from katana_tsl_parser.models.types import JsonDict, TslList, TslSection, hex_views
+from katana_tsl_parser.sweep import Parameter, parameters
+
+_OK, _BAD = 0, 1
+
+_NAME = ParamSetModel.model_fields["name"].alias or "name"
+
+
+@dataclass(frozen=True, slots=True)
+class Violation:
+    """An invalid value, with the error that decoding the patch would raise."""
+
+    index: int
+    path: str
+    value: Any
+    error: ValueError
+
+    def __str__(self) -> str:
+        return f"patch {self.index}: {self.path}: {self.error}"
+
+
+class _Field:
+    """The checks of a scalar field, compiled from its spec."""
+
+    def __init__(self, param: Parameter) -> None:
+        self.spec = param.spec
+        self.path = param.path
+        self.offset = param.offset
+        self.end = param.offset + self.spec.width
+        self.width = self.spec.width
+
+        # Byte -> whether it is invalid, to be applied with `bytes.translate()`
+        self.table = _table(replace(self.spec, name="", offset=0))
+
+    @property
+    def constrained(self) -> bool:
+        return self.width > 1 or _BAD in self.table
+
+    def error(self, data: bytes) -> ValueError | None:
+        return _error(_field_decoder(self.spec), data)
+
+
+def field_error(param: Parameter, data: bytes) -> ValueError | None:
+    """Return the error that decoding the bytes of a field raises, if any."""
+    return _error(_field_decoder(param.spec), data)
+
+
+def valid_bytes(param: Parameter) -> bytes:
+    """Return the 7-bit values that a field of one byte accepts.
+
+    Fields of several bytes are checked as a whole, see `field_error()`, and
+    get no values.
+    """
+    table = _table(replace(param.spec, name="", offset=0))
+    if not table:
+        return b""
+
+    return bytes(b for b in range(128) if table[b] == _OK)
+
+
+@functools.cache
+def _field_decoder(spec: FieldSpec) -> Decoder:
+    # A decoder of this field alone, which checks it like the model path
+    return _decoder(replace(spec, offset=0))
+
+
+def _decoder(spec: FieldSpec) -> Decoder:
+    return compile_decoder(spec.name, (spec,), spec.width, trusted=True)
+
+
+def _error(decoder: Decoder, data: bytes) -> ValueError | None:
+    try:
+        decoder(memoryview(data))
+    except ValueError as e:
+        return e
+
+    return None
+
+
+@functools.cache
+def _table(spec: FieldSpec) -> bytes:
+    """Map the bytes to whether they are invalid, for a field of one byte.
+
+    The fields that have the same type and constraints share their table.
+    """
+    if spec.width > 1:
+        return b""
+
+    decoder = _decoder(spec)
+
+    return bytes(
+        _OK if _error(decoder, bytes((b,))) is None else _BAD for b in range(256)
+    )
+
+
+class _Section:
+    def __init__(self, name: str, section: type[TslSection], alias: str) -> None:
+        self.name = name
+        self.sizes = section.__tsl_layout__.sizes
+        self.fields = [
+            f for f in map(_Field, parameters(section, name, alias)) if f.constrained
+        ]
+
+
+@functools.cache
+def _sections() -> dict[str, _Section]:
+    sections = {}
+    for name, info in ParamSetModel.model_fields.items():
+        type_ = strip_optional(info.annotation)
+        if isinstance(type_, type) and issubclass(type_, TslSection):
+            alias = info.alias or name
+            sections[alias] = _Section(name, type_, alias)
+
+    return sections
+
+
+@functools.cache
+def _lists() -> dict[str, tuple[str, Any]]:
+    lists = {}
+    for name, info in ParamSetModel.model_fields.items():
+        type_ = strip_optional(info.annotation)
+        if isinstance(type_, type) and issubclass(type_, TslList):
+            lists[info.alias or name] = (name, type_)
+
+    return lists
+
+
+def validate_patches(patches: Iterable[PatchModel | JsonDict]) -> list[Violation]:
+    """Check the values of many patches at once, return all the invalid ones.
+
+    The bytes of each section are stacked for all the patches, so that each
+    field is checked for every patch in one pass: the bytes of a field are
+    sliced out of the stack and mapped to their validity by a table computed
+    from the constraints of the field. The errors are the ones the trusted
+    decoders raise, e.g. `ValueOutOfRangeError`, `InvalidQValueError` or
+    `InvalidValueListLengthError`, and are only built for invalid values.
+
+    Violations are sorted by patch, then by section.
+    """
+    layout = ParamSetModel.__tsl_layout__
+    sections = _sections()
+    lists = _lists()
+    required = {a: n for a, n in layout.by_alias.items() if n in layout.required}
+    order = {alias: n for n, alias in enumerate(layout.aliases)}
+
+    violations: list[Violation] = []
+    # (alias, size) -> indices of the patches and their stacked bytes
+    stacks: dict[tuple[str, int], tuple[list[int], list[bytes]]] = {}
+
+    for index, patch in enumerate(patches):
+        if isinstance(patch, PatchModel):
+            param_set = patch.param_set.encode_tsl()
+        else:
+            param_set = patch["paramSet"]
+        values = hex_views(param_set)
+        if missing := [name for alias, name in required.items() if alias not in values]:
+            error = MissingFieldsError(missing)
+            violations.append(Violation(index, "paramSet", missing, error))
+
+        for alias, v in values.items():
+            section = sections.get(alias)
+            if section is not None:
+                if len(v) not in section.sizes:
+                    violations.append(_size_violation(index, section, v))
+                    continue
+                indices, rows = stacks.setdefault((alias, len(v)), ([], []))
+                indices.append(index)
+                rows.append(bytes(v))
+            elif alias in lists:
+                name, type_ = lists[alias]
+                _check(violations, index, name, v, type_.decode_tsl)
+            elif alias == _NAME:
+                _check(violations, index, "name", v, ParamSetModel.validate_name)
+
+    for (alias, size), (indices, rows) in sorted(
+        stacks.items(), key=lambda item: order.get(item[0][0], 0)
+    ):
+        _check_stack(violations, sections[alias], size, indices, b"".join(rows))
+
+    violations.sort(key=lambda v: v.index)
+
+    return violations
+
+
+def _size_violation(index: int, section: _Section, values: Any) -> Violation:  # noqa: ANN401
+    sizes = section.sizes
+    error = InvalidValueListLengthError(
+        len(values), sizes if len(sizes) > 1 else sizes[0]
+    )
+
+    return Violation(index, section.name, len(values), error)
+
+
+def _check(
+    out: list[Violation],
+    index: int,
+    path: str,
+    values: Any,  # noqa: ANN401
+    decode: Any,  # noqa: ANN401
+) -> None:
+    try:
+        decode(values)
+    except ValueError as e:
+        out.append(Violation(index, path, bytes(values), e))
+
+
+def _check_stack(
+    out: list[Violation],
+    section: _Section,
+    size: int,
+    indices: list[int],
+    stack: bytes,
+) -> None:
+    for field in section.fields:
+        if field.end > size:
+            continue
+
+        if field.width > 1:
+            for row, index in enumerate(indices):
+                start = row * size + field.offset
+                data = stack[start : start + field.width]
+                error = field.error(data)
+                if error is not None:
+                    out.append(Violation(index, field.path, tuple(data), error))
+            continue
+
+        # The field in all the patches, one byte per patch
+        column = stack[field.offset :: size]
+        invalid = column.translate(field.table)
+        row = invalid.find(_BAD)
+        while row >= 0:
+            value = column[row]
+            error = field.error(bytes((value,)))
+            if error is not None:
+                out.append(Violation(indices[row], field.path, value, error))
+            row = invalid.find(_BAD, row + 1)
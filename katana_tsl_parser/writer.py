@@ -0,0 +1,54 @@
+import json
+from collections.abc import Iterable
+from typing import IO, TYPE_CHECKING
+
+from katana_tsl_parser.compression import open_output
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict
+
+if TYPE_CHECKING:
+    import os
+
+DEVICE = "KATANA MkII"
+FORMAT_REV = "0002"
+
+
+def write_tsl(  # noqa: PLR0913
+    dest: "str | os.PathLike[str] | IO[str]",
+    patches: Iterable[PatchModel | JsonDict | str],
+    *,
+    name: str,
+    format_rev: str = FORMAT_REV,
+    device: str = DEVICE,
+    compression: str | None = None,
+) -> int:
+    """Write patches to a TSL file as they are produced, return their count.
+
+    Models are encoded with `PatchModel.encode_tsl()`, dicts are dumped as
+    is and strings are taken as already dumped, see `Sweep.iter_json()`.
+    Patches are written one at a time, so that generating a large library
+    doesn't require holding it in memory.
+
+    The file is compressed with `compression`, or with the codec matching its
+    suffix, see `compression.open_output()`.
+    """
+    header = json.dumps({"name": name, "formatRev": format_rev, "device": device})
+
+    count = 0
+    with open_output(dest, compression=compression) as f:
+        f.write(f'{header[:-1]}, "data": [[')
+
+        for patch in patches:
+            if count:
+                f.write(", ")
+            if isinstance(patch, str):
+                f.write(patch)
+            elif isinstance(patch, PatchModel):
+                f.write(json.dumps(patch.encode_tsl()))
+            else:
+                f.write(json.dumps(patch))
+            count += 1
+
+        f.write("]]}")
+
+    return count
@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from katana_tsl_parser.models.types import JsonDict
+
+# The committed snapshots predate the `UserPatch%Chain` section, use the
+# default signal chain so that they can still be decoded.
+DEFAULT_CHAIN = [
+    "0B", "0F", "05", "06", "04", "0A", "02", "00", "0D", "0C",
+    "01", "07", "11", "08", "09", "12", "03", "0E", "10", "13",
+]  # fmt: skip
+
+
+@pytest.fixture
+def snapshots_folder() -> Path:
+    return Path(__file__).parent / "snapshots"
+
+
+@pytest.fixture
+def tsl_v2(snapshots_folder: Path) -> JsonDict:
+    tsl: JsonDict = json.loads((snapshots_folder / "temp_v2.tsl").read_text())
+    for patch in tsl["data"][0]:
+        patch["paramSet"]["UserPatch%Chain"] = list(DEFAULT_CHAIN)
+
+    return tsl
+
+
+@pytest.fixture
+def tsl_file(tmp_path: Path, tsl_v2: JsonDict) -> Path:
+    path = tmp_path / "patches.tsl"
+    # Brackets and quotes in strings must not confuse the scans of the file
+    tsl_v2["data"][0][0]["memo"] = {
+        "memo": 'a "[{memo}]" \\',
+        "isToneCentralPatch": True,
+    }
+    path.write_text(json.dumps(tsl_v2, indent=1))
+
+    return path
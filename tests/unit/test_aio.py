@@ -0,0 +1,154 @@
+import asyncio
+import io
+import json
+import threading
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from katana_tsl_parser.aio import AsyncDecoder, aiter_patches, aload_tsl
+from katana_tsl_parser.compression import CODECS, Codec, open_output
+from katana_tsl_parser.errors import InvalidTslFileError
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.reader import iter_patches
+
+AVAILABLE = [codec for codec in CODECS.values() if codec.available]
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+@pytest.mark.parametrize("split_size", [0, 1 << 20])
+def test_aload_tsl(tsl_file: Path, split_size: int, *, trusted: bool) -> None:
+    async def load() -> list[TslModel]:
+        decoder = AsyncDecoder(limit=2, split_size=split_size)
+        return await asyncio.gather(
+            *(aload_tsl(tsl_file, trusted=trusted, decoder=decoder) for _ in range(3))
+        )
+
+    expected = TslModel.model_validate_json(tsl_file.read_text())
+    assert asyncio.run(load()) == [expected] * 3
+
+
+@pytest.mark.parametrize("split_size", [0, 1 << 20])
+def test_aload_tsl_validates_header(
+    tmp_path: Path, tsl_v2: JsonDict, split_size: int
+) -> None:
+    path = tmp_path / "bad.tsl"
+    path.write_text(json.dumps({**tsl_v2, "name": 123, "formatRev": ["x"]}))
+
+    async def load() -> TslModel:
+        decoder = AsyncDecoder(limit=2, split_size=split_size)
+        return await decoder.load_tsl(path)
+
+    # Whether the file is split or not
+    with pytest.raises(ValidationError):
+        asyncio.run(load())
+
+
+def test_aload_tsl_process_pool(tsl_file: Path) -> None:
+    async def load(decoder: AsyncDecoder) -> TslModel:
+        return await aload_tsl(tsl_file, trusted=True, decoder=decoder)
+
+    with ProcessPoolExecutor(2) as executor:
+        tsl = asyncio.run(load(AsyncDecoder(executor)))
+
+    assert tsl == TslModel.model_validate_json(tsl_file.read_text())
+
+
+def test_aload_tsl_timeout(tsl_file: Path) -> None:
+    release = threading.Event()
+    calls: list[int] = []
+
+    async def run() -> None:
+        async with AsyncDecoder(limit=1) as decoder:
+            busy = asyncio.ensure_future(decoder.run(release.wait))
+            await asyncio.sleep(0)
+
+            # The decoding doesn't start while the only slot is taken
+            with pytest.raises(asyncio.TimeoutError):
+                await decoder.load_tsl(tsl_file, timeout=0.05)
+
+            # Cancelled before it could start
+            task = asyncio.ensure_future(decoder.run(calls.append, 1))
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+            release.set()
+            await busy
+            await decoder.run(calls.append, 2)
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+
+    assert calls == [2]
+
+
+async def _chunks(raw: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(raw), size):
+        await asyncio.sleep(0)
+        yield raw[i : i + size]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1 << 16])
+def test_aiter_patches(tsl_file: Path, chunk_size: int) -> None:
+    raw = tsl_file.read_bytes()
+
+    async def from_stream() -> list[PatchModel]:
+        stream = asyncio.StreamReader()
+        stream.feed_data(raw)
+        stream.feed_eof()
+        return [p async for p in aiter_patches(stream, chunk_size=chunk_size)]
+
+    async def from_iterable() -> list[PatchModel]:
+        decoder = AsyncDecoder(limit=2)
+        patches = aiter_patches(_chunks(raw, chunk_size), decoder=decoder)
+        return [p async for p in patches]
+
+    expected = list(iter_patches(tsl_file))
+    assert asyncio.run(from_stream()) == expected
+    assert asyncio.run(from_iterable()) == expected
+
+
+def test_aiter_patches_compact_stream(tsl_v2: JsonDict) -> None:
+    # A single line, longer than the line limit of `asyncio.StreamReader`
+    tsl_v2["data"][0] *= 40
+    raw = json.dumps(tsl_v2, separators=(",", ":")).encode()
+    assert len(raw) > 1 << 16
+    assert b"\n" not in raw
+
+    async def from_stream() -> list[PatchModel]:
+        stream = asyncio.StreamReader()
+        stream.feed_data(raw)
+        stream.feed_eof()
+        return [p async for p in aiter_patches(stream, trusted=True)]
+
+    assert asyncio.run(from_stream()) == list(iter_patches(io.BytesIO(raw)))
+
+
+@pytest.mark.parametrize("codec", AVAILABLE, ids=lambda codec: codec.name)
+def test_aiter_patches_compressed(tsl_file: Path, codec: Codec) -> None:
+    buf = io.BytesIO()
+    with open_output(buf, compression=codec.name) as f:
+        f.write(tsl_file.read_text())
+
+    async def from_stream() -> list[PatchModel]:
+        return [p async for p in aiter_patches(_chunks(buf.getvalue(), 3))]
+
+    assert asyncio.run(from_stream()) == list(iter_patches(tsl_file))
+
+
+def test_aiter_patches_errors(tsl_v2: JsonDict) -> None:
+    raw = json.dumps(tsl_v2).encode()
+
+    async def consume(raw: bytes) -> None:
+        async for _ in aiter_patches(_chunks(raw, 64)):
+            pass
+
+    with pytest.raises(InvalidTslFileError, match="unterminated data"):
+        asyncio.run(consume(raw[:-100]))
@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from katana_tsl_parser.batch import decode_many
+from katana_tsl_parser.errors import UnsupportedDeviceError
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.types import JsonDict
+
+
+@pytest.fixture
+def library(tmp_path: Path, tsl_v2: JsonDict) -> list[Path]:
+    paths = []
+    for n in range(3):
+        tsl = {**tsl_v2, "data": [tsl_v2["data"][0][n:]]}
+        path = tmp_path / f"{n}.tsl"
+        path.write_text(json.dumps(tsl))
+        paths.append(path)
+
+    bad = tmp_path / "bad.tsl"
+    bad.write_text(json.dumps({**tsl_v2, "device": "KATANA"}))
+    paths.insert(1, bad)
+
+    return paths
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("split_size", [0, 1 << 20])
+def test_decode_many(library: list[Path], workers: int, split_size: int) -> None:
+    results = list(decode_many(library, workers=workers, split_size=split_size))
+
+    assert [r.path for r in results] == library
+    assert isinstance(results[1].error, ValueError)
+    assert "Unsupported device: KATANA" in str(results[1].error)
+
+    for res in (results[0], *results[2:]):
+        expected = TslModel.model_validate_json(res.path.read_text())
+        assert res.error is None
+        assert res.value == expected
+
+
+def test_decode_many_as_json(library: list[Path]) -> None:
+    results = list(
+        decode_many(library, workers=2, trusted=True, split_size=0, as_json=True)
+    )
+    assert isinstance(results[1].error, UnsupportedDeviceError)
+
+    for res in (results[0], *results[2:]):
+        expected = TslModel.model_validate_json(res.path.read_text())
+        assert res.value == expected.model_dump_json()
+
+
+@pytest.mark.parametrize("as_json", [False, True])
+@pytest.mark.parametrize("split_size", [0, 1 << 20])
+def test_decode_many_validates_header(
+    tmp_path: Path, tsl_v2: JsonDict, split_size: int, *, as_json: bool
+) -> None:
+    path = tmp_path / "bad.tsl"
+    path.write_text(json.dumps({**tsl_v2, "name": 123, "formatRev": ["x"]}))
+
+    # Whether the file is split or not
+    (res,) = decode_many([path], workers=2, split_size=split_size, as_json=as_json)
+    assert isinstance(res.error, ValidationError)
+
+    (res,) = decode_many([path], workers=2, trusted=True, split_size=split_size)
+    assert res.error is None
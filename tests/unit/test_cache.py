@@ -0,0 +1,68 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from pathlib import Path
+
+import pytest
+
+from katana_tsl_parser.cache import SectionCache
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.tsl import EqModel
+from katana_tsl_parser.models.types import JsonDict
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_cache_decode_file(tmp_path: Path, tsl_v2: JsonDict, *, trusted: bool) -> None:
+    raw = json.dumps(tsl_v2).encode()
+    expected = TslModel.decode_tsl(deepcopy(tsl_v2))
+
+    with SectionCache(tmp_path / "cache.db") as cache:
+        assert cache.decode_file(raw, trusted=trusted) == expected
+
+    with SectionCache(tmp_path / "cache.db") as cache:
+        assert cache.decode_file(raw, trusted=trusted) == expected
+        assert (cache.hits, cache.misses) == (1, 0)
+
+        # Only the file and the modified section are decoded
+        tsl_v2["data"][0][0]["paramSet"]["UserPatch%Patch_0"][18] = "10"
+        tsl = cache.decode_file(json.dumps(tsl_v2).encode(), trusted=trusted)
+
+        assert tsl.data[0][0].param_set.patch0.amp_gain == 16
+        assert cache.misses == 2
+
+
+def test_cache_keeps_trusted_sections_apart(tmp_path: Path, tsl_v2: JsonDict) -> None:
+    eq = tsl_v2["data"][0][0]["paramSet"]["UserPatch%Eq(2)"]
+
+    with SectionCache(tmp_path / "cache.db") as cache:
+        trusted = cache.section(EqModel, eq, trusted=True)
+        validated = cache.section(EqModel, eq, trusted=False)
+        assert (cache.hits, cache.misses) == (0, 2)
+
+        assert cache.section(EqModel, eq, trusted=False) == validated == trusted
+        assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_shared_by_threads(tmp_path: Path, tsl_v2: JsonDict) -> None:
+    raw = json.dumps(tsl_v2).encode()
+    expected = TslModel.decode_tsl(deepcopy(tsl_v2))
+
+    with (
+        SectionCache(tmp_path / "cache.db") as cache,
+        ThreadPoolExecutor(4) as executor,
+    ):
+        results = list(executor.map(cache.decode_file, [raw] * 8))
+
+    assert results == [expected] * 8
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    with SectionCache(tmp_path / "cache.db", max_size=1000) as cache:
+        for n in range(10):
+            cache.put(bytes([n]), b"x" * 200)
+            cache.flush()
+            assert cache.get(b"\x00") is not None
+
+        assert cache.get(b"\x00") is not None
+        assert cache.get(b"\x01") is None
+        assert cache.get(b"\x09") is not None
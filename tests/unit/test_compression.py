@@ -0,0 +1,123 @@
+import io
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, Any
+
+import pytest
+
+from katana_tsl_parser.commands import decode_json
+from katana_tsl_parser.compression import CODECS, Codec, open_input, open_output
+from katana_tsl_parser.errors import UnsupportedCompressionError
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.reader import load_tsl, read_patch
+from katana_tsl_parser.writer import write_tsl
+
+AVAILABLE = [codec for codec in CODECS.values() if codec.available]
+
+
+class _Pipe(io.RawIOBase):
+    """A stream that can't seek or peek."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:  # noqa: ANN401
+        data = self._data.read(min(len(b), 100))
+        b[: len(data)] = data
+        return len(data)
+
+
+def _compress(codec: Codec, data: bytes) -> bytes:
+    buf = io.BytesIO()
+    with open_output(buf, compression=codec.name) as f:
+        f.write(data.decode())
+
+    return buf.getvalue()
+
+
+@pytest.fixture
+def tsl_raw(tsl_v2: JsonDict) -> bytes:
+    return json.dumps(tsl_v2).encode()
+
+
+@pytest.mark.parametrize("codec", AVAILABLE, ids=lambda codec: codec.name)
+@pytest.mark.parametrize(
+    "stream",
+    [io.BytesIO, _Pipe, lambda data: io.BufferedReader(_Pipe(data))],
+    ids=["seekable", "raw", "buffered"],
+)
+def test_open_input(
+    codec: Codec, stream: Callable[[bytes], IO[bytes]], tsl_raw: bytes
+) -> None:
+    data = _compress(codec, tsl_raw)
+    assert data.startswith(codec.magic)
+
+    with open_input(stream(data)) as f:
+        assert f.read() == tsl_raw
+
+
+@pytest.mark.parametrize("codec", AVAILABLE, ids=lambda codec: codec.name)
+def test_decompressor(codec: Codec, tsl_raw: bytes) -> None:
+    data = _compress(codec, tsl_raw)
+    decompressor = codec.decompressor()
+
+    chunks = [decompressor.decompress(data[i : i + 7]) for i in range(0, len(data), 7)]
+    assert b"".join(chunks) == tsl_raw
+
+
+def test_open_input_plain(tmp_path: Path, tsl_raw: bytes) -> None:
+    (tmp_path / "plain.tsl").write_bytes(tsl_raw)
+
+    with open_input(tmp_path / "plain.tsl") as f:
+        assert f.read() == tsl_raw
+    with open_input(io.StringIO(tsl_raw.decode())) as f:
+        assert f.read() == tsl_raw.decode()
+
+
+@pytest.mark.parametrize("codec", AVAILABLE, ids=lambda codec: codec.name)
+def test_compressed_files(tmp_path: Path, tsl_v2: JsonDict, codec: Codec) -> None:
+    expected = TslModel.decode_tsl(json.loads(json.dumps(tsl_v2)))
+    path = tmp_path / f"patches.tsl{codec.suffix}"
+
+    # Compressed according to the suffix
+    assert write_tsl(path, tsl_v2["data"][0], name="Test") == 6
+    assert path.read_bytes().startswith(codec.magic)
+
+    assert load_tsl(path) == expected
+    assert load_tsl(path, trusted=True) == expected
+    assert read_patch(path, 2) == tsl_v2["data"][0][2]
+    assert read_patch(path, -1) == tsl_v2["data"][0][-1]
+    with pytest.raises(IndexError):
+        read_patch(path, 6)
+
+    plain = tmp_path / "patches.tsl"
+    write_tsl(plain, tsl_v2["data"][0], name="Test")
+    assert decode_json(path) == decode_json(plain)
+    assert decode_json(path, 3) == decode_json(plain, 3)
+
+    # The same error for an invalid index, compressed or not
+    for tsl_file in (path, plain):
+        with pytest.raises(ValueError, match="Invalid index: 6"):
+            decode_json(tsl_file, 99)
+
+
+def test_unsupported_compression(tmp_path: Path) -> None:
+    with (
+        pytest.raises(UnsupportedCompressionError, match="unknown compression"),
+        open_output(tmp_path / "patches.tsl", compression="lz4"),
+    ):
+        pass
+
+    if CODECS["zstd"].available:
+        return
+
+    with (
+        pytest.raises(UnsupportedCompressionError, match="zstd"),
+        open_input(io.BytesIO(CODECS["zstd"].magic + b"\0" * 16)),
+    ):
+        pass
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.corpus import generate
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.validation import validate_patches
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_generate(version: int) -> None:
+    tsl = generate(5, version=version, seed=1)
+
+    assert tsl == generate(5, version=version, seed=1)
+    assert tsl != generate(5, version=version, seed=2)
+    assert validate_patches(tsl["data"][0]) == []
+
+    model = TslModel.decode_tsl(tsl)
+    patches = [p.param_set for p in model.data[0]]
+    assert len({p.name for p in patches}) == 5
+    assert all((p.patch_mk2v2 is None) == (version == 1) for p in patches)
@@ -0,0 +1,58 @@
+from copy import deepcopy
+
+from katana_tsl_parser.diff import diff_adjacent, diff_patches
+from katana_tsl_parser.models.mod_fx import FxModel
+from katana_tsl_parser.models.tsl import ParamSetModel, PatchModel
+from katana_tsl_parser.models.types import JsonDict
+
+
+def test_diff_patches(tsl_v2: JsonDict) -> None:
+    a = tsl_v2["data"][0][0]
+    fx1 = a["paramSet"]["UserPatch%Fx(1)"]
+    b = deepcopy(a)
+    param_set = b["paramSet"]
+    param_set["UserPatch%Patch_0"][17] = "0B"
+    param_set["UserPatch%Patch_0"][25] = "05"
+    param_set["UserPatch%Fx(1)"][185] = "07"
+    param_set["UserPatch%Status"][1] = "7F"
+    param_set["UserPatch%Chain"][:2] = param_set["UserPatch%Chain"][1::-1]
+
+    expected = [
+        "patch0.amp_type: Clean -> Crunch",
+        "patch0[25]: 00 -> 05",
+        f"fx1.chorus.low_depth: {int(fx1[185], 16)} -> 7",
+        "chain: [PedalFX, Booster, Mod, FX, EQ, Solo, Preamp, EQ2, NoiseGate, "
+        "FootVolume, SendReturn, Delay, Delay2, Reverb, Unknown1, Unknown2, "
+        "Unknown3, Unknown4, Unknown5, Unknown6] -> [Booster, PedalFX, Mod, FX, "
+        "EQ, Solo, Preamp, EQ2, NoiseGate, FootVolume, SendReturn, Delay, Delay2, "
+        "Reverb, Unknown1, Unknown2, Unknown3, Unknown4, Unknown5, Unknown6]",
+        f"UserPatch%Status[1]: {a['paramSet']['UserPatch%Status'][1]} -> 7F",
+    ]
+
+    assert list(map(str, diff_patches(a, b))) == expected
+    models = PatchModel.decode_tsl(deepcopy(a)), PatchModel.decode_tsl(deepcopy(b))
+    assert list(map(str, diff_patches(*models))) == expected
+
+    assert diff_patches(a, deepcopy(a)) == []
+
+
+def test_diff_only_decodes_changed_sections(tsl_v2: JsonDict) -> None:
+    a = tsl_v2["data"][0][0]
+    b = deepcopy(a)
+    b["paramSet"]["UserPatch%Fx(2)"][185] = "07"
+
+    ParamSetModel.reset_decode_counts()
+    FxModel.reset_decode_counts()
+    diff_patches(a, b)
+
+    assert ParamSetModel.decode_counts() == {"fx2": 2}
+    assert FxModel.decode_counts() == {"chorus": 2}
+
+
+def test_diff_adjacent(tsl_v2: JsonDict) -> None:
+    patches = tsl_v2["data"][0]
+    results = list(diff_adjacent(patches))
+
+    assert [n for n, _ in results] == list(range(len(patches) - 1))
+    for n, changes in results:
+        assert changes == diff_patches(patches[n], patches[n + 1])
@@ -0,0 +1,102 @@
+import io
+import json
+from copy import deepcopy
+
+import pytest
+
+from katana_tsl_parser.errors import NameTooLongError
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.enums import AmpType
+from katana_tsl_parser.models.tsl import ParamSetModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.writer import write_tsl
+
+
+def _upper(values: JsonDict) -> JsonDict:
+    res: JsonDict = json.loads(json.dumps(values).upper())
+
+    return res
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_encode_round_trip(tsl_v2: JsonDict, *, trusted: bool) -> None:
+    tsl = TslModel.decode_tsl(deepcopy(tsl_v2), trusted=trusted)
+
+    # The source bytes, including the sections that aren't modeled, are kept
+    assert _upper(tsl.encode_tsl()) == _upper(tsl_v2)
+    assert _upper(tsl.encode_tsl(tsl_v2)) == _upper(tsl_v2)
+
+
+def test_encode_validated_json(tsl_v2: JsonDict) -> None:
+    tsl = TslModel.model_validate_json(json.dumps(tsl_v2))
+
+    assert _upper(tsl.encode_tsl()) == _upper(tsl_v2)
+
+
+def test_encode_without_source_bytes(tsl_v2: JsonDict) -> None:
+    tsl = TslModel.decode_tsl(deepcopy(tsl_v2), trusted=True)
+    param_set = tsl.data[0][0].param_set
+    param_set._raw = None  # noqa: SLF001
+    sections = [getattr(param_set, n) for n in ("patch0", "fx1", "eq2")]
+    for section in sections:
+        section._raw = None  # noqa: SLF001
+
+    values = param_set.encode_tsl()
+    assert "UserPatch%Status" not in values
+    decoded = ParamSetModel.construct_tsl(values)
+    assert decoded.model_dump() == param_set.model_dump()
+
+
+def test_sections_share_patch_buffer(tsl_v2: JsonDict) -> None:
+    param_set = TslModel.decode_tsl(deepcopy(tsl_v2)).data[0][0].param_set
+
+    buffer = param_set.patch0._raw.obj  # noqa: SLF001
+    assert isinstance(buffer, bytes)
+    assert param_set.fx1.chorus._raw.obj is buffer  # noqa: SLF001
+    assert param_set.eq2._raw.obj is buffer  # noqa: SLF001
+
+
+def test_encode_lazy_sections_are_copied(tsl_v2: JsonDict) -> None:
+    tsl = TslModel.decode_tsl(deepcopy(tsl_v2), lazy=True)
+
+    assert _upper(tsl.encode_tsl(tsl_v2)) == _upper(tsl_v2)
+
+
+def test_encode_modified_values(tsl_v2: JsonDict) -> None:
+    patch = TslModel.decode_tsl(deepcopy(tsl_v2)).data[0][0]
+
+    param_set = patch.param_set.model_copy(
+        update={
+            "name": "Edited",
+            "patch0": patch.param_set.patch0.model_copy(
+                update={"amp_type": AmpType.Crunch, "amp_gain": 75}
+            ),
+        }
+    )
+    edited = patch.model_copy(update={"param_set": param_set})
+    values = edited.encode_tsl(tsl_v2["data"][0][0])["paramSet"]
+
+    assert values["UserPatch%PatchName"][:6] == ["45", "64", "69", "74", "65", "64"]
+    assert values["UserPatch%Patch_0"][17] == f"{AmpType.Crunch.value:02X}"
+    assert values["UserPatch%Patch_0"][18] == "4B"
+
+
+def test_encode_name_too_long(tsl_v2: JsonDict) -> None:
+    patch = TslModel.decode_tsl(tsl_v2).data[0][0]
+    param_set = patch.param_set.model_copy(update={"name": "x" * 17})
+
+    with pytest.raises(NameTooLongError):
+        param_set.encode_tsl()
+
+
+def test_write_tsl(tsl_v2: JsonDict) -> None:
+    tsl = TslModel.decode_tsl(deepcopy(tsl_v2))
+    patches = [*tsl.data[0], tsl_v2["data"][0][0]]
+
+    f = io.StringIO()
+    count = write_tsl(f, patches, name=tsl.name, format_rev=tsl.format_rev)
+
+    written = TslModel.decode_tsl(json.loads(f.getvalue()))
+    assert count == len(patches)
+    assert written.data[0] == [*tsl.data[0], tsl.data[0][0]]
+    assert (written.name, written.format_rev) == (tsl.name, tsl.format_rev)
@@ -0,0 +1,137 @@
+import json
+from copy import deepcopy
+from pathlib import Path
+from typing import Annotated
+
+import pytest
+
+from katana_tsl_parser.instrumentation import (
+    ENV_VAR,
+    install_from_env,
+    instrument,
+    stop,
+)
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.layout import At
+from katana_tsl_parser.models.mod_fx import HarmonistModel
+from katana_tsl_parser.models.types import JsonDict, TslSection
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_instrument_records_nested_sections(tsl_v2: JsonDict, *, trusted: bool) -> None:
+    patches = len(tsl_v2["data"][0])
+    reports: list[JsonDict] = []
+
+    with instrument(reports.append) as recorder:
+        tsl = TslModel.decode_tsl(deepcopy(tsl_v2), trusted=trusted)
+
+    assert tsl == TslModel.decode_tsl(deepcopy(tsl_v2))
+    assert reports == [recorder.report()]
+
+    method = "construct_tsl" if trusted else "decode_tsl"
+    stats = recorder.stats
+    fx = stats[f"FxModel.{method}"]
+    harmonist = stats[f"HarmonistModel.{method}"]
+    assert fx.calls == harmonist.calls == 2 * patches
+    assert harmonist.bytes == 2 * patches * HarmonistModel.__tsl_layout__.size
+    assert 0 < harmonist.total <= fx.total
+    assert fx.self_time < fx.total
+    assert 0 < fx.max <= fx.total
+
+    if not trusted:
+        assert stats["PatchModel.__init__"].calls == patches
+
+
+def test_instrument_restores_the_methods(tsl_v2: JsonDict) -> None:
+    decode_tsl = TslSection.__dict__["decode_tsl"]
+
+    with instrument() as outer:
+        with instrument() as inner:
+            TslModel.decode_tsl(deepcopy(tsl_v2))
+        TslModel.decode_tsl(deepcopy(tsl_v2))
+
+    assert TslSection.__dict__["decode_tsl"] is decode_tsl
+    assert (
+        outer.stats["FxModel.decode_tsl"].calls
+        == 2 * inner.stats["FxModel.decode_tsl"].calls
+    )
+
+    TslModel.decode_tsl(deepcopy(tsl_v2))
+    assert outer.report() == json.loads(outer.to_json())
+
+
+def test_instrument_restores_the_decoders() -> None:
+    class Inner(TslSection):
+        gain: Annotated[int, At(0)]
+        level: Annotated[int, At(1)]
+
+    class Outer(TslSection):
+        inner: Annotated[Inner, At(0)]
+
+    # The decoders are compiled while the methods are wrapped
+    with instrument() as recorder:
+        Outer.decode_tsl(b"\x10\x20")
+        Outer.construct_tsl(b"\x10\x20")
+
+    stats = recorder.stats
+    assert stats[f"{Inner.__qualname__}.decode_tsl"].calls == 1
+    assert stats[f"{Inner.__qualname__}.construct_tsl"].calls == 1
+
+    assert Inner.decode_tsl in Outer.__tsl_decoder__.__globals__.values()
+    assert (
+        Inner.__tsl_trusted_decoder__
+        in Outer.__tsl_trusted_decoder__.__globals__.values()
+    )
+
+
+def test_install_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(ENV_VAR, raising=False)
+    assert install_from_env() is None
+
+    # Not paths
+    for value in ("", "0", "false", "OFF"):
+        monkeypatch.setenv(ENV_VAR, value)
+        assert install_from_env() is None
+
+
+def test_install_from_env_writes_to_stderr(
+    tsl_v2: JsonDict,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    hooks = []
+    monkeypatch.setenv(ENV_VAR, "on")
+    monkeypatch.setattr("atexit.register", lambda *args: hooks.append(args))
+
+    recorder = install_from_env()
+    assert recorder is not None
+    try:
+        TslModel.decode_tsl(deepcopy(tsl_v2), trusted=True)
+    finally:
+        stop(recorder)
+
+    ((write, *args),) = hooks
+    write(*args)
+
+    assert json.loads(capsys.readouterr().err) == recorder.report()
+
+
+def test_install_from_env_writes_the_stats(
+    tsl_v2: JsonDict, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    hooks = []
+    monkeypatch.setenv(ENV_VAR, str(tmp_path / "stats-{pid}.json"))
+    monkeypatch.setattr("atexit.register", lambda *args: hooks.append(args))
+
+    recorder = install_from_env()
+    assert recorder is not None
+    try:
+        TslModel.decode_tsl(deepcopy(tsl_v2), trusted=True)
+    finally:
+        stop(recorder)
+
+    ((write, *args),) = hooks
+    write(*args)
+
+    (path,) = tmp_path.iterdir()
+    assert json.loads(path.read_text()) == recorder.report()
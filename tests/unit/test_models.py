@@ -1,14 +1,17 @@
 import json
+from copy import deepcopy
 from pathlib import Path
+from types import NoneType
+from typing import get_args
 
 import pytest
 
+from katana_tsl_parser.errors import UnsupportedDeviceError, ValueOutOfRangeError
 from katana_tsl_parser.models import TslModel
-
-
-@pytest.fixture
-def snapshots_folder() -> Path:
-    return Path(__file__).parent / "snapshots"
+from katana_tsl_parser.models.enums import ModFxType
+from katana_tsl_parser.models.mod_fx import FxModel
+from katana_tsl_parser.models.tsl import ParamSetModel
+from katana_tsl_parser.models.types import JsonDict
 
 
 def test_parse_model_v1(snapshots_folder: Path) -> None:
@@ -29,3 +32,79 @@ def test_parse_model_v2_temp(snapshots_folder: Path) -> None:
         expected = json.load(f)
 
     assert tsl_model.model_dump() == expected
+
+
+def test_decode_from_bytes_matches_hex_strings(tsl_v2: JsonDict) -> None:
+    for patch in tsl_v2["data"][0]:
+        for alias, values in patch["paramSet"].items():
+            name = ParamSetModel.__tsl_layout__.by_alias.get(alias)
+            if name is None or name == "name":
+                continue
+
+            model = ParamSetModel.model_fields[name].annotation
+            model = next(a for a in get_args(model) or (model,) if a is not NoneType)
+            raw = bytes.fromhex("".join(values))
+
+            assert model.decode_tsl(raw) == model.decode_tsl(values)
+
+
+def test_decode_trusted_matches_validated(tsl_v2: JsonDict) -> None:
+    trusted = TslModel.decode_tsl(deepcopy(tsl_v2), trusted=True)
+    validated = TslModel.decode_tsl(tsl_v2)
+
+    assert trusted.model_dump() == validated.model_dump()
+    assert trusted.model_dump_json() == validated.model_dump_json()
+
+
+def test_decode_trusted_checks_ranges(tsl_v2: JsonDict) -> None:
+    tsl_v2["data"][0][0]["paramSet"]["UserPatch%Patch_0"][18] = "7F"
+
+    with pytest.raises(ValueOutOfRangeError, match="amp_gain: 127"):
+        TslModel.decode_tsl(tsl_v2, trusted=True)
+
+
+def test_decode_trusted_checks_device(tsl_v2: JsonDict) -> None:
+    tsl_v2["device"] = "KATANA"
+
+    with pytest.raises(UnsupportedDeviceError):
+        TslModel.decode_tsl(tsl_v2, trusted=True)
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_decode_lazy_matches_eager(tsl_v2: JsonDict, *, trusted: bool) -> None:
+    lazy = TslModel.decode_tsl(deepcopy(tsl_v2), trusted=trusted, lazy=True)
+    eager = TslModel.decode_tsl(tsl_v2)
+
+    assert lazy.model_dump() == eager.model_dump()
+    assert lazy.model_dump_json() == eager.model_dump_json()
+
+
+def test_lazy_fx_decodes_on_access(tsl_v2: JsonDict) -> None:
+    values = tsl_v2["data"][0][1]["paramSet"]["UserPatch%Fx(1)"]
+    fx = FxModel.decode_lazy(values)
+
+    assert fx.type_ == ModFxType.Chorus
+    assert len(fx.pending_fields) == 31
+
+    assert fx.active_effect == fx.chorus
+    assert "chorus" not in fx.pending_fields
+    assert len(fx.pending_fields) == 30
+
+    assert fx == FxModel(**FxModel.decode_tsl(values))
+    assert fx.pending_fields == ()
+
+
+def test_lazy_param_set_decodes_on_access(tsl_v2: JsonDict) -> None:
+    ParamSetModel.reset_decode_counts()
+    tsl = TslModel.decode_tsl(deepcopy(tsl_v2), lazy=True)
+    eager = TslModel.decode_tsl(tsl_v2)
+
+    names = [p.param_set.name for p in tsl.data[0]]
+    assert names == [p.param_set.name for p in eager.data[0]]
+    assert sum(ParamSetModel.decode_counts().values()) == 0
+
+    param_set = tsl.data[0][0].param_set
+    assert param_set.patch0 == eager.data[0][0].param_set.patch0
+    assert ParamSetModel.decode_counts() == {"patch0": 1}
+    assert "patch0" not in param_set.pending_fields
+    assert "fx1" in param_set.pending_fields
@@ -0,0 +1,69 @@
+import io
+import json
+from copy import deepcopy
+from pathlib import Path
+
+import pytest
+
+from katana_tsl_parser.errors import InvalidTslFileError
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.packed import PackedReader, pack_tsl, unpack_tsl, write_packed
+
+
+def test_pack_tsl_round_trip(tmp_path: Path, tsl_file: Path) -> None:
+    # Values that aren't sections are kept
+    tsl = json.loads(tsl_file.read_text())
+    tsl["data"][0][1]["paramSet"]["UserPatch%Comment"] = "not a section"
+    tsl_file.write_text(json.dumps(tsl))
+
+    packed = tmp_path / "patches.tslp"
+    assert pack_tsl(tsl_file, packed) == 6
+    assert packed.stat().st_size < tsl_file.stat().st_size / 4
+
+    assert unpack_tsl(packed, tmp_path / "unpacked.tsl") == 6
+    tsl = json.loads((tmp_path / "unpacked.tsl").read_text())
+    assert tsl == json.loads(tsl_file.read_text())
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_packed_reader(tmp_path: Path, tsl_file: Path, *, trusted: bool) -> None:
+    expected = TslModel.model_validate_json(tsl_file.read_text())
+    pack_tsl(tsl_file, tmp_path / "patches.tslp")
+
+    with PackedReader(tmp_path / "patches.tslp") as reader:
+        assert len(reader) == 6
+        assert reader.header == {
+            "name": "Test",
+            "formatRev": "0002",
+            "device": "KATANA MkII",
+        }
+        assert reader.patch(2, trusted=trusted) == expected.data[0][2]
+        assert reader.patch(-1, lazy=True) == expected.data[0][-1]
+        assert list(reader) == expected.data[0]
+        assert reader.load(trusted=trusted) == expected
+
+        with pytest.raises(IndexError):
+            reader.read(6)
+
+
+def test_write_packed_models(tmp_path: Path, tsl_v2: JsonDict) -> None:
+    tsl = TslModel.decode_tsl(deepcopy(tsl_v2))
+    buf = io.BytesIO(b"prefix")
+    buf.seek(0, io.SEEK_END)
+
+    assert write_packed(buf, tsl.data[0], name="Test") == 6
+
+    path = tmp_path / "patches.tslp"
+    path.write_bytes(buf.getvalue().removeprefix(b"prefix"))
+    with PackedReader(path) as reader:
+        assert reader.load() == tsl
+
+
+def test_packed_reader_checks_magic(tmp_path: Path, tsl_file: Path) -> None:
+    with pytest.raises(InvalidTslFileError, match="not a packed library"):
+        PackedReader(tsl_file)
+
+    (tmp_path / "empty.tslp").touch()
+    with pytest.raises(InvalidTslFileError):
+        PackedReader(tmp_path / "empty.tslp")
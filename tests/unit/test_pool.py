@@ -0,0 +1,55 @@
+from copy import deepcopy
+
+import pytest
+from pydantic import ValidationError
+
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.pool import SectionPool
+from katana_tsl_parser.models.tsl import DelayModel, EqModel
+from katana_tsl_parser.models.types import JsonDict
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_pool_shares_identical_sections(tsl_v2: JsonDict, *, trusted: bool) -> None:
+    pool = SectionPool()
+    tsl = TslModel.decode_tsl(deepcopy(tsl_v2), trusted=trusted, cache=pool)
+
+    assert tsl == TslModel.decode_tsl(tsl_v2)
+    assert pool.hits > 0
+    assert pool.saved > 0
+    assert pool.hit_rate == pool.hits / (pool.hits + pool.misses)
+
+    first, second = (p.param_set for p in tsl.data[0][:2])
+    assert first.eq2 is second.eq2
+    # Lists can't be frozen and aren't shared
+    assert first.chain is not second.chain
+
+    with pytest.raises(ValidationError):
+        first.eq2.on = not first.eq2.on  # type: ignore[misc]
+
+
+def test_pool_is_bounded(tsl_v2: JsonDict) -> None:
+    pool = SectionPool(max_entries=1)
+    param_set = tsl_v2["data"][0][0]["paramSet"]
+
+    delay = param_set["UserPatch%Delay(1)"]
+    eq = param_set["UserPatch%Eq(2)"]
+
+    first = pool.section(DelayModel, delay, trusted=True)
+    pool.section(EqModel, eq, trusted=True)
+
+    assert len(pool) == 1
+    assert pool.section(DelayModel, delay, trusted=True) == first
+    assert pool.hits == 0
+
+
+def test_pool_keeps_trusted_sections_apart(tsl_v2: JsonDict) -> None:
+    pool = SectionPool()
+    eq = tsl_v2["data"][0][0]["paramSet"]["UserPatch%Eq(2)"]
+
+    trusted = pool.section(EqModel, eq, trusted=True)
+    validated = pool.section(EqModel, eq, trusted=False)
+    assert validated is not trusted
+    assert (pool.hits, pool.misses) == (0, 2)
+
+    assert pool.section(EqModel, eq, trusted=False) is validated
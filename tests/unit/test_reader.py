@@ -0,0 +1,100 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from katana_tsl_parser.errors import InvalidTslFileError, UnsupportedDeviceError
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.reader import TslReader, iter_patches, scan_patches
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_scan_patches(tsl_v2: JsonDict, indent: int | None) -> None:
+    raw = json.dumps(tsl_v2, indent=indent).encode()
+    header, offsets = scan_patches(raw)
+
+    assert header == {k: v for k, v in tsl_v2.items() if k != "data"}
+
+    patches = [json.loads(raw[s:e]) for s, e in zip(*[iter(offsets)] * 2, strict=True)]
+    assert patches == tsl_v2["data"][0]
+
+
+def test_scan_patches_requires_data() -> None:
+    with pytest.raises(InvalidTslFileError):
+        scan_patches(b'{"name": "data", "formatRev": "0001", "device": "[]"}')
+
+
+def test_header_requires_device(tsl_v2: JsonDict) -> None:
+    data = tsl_v2.pop("data")
+    device = tsl_v2.pop("device")
+
+    # Only streams need the device before `data`
+    raw = json.dumps({**tsl_v2, "data": data, "device": device}).encode()
+    assert scan_patches(raw)[0]["device"] == device
+    with pytest.raises(InvalidTslFileError, match="no device"):
+        next(iter_patches(io.BytesIO(raw)))
+
+    raw = json.dumps({**tsl_v2, "data": data}).encode()
+    with pytest.raises(InvalidTslFileError, match="no device"):
+        scan_patches(raw)
+
+
+def test_reader_decodes_single_patch(tsl_file: Path, tsl_v2: JsonDict) -> None:
+    reader = TslReader(tsl_file)
+
+    assert len(reader) == len(tsl_v2["data"][0])
+    assert reader.header["device"] == "KATANA MkII"
+    assert reader.patch(-1) == PatchModel(**tsl_v2["data"][0][-1])
+    assert reader.patch(1, trusted=True) == PatchModel(**tsl_v2["data"][0][1])
+
+    with pytest.raises(IndexError):
+        reader.read(len(reader))
+
+
+def test_reader_caches_index(tsl_file: Path) -> None:
+    index_path = tsl_file.with_name("patches.tsl.idx")
+
+    TslReader(tsl_file, cache=False)
+    assert not index_path.exists()
+
+    reader = TslReader(tsl_file)
+    assert index_path.exists()
+
+    # A stale index would point at the wrong bytes
+    tsl = json.loads(tsl_file.read_text())
+    tsl["data"][0] = tsl["data"][0][:2]
+    tsl_file.write_text(json.dumps(tsl))
+
+    assert len(TslReader(tsl_file)) == 2
+    assert len(reader) != 2
+
+
+def test_reader_checks_device(tmp_path: Path, tsl_v2: JsonDict) -> None:
+    path = tmp_path / "patches.tsl"
+    path.write_text(json.dumps({**tsl_v2, "device": "KATANA"}))
+
+    with pytest.raises(UnsupportedDeviceError):
+        TslReader(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 1 << 16])
+def test_iter_patches(tsl_file: Path, chunk_size: int) -> None:
+    expected = [PatchModel(**p) for p in json.loads(tsl_file.read_text())["data"][0]]
+
+    with tsl_file.open() as f:
+        assert list(iter_patches(f, chunk_size=chunk_size)) == expected
+
+    patches = iter_patches(tsl_file, trusted=True, chunk_size=chunk_size)
+    assert list(patches) == expected
+
+
+def test_iter_patches_checks_header(tsl_v2: JsonDict) -> None:
+    raw = json.dumps({**tsl_v2, "device": "KATANA"}).encode()
+    with pytest.raises(UnsupportedDeviceError):
+        next(iter_patches(io.BytesIO(raw)))
+
+    raw = json.dumps({k: v for k, v in tsl_v2.items() if k != "data"}).encode()
+    with pytest.raises(InvalidTslFileError):
+        next(iter_patches(io.BytesIO(raw)))
@@ -0,0 +1,121 @@
+import os
+import stat
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from katana_tsl_parser.client import Client, connect
+from katana_tsl_parser.commands import decode_json, diff_lines
+from katana_tsl_parser.errors import RemoteError
+from katana_tsl_parser.server import TslServer
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> Iterator[TslServer]:
+    with TslServer(tmp_path / "tsl.sock") as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        yield server
+        server.shutdown()
+        thread.join()
+
+
+def test_server_decode(server: TslServer, tsl_file: Path) -> None:
+    with Client(server.path) as client:
+        assert client.request("ping") == "pong"
+
+        for _ in range(2):
+            result = client.request("decode", path=str(tsl_file), index=1)
+            assert result == decode_json(tsl_file, 1)
+
+        assert client.request("stats") == {"requests": 4, "hits": 1, "entries": 1}
+
+        # Modified files are decoded again
+        tsl_file.write_text(tsl_file.read_text().replace('"00"', '"01"', 1))
+        result = client.request("decode", path=str(tsl_file), index=1)
+        assert result == decode_json(tsl_file, 1)
+        assert client.request("stats")["hits"] == 1
+
+
+def test_server_socket_permissions(tmp_path: Path) -> None:
+    umask = os.umask(0o022)
+    try:
+        with TslServer(tmp_path / "tsl.sock") as server:
+            assert stat.S_IMODE(server.path.stat().st_mode) == 0o600
+        # The umask of the process is restored after the bind
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(umask)
+
+
+def test_server_requests_are_concurrent(
+    server: TslServer, tsl_file: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    started, release = threading.Event(), threading.Event()
+
+    def slow_decode(*args: Any, **kwargs: Any) -> str:  # noqa: ANN401
+        started.set()
+        release.wait(5)
+        return decode_json(*args, **kwargs)
+
+    monkeypatch.setattr("katana_tsl_parser.server.decode_json", slow_decode)
+
+    def decode() -> None:
+        with Client(server.path) as client:
+            results.append(client.request("decode", path=str(tsl_file), index=0))
+
+    results: list[str] = []
+    thread = threading.Thread(target=decode)
+    thread.start()
+    try:
+        assert started.wait(5)
+        with Client(server.path, timeout=1) as client:
+            assert client.request("ping") == "pong"
+            assert client.request("stats")["entries"] == 0
+    finally:
+        release.set()
+        thread.join()
+
+    assert results == [decode_json(tsl_file, 0)]
+
+
+def test_server_diff(server: TslServer, tsl_file: Path) -> None:
+    with Client(server.path) as client:
+        result = client.request("diff", path=str(tsl_file), index=0)
+
+    assert result == list(diff_lines(tsl_file, 0))
+
+
+def test_server_errors(server: TslServer, tsl_file: Path) -> None:
+    with Client(server.path) as client:
+        with pytest.raises(RemoteError, match="ValueError: Invalid index: 6"):
+            client.request("decode", path=str(tsl_file), index=10)
+        with pytest.raises(RemoteError, match="KeyError"):
+            client.request("unknown")
+
+        # The connection is still usable after an error
+        assert client.request("ping") == "pong"
+
+
+def test_server_shutdown(tmp_path: Path) -> None:
+    path = tmp_path / "tsl.sock"
+    server = TslServer(path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    with Client(path) as client:
+        client.request("shutdown")
+    thread.join(timeout=5)
+    server.server_close()
+
+    assert not thread.is_alive()
+    assert not path.exists()
+    assert connect(path) is None
+
+
+def test_server_refuses_live_socket(server: TslServer) -> None:
+    with pytest.raises(FileExistsError):
+        TslServer(server.path)
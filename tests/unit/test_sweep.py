@@ -0,0 +1,143 @@
+import io
+import json
+
+import pytest
+
+from katana_tsl_parser.errors import (
+    InvalidQValueError,
+    InvalidValueListLengthError,
+    UnknownFieldError,
+    ValueOutOfRangeError,
+)
+from katana_tsl_parser.models import TslModel
+from katana_tsl_parser.models.enums import AmpType
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.sweep import Sweep, resolve
+from katana_tsl_parser.writer import write_tsl
+
+
+@pytest.fixture
+def patch(tsl_v2: JsonDict) -> JsonDict:
+    values: JsonDict = tsl_v2["data"][0][0]
+    return values
+
+
+def test_resolve() -> None:
+    param = resolve("fx1.chorus.low_depth")
+    assert (param.alias, param.offset) == ("UserPatch%Fx(1)", 185)
+
+    for path in ("patch0", "patch0.eq", "patch0.foo", "chain.x", "foo.bar"):
+        with pytest.raises(UnknownFieldError):
+            resolve(path)
+
+
+def test_sweep_product(patch: JsonDict) -> None:
+    sweep = Sweep(
+        patch,
+        {
+            "patch0.amp_eq_bass,patch0.amp_eq_middle": range(0, 101, 50),
+            "patch0.amp_type": ["Clean", AmpType.Crunch],
+        },
+        name="{0} {1.name}",
+    )
+    variants = [PatchModel.decode_tsl(v) for v in sweep]
+
+    assert len(sweep) == len(variants) == 6
+    assert [v.param_set.name for v in variants] == [
+        "0 Clean", "0 Crunch", "50 Clean", "50 Crunch", "100 Clean", "100 Crunch",
+    ]  # fmt: skip
+    for v in variants:
+        assert v.param_set.patch0.amp_eq_bass == v.param_set.patch0.amp_eq_middle
+
+    # The other sections are untouched
+    base = PatchModel.decode_tsl(patch)
+    assert variants[0].param_set.fx1 == base.param_set.fx1
+    assert variants[0].param_set.patch0.eq == base.param_set.patch0.eq
+
+
+def test_sweep_zip(patch: JsonDict) -> None:
+    sweep = Sweep(
+        patch,
+        {"patch0.amp_gain": [10, 20], "fx1.chorus.low_pre_delay": [0.5, 40]},
+        product=False,
+        name="Zip {n}",
+    )
+    variants = [PatchModel.decode_tsl(v, trusted=True) for v in sweep]
+
+    assert [v.param_set.name for v in variants] == ["Zip 0", "Zip 1"]
+    assert [v.param_set.patch0.amp_gain for v in variants] == [10, 20]
+    assert [v.param_set.fx1.chorus.low_pre_delay for v in variants] == [0.5, 40]
+
+    params = {"patch0.amp_gain": [1, 2], "patch0.amp_volume": [1]}
+    with pytest.raises(InvalidValueListLengthError):
+        Sweep(patch, params, product=False)
+
+
+@pytest.mark.parametrize(
+    ("path", "value", "error"),
+    [
+        ("patch0.amp_gain", 101, ValueOutOfRangeError),
+        ("patch0.amp_type", "Unknown", ValueError),
+        ("patch0.amp_type", 0x42, ValueError),
+        ("patch0.boost_on", "maybe", ValueError),
+        ("patch0.boost_on", 2, ValueError),
+        ("eq2.low_mid_q", 3, InvalidQValueError),
+    ],
+)
+def test_sweep_validates_values(
+    patch: JsonDict, path: str, value: object, error: type[Exception]
+) -> None:
+    with pytest.raises(error):
+        Sweep(patch, {path: [value]})
+
+
+@pytest.mark.parametrize(
+    ("path", "value"),
+    [
+        ("eq2.bar_31", 0.3),
+        ("eq2.bar_31", 11.9),
+        ("eq2.bar_31", "loud"),
+        ("fx1.chorus.low_pre_delay", 0.7),
+        ("patch0.amp_gain", 1.5),
+        ("patch0.amp_gain", "loud"),
+    ],
+)
+def test_sweep_rejects_numbers_off_the_grid(
+    patch: JsonDict, path: str, value: object
+) -> None:
+    # Rather than rounding them, or failing in the encoder
+    with pytest.raises(ValueError, match=path):
+        Sweep(patch, {path: [value]})
+
+
+def test_sweep_converts_values(patch: JsonDict) -> None:
+    values = ["false", "on", "OFF", 1, 0, True]
+    sweep = Sweep(patch, {"patch0.boost_on": values, "eq2.low_mid_q": [0.5, 16]})
+    variants = [PatchModel.decode_tsl(v) for v in sweep]
+
+    assert [v.param_set.patch0.boost_on for v in variants[::2]] == [
+        False, True, False, True, False, True,
+    ]  # fmt: skip
+    assert [v.param_set.eq2.low_mid_q for v in variants[:2]] == [0.5, 16]
+
+
+def test_sweep_numbers_on_the_grid(patch: JsonDict) -> None:
+    params = {"patch0.amp_gain": [12.0, "13"], "eq2.bar_31": [-0.5, 11.5, "12"]}
+    variants = [PatchModel.decode_tsl(v) for v in Sweep(patch, params)]
+
+    assert [v.param_set.patch0.amp_gain for v in variants[::3]] == [12, 13]
+    assert [v.param_set.eq2.bar_31 for v in variants[:3]] == [-0.5, 11.5, 12.0]
+
+
+def test_sweep_write(patch: JsonDict) -> None:
+    params = {"patch0.amp_gain": range(101), "patch0.amp_volume": range(3)}
+    sweep = Sweep(patch, params)
+    assert [json.loads(v) for v in sweep.iter_json()] == list(sweep)
+
+    f = io.StringIO()
+    assert write_tsl(f, sweep.iter_json(), name="Sweep") == 303
+
+    tsl = TslModel.model_validate_json(f.getvalue())
+    assert tsl.data[0][-1].param_set.patch0.amp_gain == 100
+    assert tsl.data[0][-1].param_set.patch0.amp_volume == 2
@@ -0,0 +1,118 @@
+from copy import deepcopy
+from statistics import StatisticsError
+
+import pytest
+
+from katana_tsl_parser.errors import InvalidValueListLengthError, UnknownFieldError
+from katana_tsl_parser.models.enums import AmpType
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.table import MISSING, PatchTable
+
+
+@pytest.fixture
+def patches(tsl_v2: JsonDict) -> list[JsonDict]:
+    values: list[JsonDict] = tsl_v2["data"][0]
+    return values
+
+
+def test_table_columns(patches: list[JsonDict]) -> None:
+    table = PatchTable(patches)
+    models = [PatchModel.decode_tsl(deepcopy(p)).param_set for p in patches]
+
+    assert len(table) == len(patches)
+    assert table.names == [m.name for m in models]
+    assert list(table["patch0.amp_gain"]) == [m.patch0.amp_gain for m in models]
+    assert list(table["patch0.amp_type"]) == [m.patch0.amp_type for m in models]
+    assert list(table["patch0.eq.low_mid_q"]) == [m.patch0.eq.low_mid_q for m in models]
+    assert list(table["fx1.chorus.low_pre_delay"]) == [
+        m.fx1.chorus.low_pre_delay for m in models
+    ]
+    assert list(table["delay1.delay_time"]) == [m.delay1.delay_time for m in models]
+    assert table["patch1.reverb_time"].typecode == "d"
+
+    with pytest.raises(UnknownFieldError):
+        table["patch0.foo"]
+
+
+def test_table_missing_fields(patches: list[JsonDict]) -> None:
+    patch = deepcopy(patches[0])
+    del patch["paramSet"]["UserPatch%Patch_Mk2V2"]
+    patch["paramSet"]["UserPatch%Patch_1"] = patch["paramSet"]["UserPatch%Patch_1"][:50]
+
+    table = PatchTable([patches[0], patch])
+
+    assert table["patch_mk2v2.solo_eq_on"][1] == MISSING
+    assert table["patch1.solo_level"][1] == MISSING
+    assert table["patch1.solo_level"][0] != MISSING
+    assert table.counts("patch1.solo_on").total() == 1
+
+
+def test_table_invalid_size(patches: list[JsonDict]) -> None:
+    patch = deepcopy(patches[0])
+    patch["paramSet"]["UserPatch%Patch_0"].pop()
+
+    with pytest.raises(InvalidValueListLengthError):
+        PatchTable([patch])
+
+
+def test_table_queries(patches: list[JsonDict]) -> None:
+    patches = deepcopy(patches)
+    for n, patch in enumerate(patches):
+        patch["paramSet"]["UserPatch%Patch_0"][18] = f"{10 * n:02X}"
+    patches[1]["paramSet"]["UserPatch%Patch_0"][17] = f"{AmpType.Crunch:02X}"
+
+    table = PatchTable(patches)
+
+    assert table.labels("fx1.type_") is table.labels("patch2.mod_green")
+    assert table.labels("patch0.amp_gain") == {}
+    assert table.counts("patch0.amp_type") == {"Clean": len(patches) - 1, "Crunch": 1}
+    assert table.isin("patch0.amp_type", "Crunch") == [1]
+    assert table.isin("patch0.amp_type", AmpType.Crunch, AmpType.Clean) == [
+        *range(len(patches))
+    ]
+
+    rows = table.where("patch0.amp_gain", lambda v: v >= 20)
+    assert rows == [*range(2, len(patches))]
+
+    sub = table.take(rows)
+    assert list(sub["patch0.amp_gain"]) == [10 * n for n in rows]
+    assert sub.names == [table.names[n] for n in rows]
+    assert sub.mean("patch0.amp_gain") == pytest.approx(
+        sum(10 * n for n in rows) / len(rows)
+    )
+
+
+def test_table_queries_missing_values(patches: list[JsonDict]) -> None:
+    patch = deepcopy(patches[0])
+    patch["paramSet"]["UserPatch%Patch_1"] = patch["paramSet"]["UserPatch%Patch_1"][:50]
+    table = PatchTable([*patches, patch])
+
+    # Values with different high bytes, as the fields with negative values have
+    column = table["patch1.solo_level"]
+    column[0], column[1] = -3, 300
+    others = column[2:-1]
+
+    assert table.where("patch1.solo_level", lambda v: v < 0) == [0]
+    assert table.isin("patch1.solo_level", 300, -3, 2.5, 1 << 20) == [0, 1]
+    assert table.isin("patch1.solo_level", MISSING) == [len(patches)]
+    assert table.where("patch1.solo_level", lambda v: v == others[0]) == [
+        n + 2 for n, v in enumerate(others) if v == others[0]
+    ]
+    assert table.mean("patch1.solo_level") == pytest.approx(
+        (297 + sum(others)) / len(patches)
+    )
+
+    table = table.take([len(patches)])
+    with pytest.raises(StatisticsError):
+        table.mean("patch1.solo_level")
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_table_patch(patches: list[JsonDict], *, trusted: bool) -> None:
+    table = PatchTable(PatchModel.decode_tsl(deepcopy(p)) for p in patches)
+
+    patch = table.take([2]).patch(0, trusted=trusted)
+    assert (
+        patch.model_dump() == PatchModel.decode_tsl(deepcopy(patches[2])).model_dump()
+    )
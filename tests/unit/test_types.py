@@ -0,0 +1,182 @@
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any
+
+import pytest
+from pydantic import Field
+
+from katana_tsl_parser.errors import InvalidValueListLengthError
+from katana_tsl_parser.models import mod_fx, tsl
+from katana_tsl_parser.models.enums import AmpType, WahMode
+from katana_tsl_parser.models.layout import At, Decoder, byte_table, compile_decoder
+from katana_tsl_parser.models.mod_fx import DelayChorus30Model, FxModel, TWahModel
+from katana_tsl_parser.models.tsl import EqModel, ParamSetModel
+from katana_tsl_parser.models.types import (
+    Q,
+    TslLazyModel,
+    TslLazySection,
+    TslObject,
+    TslSection,
+)
+
+
+@pytest.mark.parametrize(
+    "model", [TWahModel, DelayChorus30Model, FxModel, EqModel, ParamSetModel]
+)
+@pytest.mark.parametrize("by_alias", [False, True])
+def test_layout_matches_json_schema(model: type[TslObject], *, by_alias: bool) -> None:
+    expected = set(model.model_json_schema(by_alias=by_alias)["properties"])
+
+    assert model._get_fields(by_alias=by_alias) == expected  # noqa: SLF001
+
+
+def test_layout_alias_map() -> None:
+    layout = ParamSetModel.__tsl_layout__
+
+    assert layout.by_alias["UserPatch%Fx(1)"] == "fx1"
+    assert layout.by_alias["UserPatch%Chain"] == "chain"
+    assert layout.size == len(ParamSetModel.model_fields)
+
+
+def _sections() -> list[type[TslSection]]:
+    return [
+        c
+        for m in (mod_fx, tsl)
+        for _, c in inspect.getmembers(m, inspect.isclass)
+        if issubclass(c, TslSection) and c.__tsl_layout__.specs
+    ]
+
+
+@pytest.mark.parametrize("model", _sections(), ids=lambda m: m.__name__)
+def test_section_layout_has_no_overlap(model: type[TslSection]) -> None:
+    layout = model.__tsl_layout__
+    used: set[int] = set()
+
+    for spec in layout.specs:
+        span = set(range(spec.offset, spec.end))
+        assert not used & span, spec.name
+        used |= span
+
+    assert len(layout.specs) == len(layout.fields)
+    assert max(used) < max(layout.sizes)
+
+
+def test_section_decoder_checks_size() -> None:
+    with pytest.raises(InvalidValueListLengthError, match="exactly 7 items, not 6"):
+        TWahModel.decode_tsl(bytes(6))
+
+    with pytest.raises(InvalidValueListLengthError, match="exactly 221 or 225"):
+        FxModel.decode_tsl(bytes(222))
+
+
+def test_section_decoder_optional_fields() -> None:
+    assert "pedal_bend" not in FxModel.decode_tsl(bytes(221))
+    assert FxModel.decode_tsl(bytes(225))["pedal_bend"]["pitch"] == -24
+
+
+def test_byte_table() -> None:
+    table = byte_table(AmpType)
+
+    assert byte_table(AmpType) is table
+    assert table[AmpType.Crunch.value] is AmpType.Crunch
+    assert byte_table(Q.from_byte)[3] == Q(4.0)
+
+    with pytest.raises(ValueError, match="127 is not a valid AmpType"):
+        table[127]
+    with pytest.raises(ValueError, match="200 is not a valid AmpType"):
+        table[200]
+
+
+def test_section_decoder_uses_byte_tables() -> None:
+    data = bytearray(TWahModel.__tsl_layout__.size)
+    data[0] = 0x7F
+
+    with pytest.raises(ValueError, match="127 is not a valid WahMode"):
+        TWahModel.decode_tsl(bytes(data))
+
+    data[0] = WahMode.BPF
+    assert TWahModel.decode_tsl(bytes(data))["mode"] is WahMode.BPF
+
+
+def test_section_codecs_are_built_on_first_use() -> None:
+    class Inner(TslSection):
+        gain: Annotated[int, At(0)] = Field(ge=0, le=100)
+        level: Annotated[int, At(1)]
+
+    class Outer(TslSection):
+        on: Annotated[bool, At(0)]
+        inner: Annotated[Inner, At(1)]
+
+    for model in (Inner, Outer):
+        assert not _is_compiled(model, "__tsl_decoder__")
+        assert not model.__pydantic_complete__
+
+    values = Outer.decode_tsl(b"\x01\x10\x20")
+    assert _is_compiled(Outer, "__tsl_decoder__")
+    assert _is_compiled(Inner, "__tsl_decoder__")
+    assert not _is_compiled(Outer, "__tsl_encoder__")
+
+    # The nested model is built first, then reused by the outer one
+    outer = Outer(**values)
+    assert Inner.__pydantic_complete__
+    assert Outer.__pydantic_complete__
+    assert outer.inner.model_dump() == {"gain": 0x10, "level": 0x20}
+    assert outer.encode_tsl() == b"\x01\x10\x20"
+
+
+def test_section_codecs_are_not_inherited() -> None:
+    class Base(TslSection):
+        on: Annotated[bool, At(0)]
+
+    class Derived(Base):
+        level: Annotated[int, At(1)]
+
+    # Read on the bases first, which have fewer fields or none
+    assert callable(TslSection.__tsl_decoder__)
+    assert callable(TslLazySection.__tsl_decoder__)
+    assert Base.decode_tsl(b"\x01")["on"] is True
+
+    assert Derived.decode_tsl(b"\x01\x20")["level"] == 0x20
+    assert not _is_compiled(TslLazySection, "__tsl_decoder__")
+
+    values = FxModel.decode_tsl(bytes(max(FxModel.__tsl_layout__.sizes)))
+    assert set(values) == {"_raw", *FxModel.__tsl_layout__.fields}
+
+
+def test_section_codecs_are_compiled_concurrently(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class Section(TslSection):
+        on: Annotated[bool, At(0)]
+
+    # Both threads compile the decoder before either stores it
+    barrier = threading.Barrier(2)
+
+    def compile_together(*args: Any, **kwargs: Any) -> Decoder:  # noqa: ANN401
+        barrier.wait(timeout=5)
+        return compile_decoder(*args, **kwargs)
+
+    monkeypatch.setattr(
+        "katana_tsl_parser.models.types.compile_decoder", compile_together
+    )
+
+    def read(_: int) -> Decoder:
+        return Section.__tsl_trusted_decoder__
+
+    with ThreadPoolExecutor(2) as executor:
+        first, second = executor.map(read, range(2))
+
+    assert first is second is Section.__tsl_trusted_decoder__
+
+
+def test_lazy_models_need_a_loader() -> None:
+    class Partial(TslLazyModel):
+        level: int
+
+    with pytest.raises(TypeError, match="_load_lazy"):
+        Partial(level=1)  # type: ignore[abstract]
+
+
+def _is_compiled(model: type[TslSection], name: str) -> bool:
+    return inspect.isfunction(model.__dict__[name])
@@ -0,0 +1,72 @@
+from copy import deepcopy
+
+import pytest
+
+from katana_tsl_parser.errors import (
+    InvalidContourValuesError,
+    InvalidQValueError,
+    InvalidValueListLengthError,
+    MissingFieldsError,
+    ValueOutOfRangeError,
+)
+from katana_tsl_parser.models.tsl import PatchModel
+from katana_tsl_parser.models.types import JsonDict
+from katana_tsl_parser.validation import validate_patches
+
+
+@pytest.fixture
+def patches(tsl_v2: JsonDict) -> list[JsonDict]:
+    values: list[JsonDict] = tsl_v2["data"][0]
+    return values
+
+
+def test_validate_valid_patches(patches: list[JsonDict]) -> None:
+    assert validate_patches(patches) == []
+    assert validate_patches(PatchModel.decode_tsl(deepcopy(p)) for p in patches) == []
+
+
+def test_validate_reports_every_violation(patches: list[JsonDict]) -> None:
+    patches = deepcopy(patches)
+    patches[1]["paramSet"]["UserPatch%Patch_0"][18] = "70"
+    patches[1]["paramSet"]["UserPatch%Patch_1"][86:88] = ["02", "05"]
+    patches[3]["paramSet"]["UserPatch%Patch_0"][17] = "7F"
+    patches[3]["paramSet"]["UserPatch%Patch_Mk2V2"][5] = "10"
+    patches[4]["paramSet"]["UserPatch%Fx(1)"].pop()
+    patches[4]["paramSet"]["UserPatch%Fx(2)"][183 + 3] = "60"
+    del patches[5]["paramSet"]["UserPatch%Eq(2)"]
+
+    violations = validate_patches(patches)
+
+    assert [(v.index, v.path, v.value, type(v.error)) for v in violations] == [
+        (1, "patch0.amp_gain", 0x70, ValueOutOfRangeError),
+        (1, "patch1.contour", (2, 5), InvalidContourValuesError),
+        (3, "patch0.amp_type", 0x7F, ValueError),
+        (3, "patch_mk2v2.solo_eq_mid_q", 0x10, InvalidQValueError),
+        (4, "fx1", 224, InvalidValueListLengthError),
+        (4, "fx2.chorus.low_pre_delay", 0x60, ValueOutOfRangeError),
+        (5, "paramSet", ["eq2"], MissingFieldsError),
+    ]
+    assert str(violations[0]) == (
+        "patch 1: patch0.amp_gain: amp_gain: 112 is not in range [0, 100]"
+    )
+
+
+def test_validate_matches_model_errors(patches: list[JsonDict]) -> None:
+    patch = deepcopy(patches[0])
+    patch["paramSet"]["UserPatch%Patch_Mk2V2"][5] = "10"
+
+    (violation,) = validate_patches([patch])
+
+    with pytest.raises(InvalidQValueError, match=str(violation.error)):
+        PatchModel.decode_tsl(patch, trusted=True)
+
+
+def test_validate_optional_field_constraints(patches: list[JsonDict]) -> None:
+    patch = deepcopy(patches[0])
+    patch["paramSet"]["UserPatch%Patch_1"][85] = "67"
+
+    (violation,) = validate_patches([patch])
+
+    assert violation.path == "patch1.solo_level"
+    with pytest.raises(ValueOutOfRangeError):
+        PatchModel.decode_tsl(patch, trusted=True)